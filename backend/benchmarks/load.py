@@ -0,0 +1,473 @@
+"""Latency and throughput of every API route under concurrent load.
+
+Runs the app in-process over httpx's ASGI transport, seeds N shows with M
+acts and K expenses each, then drives each route with concurrent clients
+and prints p50/p95/p99 latency (ms) and req/s per route as JSON. By default
+the data lives in the in-memory storage backend; --storage sqlite uses a
+temporary database file, and --mongo-url creates a throwaway database on
+that server and drops it afterwards.
+
+    cd backend && python -m benchmarks.load [--shows 10 --acts 25 --expenses 50]
+    cd backend && python -m benchmarks.load --storage sqlite
+    cd backend && python -m benchmarks.load --output baseline.json
+    cd backend && python -m benchmarks.load --compare baseline.json --threshold 0.2
+
+With --compare the run exits 1 when a route's p95 grows, or its req/s
+drops, by more than the threshold relative to the baseline.
+
+The report also compares creating --bulk-items acts and expenses one POST
+at a time (with the same concurrency) against the bulk routes, in items/s.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import server
+from storage import MemoryStorage, MongoStorage
+
+ROUTES = []
+
+
+def route(name, status=200):
+    def register(call):
+        ROUTES.append({"name": name, "call": call, "status": status})
+        return call
+    return register
+
+
+def act_payload(show_id, i):
+    return {
+        "show_id": show_id,
+        "name": f"Act {i}",
+        "performers": "The Flying Trapezists",
+        "duration": 5 + i % 20,
+        "description": "Aerial routine over the centre ring",
+        "staging_notes": "Rig trapeze during previous act",
+        "sound_requirements": "Drum roll cue",
+        "lighting_requirements": "Follow spot",
+    }
+
+
+def expense_payload(show_id, act_id, i):
+    return {
+        "show_id": show_id,
+        "act_id": act_id,
+        "category": ("performer_fee", "equipment", "venue", "travel")[i % 4],
+        "amount": 50 + i % 500,
+        "description": f"Expense {i}",
+        "date": "2025-08-15",
+    }
+
+
+class State:
+    """Ids of the seeded data, plus documents created only to be deleted."""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.shows = []
+        self.acts = {}  # show_id -> [act_id]
+        self.spare_shows = []
+        self.spare_acts = []
+        self.spare_expenses = []
+        self.export = b""  # a seeded show as exported, for the import route
+        self.counter = itertools.count()
+
+    def show(self):
+        return self.random.choice(self.shows)
+
+    def act(self):
+        show_id = self.show()
+        return show_id, self.random.choice(self.acts[show_id])
+
+
+async def post_ok(client, url, payload):
+    response = await client.post(url, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+async def bulk_create(client, url, payloads):
+    ids = []
+    for start in range(0, len(payloads), server.BULK_MAX_ITEMS):
+        result = await post_ok(client, url, payloads[start:start + server.BULK_MAX_ITEMS])
+        ids.extend(item["id"] for item in result["results"])
+    return ids
+
+
+async def seed(client, state, shows, acts, expenses):
+    for s in range(shows):
+        show = await post_ok(client, "/api/shows", {
+            "title": f"Show {s}",
+            "date": f"2025-{s % 12 + 1:02d}-{s % 28 + 1:02d}",
+            "time": "19:30",
+            "venue": "Big Top",
+        })
+        act_ids = await bulk_create(client, "/api/acts/bulk", [act_payload(show["id"], i) for i in range(acts)])
+        await bulk_create(client, "/api/expenses/bulk", [
+            expense_payload(show["id"], act_ids[i % len(act_ids)] if act_ids else None, i) for i in range(expenses)
+        ])
+        state.shows.append(show["id"])
+        state.acts[show["id"]] = act_ids
+    response = await client.get(f"/api/shows/{state.shows[0]}/export")
+    response.raise_for_status()
+    state.export = response.content
+
+
+async def seed_spares(client, state, count):
+    # Targets for the delete routes, so deletes never eat into the seeded data
+    show_id = state.shows[0]
+    for _ in range(count):
+        show = await post_ok(client, "/api/shows", {"title": "Spare"})
+        state.spare_shows.append(show["id"])
+    state.spare_acts = await bulk_create(client, "/api/acts/bulk", [act_payload(show_id, i) for i in range(count)])
+    state.spare_expenses = await bulk_create(
+        client, "/api/expenses/bulk", [expense_payload(show_id, None, i) for i in range(count)]
+    )
+
+
+@route("GET /api/shows")
+def list_shows(client, state):
+    return client.get("/api/shows", params={"limit": 100})
+
+
+@route("GET /api/shows?from=&to=")
+def list_month(client, state):
+    month = state.random.randint(1, 12)
+    return client.get("/api/shows", params={
+        "from": f"2025-{month:02d}-01", "to": f"2025-{month:02d}-28", "venue": "Big Top",
+    })
+
+
+@route("GET /api/shows/{show_id}")
+def get_show(client, state):
+    return client.get(f"/api/shows/{state.show()}")
+
+
+@route("GET /api/shows/{show_id}/summary")
+def get_summary(client, state):
+    return client.get(f"/api/shows/{state.show()}/summary")
+
+
+@route("GET /api/shows/summaries")
+def get_summaries(client, state):
+    ids = state.random.sample(state.shows, min(10, len(state.shows)))
+    return client.get("/api/shows/summaries", params={"ids": ids})
+
+
+@route("GET /api/shows/{show_id}/timeline")
+def get_timeline(client, state):
+    return client.get(f"/api/shows/{state.show()}/timeline")
+
+
+@route("GET /api/shows/{show_id}/conflicts")
+def get_conflicts(client, state):
+    return client.get(f"/api/shows/{state.show()}/conflicts")
+
+
+@route("GET /api/performers/{name}/schedule")
+def performer_schedule(client, state):
+    # Every seeded act has the same performer: a month of their shows, or all of them
+    params = {}
+    if state.random.random() < 0.5:
+        month = state.random.randint(1, 12)
+        params = {"from": f"2025-{month:02d}-01", "to": f"2025-{month:02d}-28"}
+    return client.get("/api/performers/The Flying Trapezists/schedule", params=params)
+
+
+@route("GET /api/acts/show/{show_id}")
+def list_acts(client, state):
+    return client.get(f"/api/acts/show/{state.show()}")
+
+
+@route("GET /api/acts/{act_id}")
+def get_act(client, state):
+    return client.get(f"/api/acts/{state.act()[1]}")
+
+
+@route("GET /api/expenses/show/{show_id}")
+def list_expenses(client, state):
+    return client.get(f"/api/expenses/show/{state.show()}")
+
+
+@route("GET /api/shows/{show_id}/export")
+def export_show(client, state):
+    return client.get(f"/api/shows/{state.show()}/export")
+
+
+@route("GET /api/search")
+def search(client, state):
+    params = {"q": state.random.choice(("trapeze", "drum roll", "follow spot", "expense"))}
+    if state.random.random() < 0.5:
+        params["show_id"] = state.show()
+    return client.get("/api/search", params=params)
+
+
+@route("GET /api/reports/expenses")
+def expense_report(client, state):
+    return client.get("/api/reports/expenses")
+
+
+@route("POST /api/shows")
+def create_show(client, state):
+    return client.post("/api/shows", json={"title": f"Bench {next(state.counter)}", "venue": "Big Top"})
+
+
+@route("PUT /api/shows/{show_id}")
+def update_show(client, state):
+    return client.put(f"/api/shows/{state.show()}", json={"title": f"Renamed {next(state.counter)}"})
+
+
+@route("POST /api/acts")
+def create_act(client, state):
+    return client.post("/api/acts", json=act_payload(state.show(), next(state.counter)))
+
+
+@route("PUT /api/acts/{act_id}")
+def update_act(client, state):
+    return client.put(f"/api/acts/{state.act()[1]}", json={"duration": state.random.randint(1, 30)})
+
+
+@route("POST /api/acts/{act_id}/move")
+def move_act(client, state):
+    show_id, act_id = state.act()
+    # Moving an act relative to itself is a 400
+    after_id = state.random.choice([other for other in state.acts[show_id] if other != act_id] or [None])
+    return client.post(f"/api/acts/{act_id}/move", json={"after_id": after_id})
+
+
+@route("PUT /api/acts/reorder")
+def reorder_acts(client, state):
+    show_id = state.show()
+    act_ids = state.random.sample(state.acts[show_id], min(10, len(state.acts[show_id])))
+    updates = [{"id": act_id, "sequence_order": state.random.randint(1, 10 ** 6)} for act_id in act_ids]
+    return client.put("/api/acts/reorder", json={"show_id": show_id, "act_updates": updates})
+
+
+@route("POST /api/acts/bulk")
+def create_acts_bulk(client, state):
+    show_id = state.show()
+    return client.post("/api/acts/bulk", json=[act_payload(show_id, i) for i in range(20)])
+
+
+@route("POST /api/expenses")
+def create_expense(client, state):
+    show_id, act_id = state.act()
+    return client.post("/api/expenses", json=expense_payload(show_id, act_id, next(state.counter)))
+
+
+@route("POST /api/shows/{show_id}/clone")
+def clone_show(client, state):
+    return client.post(f"/api/shows/{state.show()}/clone", json={"include_expenses": False})
+
+
+@route("POST /api/shows/import")
+def import_show(client, state):
+    return client.post("/api/shows/import", files={"file": ("show.ndjson", state.export, "application/x-ndjson")})
+
+
+@route("DELETE /api/expenses/{expense_id}")
+def delete_expense(client, state):
+    return client.delete(f"/api/expenses/{state.spare_expenses.pop()}")
+
+
+@route("DELETE /api/acts/{act_id}")
+def delete_act(client, state):
+    return client.delete(f"/api/acts/{state.spare_acts.pop()}")
+
+
+@route("DELETE /api/shows/{show_id}")
+def delete_show(client, state):
+    return client.delete(f"/api/shows/{state.spare_shows.pop()}")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def drive(client, state, entry, requests, concurrency):
+    latencies, errors = [], 0
+    remaining = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while next(remaining) < requests:
+            start = time.perf_counter()
+            response = await entry["call"](client, state)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != entry["status"]:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "route": entry["name"],
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        **{
+            f"p{int(q * 100)}_ms": round(percentile(latencies, q) * 1000, 3)
+            for q in (0.5, 0.95, 0.99)
+        },
+    }
+
+
+async def compare_bulk(client, state, items, concurrency):
+    """Items/s creating acts and expenses one request each vs through the bulk routes."""
+    show_id = state.show()
+    results = []
+    kinds = {
+        "acts": [act_payload(show_id, i) for i in range(items)],
+        "expenses": [expense_payload(show_id, None, i) for i in range(items)],
+    }
+    for kind, payloads in kinds.items():
+        pending = iter(payloads)
+
+        async def worker():
+            for payload in pending:
+                await post_ok(client, f"/api/{kind}", payload)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        per_item = items / (time.perf_counter() - start)
+        start = time.perf_counter()
+        await bulk_create(client, f"/api/{kind}/bulk", payloads)
+        bulk = items / (time.perf_counter() - start)
+        results.append({
+            "kind": kind,
+            "items": items,
+            "per_item_items_per_sec": round(per_item, 1),
+            "bulk_items_per_sec": round(bulk, 1),
+            "speedup": round(bulk / per_item, 1),
+        })
+    return results
+
+
+def create_store(args, workdir):
+    if args.mongo_url:
+        client = AsyncIOMotorClient(
+            args.mongo_url,
+            event_listeners=[server.CommandMetrics(), server.PoolMetrics()],
+            **server.mongo_client_options(),
+        )
+        return MongoStorage(
+            client, f"circus_bench_{uuid.uuid4().hex[:8]}", list_read_preference=server.MONGO_LIST_READ_PREFERENCE
+        )
+    if args.storage == "sqlite":
+        from storage.sqlite import SQLiteStorage
+        return SQLiteStorage(Path(workdir) / "bench.db")
+    return MemoryStorage()
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        store = create_store(args, workdir)
+        await server.startup(store)
+        transport = httpx.ASGITransport(app=server.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                state = State(args.seed)
+                started = time.perf_counter()
+                await seed(client, state, args.shows, args.acts, args.expenses)
+                await seed_spares(client, state, args.requests)
+                seeded_in = time.perf_counter() - started
+
+                results = []
+                for entry in ROUTES:
+                    if args.routes and not any(pattern in entry["name"] for pattern in args.routes):
+                        continue
+                    result = await drive(client, state, entry, args.requests, args.concurrency)
+                    print(f"{entry['name']}: p95 {result['p95_ms']}ms, {result['req_per_sec']} req/s", file=sys.stderr)
+                    results.append(result)
+                bulk = await compare_bulk(client, state, args.bulk_items, args.concurrency) if args.bulk_items else []
+                for entry in bulk:
+                    print(
+                        f"{entry['kind']}: {entry['per_item_items_per_sec']} items/s one by one, "
+                        f"{entry['bulk_items_per_sec']} items/s bulk",
+                        file=sys.stderr,
+                    )
+        finally:
+            if args.mongo_url:
+                await store.client.drop_database(store.db.name)
+            await server.shutdown()
+
+    return {
+        "backend": "mongodb" if args.mongo_url else args.storage,
+        "shows": args.shows,
+        "acts_per_show": args.acts,
+        "expenses_per_show": args.expenses,
+        "concurrency": args.concurrency,
+        "seed_seconds": round(seeded_in, 2),
+        "routes": results,
+        "bulk": bulk,
+    }
+
+
+def regressions(report, baseline, threshold):
+    previous = {entry["route"]: entry for entry in baseline["routes"]}
+    found = []
+    for entry in report["routes"]:
+        before = previous.get(entry["route"])
+        if before is None:
+            continue
+        if entry["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            found.append(f"{entry['route']}: p95 {before['p95_ms']}ms -> {entry['p95_ms']}ms")
+        if entry["req_per_sec"] < before["req_per_sec"] * (1 - threshold):
+            found.append(f"{entry['route']}: {before['req_per_sec']} -> {entry['req_per_sec']} req/s")
+        if entry["errors"] > before["errors"]:
+            found.append(f"{entry['route']}: {before['errors']} -> {entry['errors']} errors")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=10)
+    parser.add_argument("--acts", type=int, default=25, help="acts per show")
+    parser.add_argument("--expenses", type=int, default=50, help="expenses per show")
+    parser.add_argument("--requests", type=int, default=100, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--routes", nargs="+", help="only routes containing one of these strings")
+    parser.add_argument("--storage", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--mongo-url", help="benchmark against this MongoDB server instead")
+    parser.add_argument("--bulk-items", type=int, default=500, help="items for the bulk comparison, 0 skips it")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--compare", help="baseline report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+    if args.shows < 1 or args.acts < 1:
+        parser.error("--shows and --acts must be at least 1")
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(report, json.load(f), args.threshold)
+        for line in found:
+            print(f"REGRESSION: {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
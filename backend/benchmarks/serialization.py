@@ -0,0 +1,87 @@
+"""Rows/sec of the act list serialization paths.
+
+Compares the model path (a CircusAct per document, then FastAPI's
+response_model validation and JSONResponse) with the raw-dict path used
+when FAST_SERIALIZATION is on (projected documents encoded by orjson).
+
+    cd backend && python -m benchmarks.serialization [--rows 1000 10000]
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from server import CircusAct, dump_json, fast_rows, parse_from_mongo
+
+list_adapter = TypeAdapter(List[CircusAct])
+
+
+def make_docs(count):
+    show_id = str(uuid.uuid4())
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "show_id": show_id,
+            "name": f"Act {i}",
+            "performers": "The Flying Trapezists",
+            "duration": 5 + i % 20,
+            "sequence_order": (i + 1) * 1024,
+            "description": "Aerial routine over the centre ring",
+            "staging_notes": "Rig trapeze during previous act",
+            "sound_requirements": "Drum roll cue",
+            "lighting_requirements": "Follow spot",
+            # Naive as Mongo returns them, tz-aware as the memory and SQLite backends do
+            "created_at": datetime(2025, 8, 15, 19, 30, i % 60, 123000, tzinfo=timezone.utc if i % 2 else None),
+        }
+        for i in range(count)
+    ]
+
+
+def model_path(docs):
+    models = [CircusAct(**parse_from_mongo(doc)) for doc in docs]
+    # What FastAPI does with a response_model: dump, re-validate, serialize
+    content = list_adapter.validate_python([model.model_dump() for model in models])
+    return JSONResponse(list_adapter.dump_python(content, mode="json")).body
+
+
+def fast_path(docs):
+    return dump_json(fast_rows(CircusAct, docs))
+
+
+def rows_per_second(fn, docs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(docs)
+        best = min(best, time.perf_counter() - start)
+    return len(docs) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.rows:
+        docs = make_docs(count)
+        assert json.loads(model_path(docs)) == json.loads(fast_path(docs))
+        model_rate = rows_per_second(model_path, docs, args.repeat)
+        fast_rate = rows_per_second(fast_path, docs, args.repeat)
+        results.append({
+            "rows": count,
+            "model_rows_per_sec": round(model_rate),
+            "fast_rows_per_sec": round(fast_rate),
+            "speedup": round(fast_rate / model_rate, 1),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
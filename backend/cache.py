@@ -0,0 +1,113 @@
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class Cache(ABC):
+    """Async key/value cache used in front of hot Mongo lookups.
+
+    Values are never None, so get() returning None means a miss. A shared
+    backend (e.g. Redis) implements the same coroutines.
+
+    To fill a miss, take generation(key) before reading the database and
+    pass it to set() as since: the set is skipped if the key was set or
+    deleted meanwhile, so a write's invalidation is never overwritten with
+    what was read before it.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    async def get(self, key):
+        ...
+
+    @abstractmethod
+    async def generation(self, key):
+        ...
+
+    @abstractmethod
+    async def set(self, key, value, since=None):
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys):
+        ...
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class NullCache(Cache):
+    """Cache that stores nothing; every lookup goes to the database."""
+
+    async def get(self, key):
+        self.misses += 1
+        return None
+
+    async def generation(self, key):
+        return None
+
+    async def set(self, key, value, since=None):
+        pass
+
+    async def delete(self, *keys):
+        pass
+
+
+class MemoryCache(Cache):
+    """In-process LRU cache whose entries expire ttl seconds after being set."""
+
+    # Generations are counted per bucket of keys, so they take fixed memory;
+    # keys sharing a bucket at worst skip a fill
+    GENERATION_BUCKETS = 4096
+
+    def __init__(self, max_entries=10000, ttl=30.0):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._generations = [0] * self.GENERATION_BUCKETS
+
+    def _bucket(self, key):
+        return zlib.crc32(key.encode()) % self.GENERATION_BUCKETS
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def generation(self, key):
+        return self._generations[self._bucket(key)]
+
+    async def set(self, key, value, since=None):
+        bucket = self._bucket(key)
+        if since is not None and self._generations[bucket] != since:
+            return
+        self._generations[bucket] += 1
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys):
+        for key in keys:
+            self._generations[self._bucket(key)] += 1
+            self._entries.pop(key, None)
+
+    def stats(self):
+        return {**super().stats(), "entries": len(self._entries)}
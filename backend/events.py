@@ -0,0 +1,100 @@
+import asyncio
+import itertools
+import uuid
+from collections import defaultdict, deque
+
+
+class Subscription:
+    """One listener's queue of events for a single show."""
+
+    def __init__(self, show_id, max_queued):
+        self.show_id = show_id
+        # One slot stays free for the resync marker
+        self._queue = asyncio.Queue(max_queued + 1)
+        self._max_queued = max_queued
+
+    def _put(self, event):
+        if self._queue.qsize() >= self._max_queued:
+            # Too far behind to catch up event by event
+            self.resync()
+        else:
+            self._queue.put_nowait(event)
+
+    def resync(self):
+        # Replaces whatever is queued with one marker telling the client to
+        # refetch; events published afterwards are delivered as usual
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait({"id": None, "type": "resync", "show_id": self.show_id, "data": None})
+
+    async def get(self, timeout=None):
+        """Next event, or None when nothing arrived within timeout seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """In-process fan-out of per-show change events.
+
+    Event ids are "<epoch>-<n>", n increasing across all shows. The last
+    `history` events are kept so a client reconnecting with Last-Event-ID
+    gets what it missed; when they are gone, or the id comes from another
+    process, it gets a "resync" event (refetch, then keep listening)
+    instead. So does a subscriber that falls max_queued events behind.
+    """
+
+    def __init__(self, history=1000, max_queued=1000):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._ids = itertools.count(1)
+        self._history = deque(maxlen=history)
+        self._max_queued = max_queued
+        self._subscribers = defaultdict(set)
+
+    def publish(self, show_id, type, data):
+        event = {"id": f"{self.epoch}-{next(self._ids)}", "type": type, "show_id": show_id, "data": data}
+        self._history.append(event)
+        for subscription in list(self._subscribers.get(show_id, ())):
+            subscription._put(event)
+        return event
+
+    def subscribe(self, show_id, last_event_id=None):
+        subscription = Subscription(show_id, self._max_queued)
+        self._subscribers[show_id].add(subscription)
+        if last_event_id:
+            missed = self._since(last_event_id)
+            if missed is None:
+                subscription.resync()
+            for event in missed or ():
+                if event["show_id"] == show_id:
+                    subscription._put(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscribers = self._subscribers.get(subscription.show_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.show_id]
+
+    def resync_all(self):
+        """Tell every subscriber to refetch, e.g. after events may have been lost."""
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription.resync()
+
+    def subscriber_count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _since(self, last_event_id):
+        # Events after last_event_id, or None if some may have been dropped
+        epoch, _, n = last_event_id.partition("-")
+        if epoch != self.epoch or not n.isdigit():
+            return None
+        n = int(n)
+        events = [event for event in self._history if int(event["id"].partition("-")[2]) > n]
+        oldest = int(self._history[0]["id"].partition("-")[2]) if self._history else None
+        if oldest is not None and oldest > n + 1 and len(self._history) == self._history.maxlen:
+            return None
+        return events
@@ -0,0 +1,66 @@
+import asyncio
+
+import typer
+
+import server
+
+cli = typer.Typer(help="Circus Show Management maintenance commands")
+
+def run(command, *args, **kwargs):
+    # Run command(store, ...) against the configured storage backend
+    async def main():
+        store = server.create_store()
+        await store.open()
+        try:
+            return await command(store, *args, **kwargs)
+        finally:
+            await store.close()
+    return asyncio.run(main())
+
+@cli.command("ensure-indexes")
+def ensure_indexes():
+    """Create the indexes every route relies on."""
+    run(lambda store: store.ensure_indexes())
+    typer.echo("Indexes created")
+
+@cli.command("verify-indexes")
+def verify_indexes():
+    """Explain each route's query shape and fail if any does a COLLSCAN."""
+    collscans = run(lambda store: store.find_collscans())
+    for route, collection, query, sort in collscans:
+        typer.echo(f"COLLSCAN: {route} on {collection} filter={query} sort={sort}", err=True)
+    if collscans:
+        raise typer.Exit(code=1)
+    typer.echo("All query shapes use an index")
+
+@cli.command("reconcile-rollups")
+def reconcile_rollups(fix: bool = typer.Option(False, help="Write the recomputed rollups back")):
+    """Recompute show rollups from acts and expenses and report drift."""
+    drifted = run(server.reconcile_rollups, fix=fix)
+    for show_id, fields in drifted.items():
+        for field, values in fields.items():
+            typer.echo(f"{show_id} {field}: stored={values['stored']} actual={values['actual']}")
+    typer.echo(f"{len(drifted)} show(s) drifted" + (", fixed" if fix and drifted else ""))
+
+@cli.command("backfill-performers")
+def backfill_performers():
+    """Derive the indexed performer_keys field for acts stored before it existed."""
+    updated = run(server.backfill_performer_keys)
+    typer.echo(f"Updated {updated} act(s)")
+
+@cli.command("migrate-show-dates")
+def migrate_show_dates(clear_invalid: bool = typer.Option(False, help="Clear dates that are not ISO dates")):
+    """Store show dates saved as ISO strings as dates, so calendar queries find them."""
+    updated, invalid = run(server.migrate_show_dates, clear_invalid=clear_invalid)
+    for show_id, value in invalid.items():
+        typer.echo(f"{show_id}: not an ISO date: {value!r}" + (", cleared" if clear_invalid else ""), err=True)
+    typer.echo(f"Updated {updated} show(s)")
+
+@cli.command("sweep-orphans")
+def sweep_orphans():
+    """Purge acts and expenses whose show no longer exists."""
+    swept = run(server.sweep_orphans)
+    typer.echo(f"Swept {swept} show(s)")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,120 @@
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+# Innermost matching frame decides where a sample's time is charged
+CATEGORIES = (
+    ("mongo", ("/pymongo/", "/motor/", "/bson/")),
+    ("pydantic", ("/pydantic/", "/pydantic_core/")),
+)
+
+
+def _category(stack):
+    for filename, _, _ in reversed(stack):
+        for name, markers in CATEGORIES:
+            if any(marker in filename for marker in markers):
+                return name
+    return "app"
+
+
+def _is_idle(stack):
+    # Executor threads parked on their work queue
+    filename, function, _ = stack[-1]
+    return function in ("wait", "get", "_worker") and (
+        filename.endswith("threading.py") or filename.endswith("queue.py") or "concurrent/futures" in filename
+    )
+
+
+class SamplingProfiler:
+    """Samples the event loop thread and the Motor executor threads.
+
+    Stacks are taken every `interval` seconds from sys._current_frames(), so
+    nothing is traced between samples. Concurrent requests running on the
+    same loop show up in the profile too.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = {"event-loop": Counter(), "mongo-executor": Counter()}
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident == self._loop_thread:
+                    group = "event-loop"
+                elif names.get(ident, "").startswith("ThreadPoolExecutor"):
+                    group = "mongo-executor"
+                else:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_name, frame.f_lineno))
+                    frame = frame.f_back
+                stack.reverse()
+                if group == "mongo-executor" and _is_idle(stack):
+                    continue
+                self.samples[group][tuple(stack)] += 1
+
+    def summary(self):
+        """Sampled seconds per category (mongo, pydantic, app) across all threads."""
+        totals = Counter()
+        for samples in self.samples.values():
+            for stack, count in samples.items():
+                totals[_category(stack)] += count * self.interval
+        return {name: round(totals[name], 6) for name in ("mongo", "pydantic", "app")}
+
+    def collapsed(self):
+        lines = []
+        for group, samples in self.samples.items():
+            for stack, count in samples.items():
+                frames = [f"{function} ({Path(filename).name}:{line})" for filename, function, line in stack]
+                lines.append(";".join([group] + frames) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name):
+        frames, index = [], {}
+        profiles = []
+        for group, samples in self.samples.items():
+            stacks, weights = [], []
+            for stack, count in samples.items():
+                ids = []
+                for filename, function, line in stack:
+                    key = (filename, function, line)
+                    if key not in index:
+                        index[key] = len(frames)
+                        frames.append({"name": function, "file": filename, "line": line})
+                    ids.append(index[key])
+                stacks.append(ids)
+                weights.append(count * self.interval)
+            profiles.append({
+                "type": "sampled",
+                "name": group,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "circus-profiler",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
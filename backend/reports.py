@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+EXPENSE_FIELDS = ["show_id", "category", "amount", "date"]
+ACT_FIELDS = ["show_id", "duration"]
+SHOW_FIELDS = ["id", "title", "date", "venue"]
+
+
+def _month_index(dates):
+    # Months since year 0, so consecutive months are one apart
+    return dates.dt.year * 12 + dates.dt.month - 1
+
+
+def _format_month(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _combine(partials, keys):
+    # Per-batch sums and counts, added up across batches
+    if not partials:
+        return pd.DataFrame(columns=keys + ["sum", "count"])
+    return pd.concat(partials).groupby(level=keys, sort=False, dropna=False).sum().reset_index()
+
+
+def _ratio(numerator, denominator):
+    # numerator / denominator, NaN where the denominator is zero
+    numerator = np.asarray(numerator, dtype="float64")
+    denominator = np.asarray(denominator, dtype="float64")
+    return np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan), where=denominator > 0)
+
+
+def _columns(batch, fields):
+    # Column lists straight from the documents: much cheaper than DataFrame.from_records
+    return pd.DataFrame({field: [doc.get(field) for doc in batch] for field in fields}, columns=fields)
+
+
+def _records(frame):
+    # Plain Python values, with None for missing ones
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+class ExpenseReportBuilder:
+    """Cost analytics over every act and expense, fed one batch at a time.
+
+    Each batch is reduced to sums and counts by (show, category, month) or
+    by show as soon as it arrives, so memory grows with the number of
+    groups rather than documents; result() combines them.
+    """
+
+    def __init__(self):
+        self._expenses = []
+        self._acts = []
+
+    def add_expenses(self, batch):
+        frame = _columns(batch, EXPENSE_FIELDS)
+        # NaN for expenses without a (valid) date of their own; result() falls back to the show's
+        frame["month"] = _month_index(pd.to_datetime(frame["date"], format="%Y-%m-%d", errors="coerce"))
+        frame["amount"] = pd.to_numeric(frame["amount"])
+        groups = frame.groupby(["show_id", "category", "month"], sort=False, dropna=False)
+        self._expenses.append(groups["amount"].agg(["sum", "count"]))
+
+    def add_acts(self, batch):
+        frame = _columns(batch, ACT_FIELDS)
+        self._acts.append(frame.groupby("show_id", sort=False)["duration"].agg(["sum", "count"]))
+
+    def result(self, shows):
+        """The report for the given shows (dicts with SHOW_FIELDS); other shows' data is left out."""
+        shows = _columns(shows, SHOW_FIELDS).set_index("id")
+        expenses = _combine(self._expenses, ["show_id", "category", "month"])
+        expenses = expenses[expenses["show_id"].isin(shows.index)]
+        acts = _combine(self._acts, ["show_id"]).set_index("show_id")
+
+        by_show = shows.rename_axis("show_id")
+        totals = expenses.groupby("show_id")[["sum", "count"]].sum()
+        by_show["expense_total"] = totals["sum"].reindex(by_show.index, fill_value=0).astype("float64")
+        by_show["expense_count"] = totals["count"].reindex(by_show.index, fill_value=0).astype("int64")
+        by_show["stage_minutes"] = acts["sum"].reindex(by_show.index, fill_value=0).astype("int64")
+        by_show["act_count"] = acts["count"].reindex(by_show.index, fill_value=0).astype("int64")
+        by_show["cost_per_minute"] = _ratio(by_show["expense_total"], by_show["stage_minutes"])
+        by_show = by_show.reset_index().sort_values(["date", "title", "show_id"], na_position="last")
+
+        expense_total = float(by_show["expense_total"].sum())
+        stage_minutes = int(by_show["stage_minutes"].sum())
+
+        by_category = expenses.groupby("category")[["sum", "count"]].sum().reset_index()
+        by_category = by_category.rename(columns={"sum": "amount"})
+        by_category = by_category.sort_values(["amount", "category"], ascending=[False, True])
+        by_category["share"] = _ratio(by_category["amount"], np.full(len(by_category), expense_total))
+
+        # Expenses dated neither themselves nor through their show are left out of the trend
+        show_months = _month_index(pd.to_datetime(shows["date"], errors="coerce"))
+        months = expenses["month"].fillna(expenses["show_id"].map(show_months))
+        by_month = expenses.groupby(months)[["sum", "count"]].sum().rename(columns={"sum": "amount"})
+        if len(by_month):
+            # Months without expenses count as zero, so each change is against the month before
+            by_month = by_month.reindex(range(int(by_month.index.min()), int(by_month.index.max()) + 1), fill_value=0)
+        by_month["change"] = by_month["amount"].pct_change(fill_method=None).replace([np.inf, -np.inf], np.nan)
+        by_month.index = [_format_month(int(month)) for month in by_month.index]
+        by_month = by_month.rename_axis("month").reset_index()
+
+        return {
+            "expense_total": expense_total,
+            "expense_count": int(by_show["expense_count"].sum()),
+            "stage_minutes": stage_minutes,
+            "cost_per_minute": expense_total / stage_minutes if stage_minutes else None,
+            "by_show": _records(by_show),
+            "by_category": _records(by_category),
+            "by_month": _records(by_month),
+        }
@@ -0,0 +1,179 @@
+import bisect
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+WORD = re.compile(r"\w+")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+# A query walks this many documents of a weight group in id order, past its
+# limit, before it splits documents into classes of equal score instead; it
+# scores sets of FEW documents or fewer one by one rather than split them
+WALK = 64
+FEW = 16
+
+
+def stem(word):
+    # Strips the commonest English suffixes, so "lights" and "lighting" both match "light"
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    return [stem(word) for word in WORD.findall(text.casefold()) if word not in STOP_WORDS]
+
+
+def search_terms(text):
+    """The terms of text as one space-separated string, for indexes that split on spaces (SQLite FTS5)."""
+    return None if text is None else " ".join(tokenize(text))
+
+
+class InvertedIndex:
+    """In-process full-text index over weighted document fields.
+
+    A document scores, for each query term it contains, the weights of
+    the fields the term appears in (damped by 1 + log of the count there)
+    times the term's idf. Ties go to the smallest id.
+
+    Postings group a term's documents by that weight, both as a set and
+    sorted by id. A query visits the groups of its terms best first and
+    walks each in id order, scoring documents from the forward index, so
+    a common word whose documents tie costs a few of them rather than
+    all. Where they score too unevenly for that, it splits the documents
+    into classes of equal score with set operations instead. Either way
+    it stops once the terms' maximum scores show that nothing left could
+    make the top limit.
+    """
+
+    def __init__(self, weights):
+        self.weights = weights
+        self._postings = defaultdict(dict)  # term -> {weight: doc ids}
+        self._ordered = defaultdict(dict)  # term -> {weight: doc ids, sorted}
+        self._having = defaultdict(set)  # term -> doc ids
+        self._docs = {}  # doc_id -> {term: weight}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id, doc):
+        self.remove(doc_id)
+        weights = Counter()
+        for field, weight in self.weights.items():
+            for term, count in Counter(tokenize(doc.get(field) or "")).items():
+                weights[term] += weight * (1 + math.log(count))
+        for term, weight in weights.items():
+            self._postings[term].setdefault(weight, set()).add(doc_id)
+            bisect.insort(self._ordered[term].setdefault(weight, []), doc_id)
+            self._having[term].add(doc_id)
+        self._docs[doc_id] = dict(weights)
+
+    def remove(self, doc_id):
+        for term, weight in self._docs.pop(doc_id, {}).items():
+            groups, ordered = self._postings[term], self._ordered[term]
+            groups[weight].discard(doc_id)
+            del ordered[weight][bisect.bisect_left(ordered[weight], doc_id)]
+            self._having[term].discard(doc_id)
+            if not groups[weight]:
+                del groups[weight], ordered[weight]
+            if not groups:
+                del self._postings[term], self._ordered[term], self._having[term]
+
+    def search(self, query, limit, within=None):
+        """Up to limit (doc_id, score) pairs, best first; within limits matches to a set of doc ids."""
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self._postings]
+        if not terms or limit <= 0:
+            return []
+        idfs = {term: math.log(1 + len(self._docs) / len(self._having[term])) for term in terms}
+
+        # Scores always add up term by term in query order, so that a bound
+        # made of larger parts never rounds below a score it covers
+        def score(doc_id):
+            weights = self._docs[doc_id]
+            return sum(idfs[term] * weights[term] for term in terms if term in weights)
+
+        if within is not None:
+            hits = ((-score(doc_id), doc_id) for doc_id in within if doc_id in self._docs)
+            return [(doc_id, -negative) for negative, doc_id in heapq.nsmallest(limit, (hit for hit in hits if hit[0]))]
+
+        top = []  # (-score, doc_id) of the best documents so far, in order
+
+        def beaten(negative, doc_id=""):
+            # Whether a document scoring at most -negative, with an id from doc_id on, misses the top
+            return len(top) == limit and (negative, doc_id) > top[-1]
+
+        def offer(negative, doc_ids):
+            for doc_id in doc_ids:
+                hit = (negative, doc_id)
+                position = bisect.bisect_left(top, hit)
+                if position < limit and top[position:position + 1] != [hit]:
+                    top.insert(position, hit)
+                    del top[limit:]
+
+        ranked = {  # term -> its (score, weight) groups, best first
+            term: sorted(((idfs[term] * weight, weight) for weight in self._postings[term]), reverse=True)
+            for term in terms
+        }
+
+        def split(ids, known, partial):
+            # Offers the documents that score known (term -> score, 0 where absent) on the first terms of
+            # order, about partial in all, telling them apart by the rest; ids None stands for every such one
+            depth = len(known)
+            if depth == len(order):
+                if partial:  # else ids is None: documents with none of the terms
+                    offer(-sum(known[term] for term in terms), heapq.nsmallest(limit, ids))
+            elif ids is not None and len(ids) <= FEW:
+                for doc_id in ids:
+                    offer(-score(doc_id), [doc_id])
+            else:
+                term = order[depth]
+                absent = [self._having[other] for other, value in known.items() if not value]
+                for group_score, weight in ranked[term]:
+                    if group_score > cap[term]:
+                        continue  # scored already, or out of the running
+                    # Allowing for rounding, since partial adds up in another order than the scores
+                    if beaten(-(partial + group_score + tails[depth + 1]) * (1 + 1e-9)):
+                        return  # nor can any lower group, or the documents without the term
+                    members = self._postings[term][weight]
+                    part = members.difference(*absent) if ids is None else ids & members
+                    if part:
+                        split(part, {**known, term: group_score}, partial + group_score)
+                if not beaten(-(partial + tails[depth + 1]) * (1 + 1e-9)):
+                    split(None if ids is None else ids - self._having[term], {**known, term: 0.0}, partial)
+
+        groups = sorted(((score, term, weight) for term in terms for score, weight in ranked[term]), reverse=True)
+        left = Counter(term for _, term, _ in groups)  # term -> groups not visited yet
+        ceiling = {term: ranked[term][0][0] for term in terms}  # term -> most it adds to a document not scored yet
+        scored = set()
+        for group_score, term, weight in groups:
+            ceiling[term] = group_score
+            # Nothing in this group or after it scores more than this
+            bound = -sum(ceiling.values())
+            if beaten(bound):
+                break
+            ids = self._ordered[term][weight]
+            for position, doc_id in enumerate(ids):
+                if beaten(bound, doc_id):
+                    # Nor does anything later in the group beat the last hit on id
+                    break
+                if position == limit + WALK:
+                    # Scores differ too much for the bound to stop the walk. Documents not scored yet in
+                    # the groups visited can't make the top, so with those groups set aside, and the top
+                    # so far to prune against, split every document into classes of equal score instead
+                    cap = {other: min(most, group_score) for other, most in ceiling.items()}
+                    order = sorted(terms, key=cap.get, reverse=True)
+                    tails = [sum(cap[other] for other in order[depth:]) for depth in range(len(order) + 1)]
+                    split(None, {}, 0.0)
+                    return [(doc_id, -negative) for negative, doc_id in top]
+                if doc_id not in scored:
+                    scored.add(doc_id)
+                    offer(-score(doc_id), [doc_id])
+            left[term] -= 1
+            if not left[term]:
+                ceiling[term] = 0.0
+        return [(doc_id, -negative) for negative, doc_id in top]
@@ -1,55 +1,850 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+import asyncio
+import base64
+import csv
+import functools
+import hashlib
+import hmac
+import inspect
+import io
+import itertools
+import orjson
 import os
+import re
 import logging
+import tempfile
+import threading
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, BeforeValidator, Field, StringConstraints, ValidationError, model_validator
+from typing import Annotated, Dict, List, Optional
+import math
 import uuid
-from datetime import datetime, timezone, date, time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone, date, time, timedelta
+from time import perf_counter
+from cache import MemoryCache, NullCache
+from events import EventBus
+from metrics import Counter, Gauge, Histogram, Registry
+from profiling import SamplingProfiler
+from reports import ACT_FIELDS, EXPENSE_FIELDS, SHOW_FIELDS, ExpenseReportBuilder
+from storage import MemoryStorage, MongoStorage, Storage
+from storage.base import TIMELINE_FIELDS, apply_inc, category_key, category_totals, timeline_rows
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Prometheus metrics served at /metrics
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+registry = Registry()
+REQUEST_LATENCY = Histogram(
+    registry, "circus_http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(registry, "circus_http_requests_in_flight", "HTTP requests being handled.")
+EVENT_STREAMS_OPEN = Gauge(registry, "circus_event_streams_open", "Server-Sent Event streams open.")
+RESPONSE_SIZE = Histogram(
+    registry, "circus_http_response_size_bytes", "HTTP response body size by route.",
+    ("method", "route"), SIZE_BUCKETS,
+)
+MONGO_COMMANDS = Counter(registry, "circus_mongo_commands_total", "Mongo commands by outcome.", ("command", "outcome"))
+MONGO_DURATION = Histogram(
+    registry, "circus_mongo_command_duration_seconds", "Mongo command latency.", ("command",), LATENCY_BUCKETS
+)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005) + LATENCY_BUCKETS
+POOL_CHECKOUT_WAIT = Histogram(
+    registry, "circus_mongo_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.",
+    ("outcome",), POOL_WAIT_BUCKETS,
+)
+POOL_CONNECTIONS = Gauge(registry, "circus_mongo_pool_connections", "Open pooled Mongo connections.")
+POOL_CHECKED_OUT = Gauge(registry, "circus_mongo_pool_checked_out", "Pooled Mongo connections in use.")
+
+# (command name, seconds) for each Mongo command issued while handling the
+# current request. Motor runs pymongo calls with a copy of the caller's
+# context, so the listener sees the list installed by the request middleware.
+db_round_trips: ContextVar[Optional[list]] = ContextVar("db_round_trips", default=None)
+
+class CommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _record(self, event, outcome):
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMANDS.inc(command=event.command_name, outcome=outcome)
+        MONGO_DURATION.observe(seconds, command=event.command_name)
+        _record_call(event.command_name, seconds)
+
+def _record_call(name, seconds):
+    calls = db_round_trips.get()
+    if calls is not None:
+        calls.append((name, seconds))
+
+async def _counted_iter(name, iterator):
+    start = perf_counter()
+    try:
+        async for item in iterator:
+            yield item
+    finally:
+        _record_call(name, perf_counter() - start)
+
+class CountedStorage:
+    """A storage backend whose calls are recorded in db_round_trips.
+
+    Stands in for CommandMetrics on backends that issue no Mongo commands:
+    each call of the storage or one of its repositories counts as one round
+    trip (a cursor once it is exhausted), so request budgets read the same
+    on every backend. Calls a backend makes internally are not counted.
+    """
+
+    def __init__(self, target, prefix=""):
+        self._target = target
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name in ("shows", "acts", "expenses"):
+            return CountedStorage(value, f"{name}.")
+        if name.startswith("_") or not callable(value):
+            return value
+        label = self._prefix + name
+        if inspect.iscoroutinefunction(value):
+            async def call(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return await value(*args, **kwargs)
+                finally:
+                    _record_call(label, perf_counter() - start)
+        else:
+            def call(*args, **kwargs):
+                result = value(*args, **kwargs)
+                return _counted_iter(label, result) if hasattr(result, "__aiter__") else result
+        return functools.wraps(value)(call)
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    # A checkout starts and ends on the same pymongo worker thread, so the
+    # start time is kept per thread
+    _checkout = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._checkout.started = perf_counter()
+
+    def connection_checked_out(self, event):
+        self._observe_wait("success")
+        POOL_CHECKED_OUT.inc()
+
+    def connection_check_out_failed(self, event):
+        # reason is "timeout" when waitQueueTimeoutMS ran out
+        self._observe_wait(event.reason)
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.dec()
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS.inc()
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS.dec()
+
+    def _observe_wait(self, outcome):
+        started = getattr(self._checkout, "started", None)
+        if started is not None:
+            POOL_CHECKOUT_WAIT.observe(perf_counter() - started, outcome=outcome)
+            self._checkout.started = None
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+# Storage backend: "mongo" (MONGO_URL, DB_NAME), "memory", or "sqlite"
+# (a single database file at SQLITE_PATH)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
+SQLITE_PATH = os.environ.get('SQLITE_PATH', str(ROOT_DIR / 'circus.db'))
+
+# Motor client options; unset ones keep the pymongo (or MONGO_URL) defaults.
+# MONGO_COMPRESSORS is a comma-separated preference list such as
+# "zstd,snappy,zlib" (zstd needs zstandard, snappy needs python-snappy).
+MONGO_CLIENT_OPTIONS = {
+    'maxPoolSize': ('MONGO_MAX_POOL_SIZE', int),
+    'minPoolSize': ('MONGO_MIN_POOL_SIZE', int),
+    'maxIdleTimeMS': ('MONGO_MAX_IDLE_TIME_MS', int),
+    'waitQueueTimeoutMS': ('MONGO_WAIT_QUEUE_TIMEOUT_MS', int),
+    'serverSelectionTimeoutMS': ('MONGO_SERVER_SELECTION_TIMEOUT_MS', int),
+    'connectTimeoutMS': ('MONGO_CONNECT_TIMEOUT_MS', int),
+    'socketTimeoutMS': ('MONGO_SOCKET_TIMEOUT_MS', int),
+    'compressors': ('MONGO_COMPRESSORS', str),
+}
+
+# Read preference for paginated and streamed lists and exports, e.g.
+# "secondaryPreferred". Those reads may lag the primary by the replication
+# delay; cached lists, ETag versions and everything else read the primary.
+MONGO_LIST_READ_PREFERENCE = os.environ.get('MONGO_LIST_READ_PREFERENCE', 'primary')
+
+def mongo_client_options():
+    return {
+        option: convert(os.environ[name])
+        for option, (name, convert) in MONGO_CLIENT_OPTIONS.items()
+        if os.environ.get(name)
+    }
+
+def create_store():
+    if STORAGE_BACKEND == 'memory':
+        return MemoryStorage()
+    if STORAGE_BACKEND == 'sqlite':
+        from storage.sqlite import SQLiteStorage
+        return SQLiteStorage(SQLITE_PATH)
+    client = AsyncIOMotorClient(
+        os.environ['MONGO_URL'], event_listeners=[CommandMetrics(), PoolMetrics()], **mongo_client_options()
+    )
+    return MongoStorage(client, os.environ['DB_NAME'], list_read_preference=MONGO_LIST_READ_PREFERENCE)
+
+# Built by the lifespan handler (see startup)
+store: Optional[Storage] = None
+
+def get_store() -> Storage:
+    return store
+
+# Deleted shows are hidden at once; "background" purges their acts and
+# expenses on a worker, "inline" purges them before the request returns
+SHOW_PURGE_MODE = os.environ.get('SHOW_PURGE_MODE', 'background')
+PURGE_BATCH_SIZE = int(os.environ.get('PURGE_BATCH_SIZE', '1000'))
+PURGE_WORKERS = int(os.environ.get('PURGE_WORKERS', '1'))
+PURGE_QUEUE_SIZE = int(os.environ.get('PURGE_QUEUE_SIZE', '100'))
+ORPHAN_SWEEP_INTERVAL = int(os.environ.get('ORPHAN_SWEEP_INTERVAL', '600'))  # seconds, 0 disables
+
+# Read cache in front of show lookups and per-show act/expense lists
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # "memory" or "none"
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '10000'))
+CACHE_TTL = float(os.environ.get('CACHE_TTL', '30'))
+
+# List endpoints project only schema fields and encode raw rows with orjson
+# instead of building and re-validating a Pydantic model per document
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', 'true').lower() == 'true'
+
+# Largest array accepted by the bulk create endpoints
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', '1000'))
+
+# Documents per insert_many when importing a show
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '1000'))
+
+# Report each request's storage round trips in X-DB-Round-Trips (for tests):
+# Mongo commands, or storage calls on the other backends (see CountedStorage)
+EXPOSE_DB_ROUND_TRIPS = os.environ.get('EXPOSE_DB_ROUND_TRIPS', 'false').lower() == 'true'
+
+# Log requests slower than this, with the Mongo commands they issued; 0 disables
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '0'))
+
+# Requests sent with ?profile=1 (or X-Profile: 1) and X-Admin-Token matching
+# PROFILE_TOKEN are sampled; without a token the profiler is not installed.
+# The value picks the output format; 0, false, no, off and unknown values
+# leave the request unprofiled.
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+PROFILE_FORMATS = {
+    "1": "speedscope", "true": "speedscope", "yes": "speedscope", "on": "speedscope",
+    "speedscope": "speedscope", "collapsed": "collapsed",
+}
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', Path(tempfile.gettempdir()) / 'circus-profiles'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '1'))
+
+# Change events streamed at /api/shows/{id}/events. "local" publishes from
+# this process's write routes; "changestream" follows a Mongo change stream
+# instead (replica set and MongoDB 6.0+), so writes made by other instances
+# reach this one's subscribers too
+EVENT_SOURCE = os.environ.get('EVENT_SOURCE', 'local')
+EVENT_HISTORY = int(os.environ.get('EVENT_HISTORY', '1000'))  # events kept for Last-Event-ID replay
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', '1000'))  # per subscriber, then resync
+EVENT_KEEPALIVE = float(os.environ.get('EVENT_KEEPALIVE', '15'))  # seconds between idle comments
+
+# Documents per batch streamed into the expense report
+REPORT_BATCH_SIZE = int(os.environ.get('REPORT_BATCH_SIZE', '50000'))
+
+cache = MemoryCache(CACHE_MAX_ENTRIES, CACHE_TTL) if CACHE_BACKEND == 'memory' else NullCache()
+events = EventBus(EVENT_HISTORY, EVENT_QUEUE_SIZE)
+
+def _cache_metrics():
+    stats = cache.stats()
+    return [
+        (f"circus_cache_{name}_total" if name != "entries" else "circus_cache_entries",
+         "counter" if name != "entries" else "gauge",
+         f"Read cache {name}.",
+         value)
+        for name, value in stats.items()
+    ]
+
+registry.add_collector(_cache_metrics)
+registry.add_collector(lambda: [
+    ("circus_event_subscribers", "gauge", "Open change event streams.", events.subscriber_count()),
+])
+
+@asynccontextmanager
+async def lifespan(app):
+    # The store, and with it the Motor client and its pool, is built on the
+    # server's event loop rather than at import
+    await startup(create_store())
+    try:
+        yield
+    finally:
+        await shutdown()
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Helper functions for MongoDB date handling
+def date_to_mongo(value):
+    # BSON has no date-only type, so a date is stored as midnight UTC
+    return datetime.combine(value, time.min, tzinfo=timezone.utc)
+
 def prepare_for_mongo(data):
-    if isinstance(data.get('date'), date):
-        data['date'] = data['date'].isoformat()
+    if isinstance(data.get('date'), date) and not isinstance(data['date'], datetime):
+        data['date'] = date_to_mongo(data['date'])
     if isinstance(data.get('time'), time):
         data['time'] = data['time'].strftime('%H:%M:%S')
     return data
 
 def parse_from_mongo(item):
-    # Keep dates as strings since Pydantic models expect string dates
-    # Only convert if we need time objects (which we don't currently use)
+    # Stored dates come back as datetimes; the models and the JSON carry the date alone.
+    # Converted on a copy: item may be a cached document other routes query with.
+    if isinstance(item.get('date'), datetime):
+        item = {**item, 'date': item['date'].date()}
+    # Rollup keys are stored encoded (see category_key)
+    if isinstance(item.get('expenses_by_category'), dict):
+        item = {**item, 'expenses_by_category': category_totals(item['expenses_by_category'])}
     return item
 
+# Acts are spaced SEQUENCE_GAP apart so a move only rewrites the moved act
+SEQUENCE_GAP = 1024
+
+MAX_PAGE_SIZE = 1000
+
+def _parse_cursor(after, field):
+    # Cursor from _format_cursor -> (value, id), where value is the repository's cursor field
+    try:
+        if "," not in after:
+            # Cursors are opaque base64url; "," only appears in the older plain form
+            after = base64.urlsafe_b64decode(after + "=" * (-len(after) % 4)).decode()
+        value, last_id = after.rsplit(",", 1)
+        if field == "created_at":
+            value = datetime.fromisoformat(value)
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+        elif field == "date":
+            value = date_to_mongo(date.fromisoformat(value))
+        else:
+            value = int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, last_id
+
+def _format_cursor(doc, field):
+    value = doc[field]
+    if field == "date" and isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    # base64url without padding: the ISO offset's "+" would need escaping in a query string
+    return base64.urlsafe_b64encode(f"{value},{doc['id']}".encode()).decode().rstrip("=")
+
+def schema_fields(model):
+    return list(model.model_fields)
+
+@functools.lru_cache(maxsize=None)
+def _field_defaults(model):
+    # Every schema field in declaration order; fields without a plain default
+    # are always present in stored documents and get overwritten
+    return {
+        name: None if field.is_required() or field.default_factory else field.default
+        for name, field in model.model_fields.items()
+    }
+
+def _fast_row(defaults, doc):
+    row = {**defaults, **parse_from_mongo(doc)}
+    if "performer_keys" in defaults:
+        # Derived as CircusAct's validator does, so acts stored before the
+        # field existed (or not yet backfilled) read the same on both paths
+        row["performer_keys"] = parse_performers(row["performers"])
+    if "expenses_by_category" in defaults:
+        # A show: its date read as Show reads it (see StoredShowDate)
+        row["date"] = read_show_date(row["date"])
+    return row
+
+def fast_rows(model, docs):
+    """Fill schema defaults into projected Mongo documents without validating them."""
+    defaults = _field_defaults(model)
+    return [_fast_row(defaults, doc) for doc in docs]
+
+def dump_json(content):
+    # UTC datetimes end in "Z", as Pydantic writes them on the model path, not orjson's "+00:00"
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+def serialize_rows(response, model, docs):
+    if not FAST_SERIALIZATION:
+        return [model(**parse_from_mongo(doc)) for doc in docs]
+    # Returned directly, so carry over headers already set on the injected response
+    return Response(dump_json(fast_rows(model, docs)), media_type="application/json", headers=dict(response.headers))
+
+async def _ndjson_lines(cursor, model):
+    defaults = _field_defaults(model)
+    async for doc in cursor:
+        if FAST_SERIALIZATION:
+            yield dump_json(_fast_row(defaults, doc)) + b"\n"
+        else:
+            yield model(**parse_from_mongo(doc)).model_dump_json() + "\n"
+
+async def invalidate(show_id, *kinds):
+    # kinds: "show", "show_exists", "acts", "expenses", "timeline"
+    await cache.delete(*(f"{kind}:{show_id}" for kind in kinds))
+
+def publish(show_id, type, data):
+    # With EVENT_SOURCE=changestream the change stream publishes instead
+    if EVENT_SOURCE == 'local':
+        events.publish(show_id, type, data)
+
+async def cached_show(store, show_id, version):
+    # Cached as (show version, document) like the timeline; a show that changed
+    # after version was read comes back (and is cached) as of its newer version
+    key = f"show:{show_id}"
+    entry = await cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    since = await cache.generation(key)
+    show = await store.shows.get(show_id)
+    if show:
+        await cache.set(key, (show.get("version", 0), show), since=since)
+    return show
+
+async def remember_show(show):
+    # Write-through for routes whose write returned the whole show
+    await cache.set(f"show:{show['id']}", (show.get("version", 0), show))
+
+async def show_exists(store, show_id):
+    # Cached apart from the show itself so rollup updates don't evict it
+    key = f"show_exists:{show_id}"
+    if await cache.get(key):
+        return True
+    since = await cache.generation(key)
+    exists = await store.shows.exists(show_id)
+    if exists:
+        await cache.set(key, True, since=since)
+    return exists
+
+def _timeline_order(row):
+    return row["sequence_order"], row["id"]
+
+async def show_timeline(store, show_id, version):
+    # Cached as (show version, rows); an entry from another version is a miss
+    key = f"timeline:{show_id}"
+    entry = await cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    since = await cache.generation(key)
+    rows = await store.acts.timeline(show_id)
+    await cache.set(key, (version, rows), since=since)
+    return rows
+
+async def patch_timeline(show_id, version, changes=(), removed=()):
+    """Apply act writes to a show's cached timeline rather than dropping it.
+
+    version is the show's version after the writes; the cached timeline is
+    only patched if it is of the version just before, i.e. no other change
+    (in this process or another) was missed. changes are acts as written
+    (new ones in full, others at least their id and the fields that
+    changed); removed are act ids. Entries before the first act affected
+    are kept as they are and only the ones after it get new offsets, so
+    e.g. lengthening one act shifts the acts that follow.
+    """
+    key = f"timeline:{show_id}"
+    entry = await cache.get(key)
+    if entry is None or entry[0] != version - 1:
+        # Still counts as a change of the key, so a timeline read before this write is not cached
+        await cache.delete(key)
+        return
+    rows = entry[1]
+    positions = {row["id"]: position for position, row in enumerate(rows)}
+    changed = {}
+    for act in changes:
+        if act["id"] in positions:
+            act = {**rows[positions[act["id"]]], **act}
+        if not all(field in act for field in ("name", "sequence_order", "duration")):
+            # Not an act of this timeline after all: rebuild it on the next read
+            await cache.delete(key)
+            return
+        changed[act["id"]] = act
+    touched = set(removed) | set(changed)
+    merged = sorted([row for row in rows if row["id"] not in touched] + list(changed.values()), key=_timeline_order)
+    first = min(
+        [positions[act_id] for act_id in touched if act_id in positions]
+        + [position for position, row in enumerate(merged) if row["id"] in changed],
+        default=len(merged),
+    )
+    offset = merged[first - 1]["end_offset"] if first else 0
+    await cache.set(key, (version, merged[:first] + timeline_rows(merged[first:], offset)))
+
+# Every change of a show advances its version in the same write (see
+# touch_show), and with it the catalogue version of the show repository;
+# ETags are derived from them so unchanged reads can answer 304. Versions
+# are always read from the store, never from the per-process cache, so
+# every worker agrees on them.
+async def show_version(store, show_id):
+    show = await store.shows.get(show_id, ["version"])
+    return None if show is None else show.get("version", 0)
+
+async def touch_show(store, show_id, inc=None, acts=(), removed=()):
+    """Apply rollup increments to a show and advance its version, in one write.
+
+    acts and removed are the act writes of the change, for patch_timeline.
+    Returns the new version, or None if the show is gone.
+    """
+    show = await store.shows.increment(show_id, {**(inc or {}), "version": 1})
+    if show is None:
+        await invalidate(show_id, "show")
+        return None
+    # Deleted shows are never served, so only live ones go in the cache
+    if show.get("deleted_at") is None:
+        await remember_show(show)
+    await patch_timeline(show_id, show["version"], acts, removed)
+    return show["version"]
+
+def not_modified(request, response, version):
+    """Set a strong ETag for version; return a 304 response if the client already has it."""
+    if version is None:
+        return None
+    variant = f"{request.url.path}?{request.url.query}|{request.headers.get('accept', '')}"
+    etag = f'"{version}-{hashlib.sha1(variant.encode()).hexdigest()[:16]}"'
+    response.headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if "*" in tags or etag in tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+async def list_documents(request, response, repository, scope, model, after, limit, cache_key=None, version=None):
+    """Keyset-paginated list of repository.find(*scope); streams NDJSON when the client accepts it.
+
+    With a limit, the cursor for the following page is sent in X-Next-Cursor.
+    Full (unpaginated) JSON lists are served from the cache under cache_key,
+    as of the version given (the show's, or the catalogue's for the show
+    list), and read from the primary; only these carry an ETag (and answer
+    304). Other lists honour MONGO_LIST_READ_PREFERENCE, so they may lag the
+    version and get no ETag.
+    """
+    ndjson = "application/x-ndjson" in request.headers.get("accept", "")
+    fields = schema_fields(model)
+    if cache_key and not (after or limit or ndjson):
+        cached = not_modified(request, response, version)
+        if cached:
+            return cached
+        entry = await cache.get(cache_key)
+        if entry is not None and entry[0] == version:
+            docs = entry[1]
+        else:
+            since = await cache.generation(cache_key)
+            docs = [doc async for doc in repository.find(*scope, fields=fields)]
+            await cache.set(cache_key, (version, docs), since=since)
+        return serialize_rows(response, model, docs)
+    
+    field = repository.cursor_field
+    after = _parse_cursor(after, field) if after else None
+    
+    if ndjson:
+        return StreamingResponse(
+            _ndjson_lines(repository.find(*scope, after=after, limit=limit, fields=fields, stale_ok=True), model),
+            media_type="application/x-ndjson",
+        )
+    
+    docs = [
+        doc async for doc in repository.find(
+            *scope, after=after, limit=limit and limit + 1, fields=fields, stale_ok=True
+        )
+    ]
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = _format_cursor(docs[-1], field)
+    return serialize_rows(response, model, docs)
+
+def expense_rollup_inc(category, amount, count=1):
+    return {
+        "expense_total": amount,
+        "expense_count": count,
+        f"expenses_by_category.{category_key(category)}": amount,
+    }
+
+ROLLUP_FIELDS = ("total_duration", "act_count", "expense_total", "expense_count", "expenses_by_category")
+
+def _rollup_drift(stored, actual):
+    drift = {}
+    for field in ROLLUP_FIELDS:
+        if field == "expenses_by_category":
+            stored_value = category_totals(stored.get(field))
+        else:
+            stored_value = stored.get(field) or 0
+        actual_value = actual[field]
+        if field == "expenses_by_category":
+            keys = set(stored_value) | set(actual_value)
+            same = all(math.isclose(stored_value.get(k, 0), actual_value.get(k, 0), abs_tol=1e-6) for k in keys)
+        else:
+            same = math.isclose(stored_value, actual_value, abs_tol=1e-6)
+        if not same:
+            drift[field] = {"stored": stored_value, "actual": actual_value}
+    return drift
+
+async def _reconcile_batch(store, shows, fix, drifted):
+    summaries = await get_show_summaries(store, [show["id"] for show in shows])
+    updates = {}
+    for stored in shows:
+        summary = summaries[stored["id"]]
+        actual = summary.dict(include=set(ROLLUP_FIELDS))
+        actual["expenses_by_category"] = {c.category: c.amount for c in summary.expenses_by_category}
+        drift = _rollup_drift(stored, actual)
+        if drift:
+            drifted[stored["id"]] = drift
+            by_category = {
+                category_key(category): amount for category, amount in actual["expenses_by_category"].items()
+            }
+            updates[stored["id"]] = {**actual, "expenses_by_category": by_category}
+    if fix and updates:
+        await store.shows.set_many(updates)
+        for show_id in updates:
+            await touch_show(store, show_id)
+
+async def reconcile_rollups(store, fix=False, batch_size=MAX_PAGE_SIZE):
+    """Recompute every show's rollups from its acts and expenses.
+
+    Returns {show_id: {field: {"stored": ..., "actual": ...}}} for shows that
+    drifted; with fix=True the recomputed values are written back.
+    """
+    drifted = {}
+    batch = []
+    async for show in store.shows.find(fields=["id", *ROLLUP_FIELDS]):
+        batch.append(show)
+        if len(batch) == batch_size:
+            await _reconcile_batch(store, batch, fix, drifted)
+            batch = []
+    if batch:
+        await _reconcile_batch(store, batch, fix, drifted)
+    return drifted
+
+async def backfill_performer_keys(store, batch_size=MAX_PAGE_SIZE):
+    """Derive performer_keys for acts stored before the field existed; returns how many were updated."""
+    updated = 0
+    while True:
+        acts = await store.acts.find_missing("performer_keys", batch_size, ["id", "show_id", "performers"])
+        if not acts:
+            return updated
+        await store.acts.set_many({
+            act["id"]: {"performer_keys": parse_performers(act.get("performers"))} for act in acts
+        })
+        for show_id in {act["show_id"] for act in acts}:
+            await invalidate(show_id, "acts")
+        updated += len(acts)
+
+async def migrate_show_dates(store, clear_invalid=False, batch_size=MAX_PAGE_SIZE):
+    """Convert show dates stored as ISO strings into stored dates (see date_to_mongo).
+
+    Returns (shows updated, {show_id: value} of dates that are not ISO
+    dates); those are left as they are unless clear_invalid=True.
+    """
+    converted, invalid = 0, {}
+    updates = {}
+    async for show in store.shows.find(fields=["id", "date"]):
+        value = show.get("date")
+        if not isinstance(value, str):
+            continue
+        try:
+            updates[show["id"]] = {"date": date_to_mongo(date.fromisoformat(value)) if value else None}
+        except ValueError:
+            invalid[show["id"]] = value
+            if not clear_invalid:
+                continue
+            updates[show["id"]] = {"date": None}
+        if len(updates) == batch_size:
+            converted += await _set_show_dates(store, updates)
+            updates = {}
+    converted += await _set_show_dates(store, updates)
+    return converted, invalid
+
+async def _set_show_dates(store, updates):
+    if updates:
+        await store.shows.set_many(updates)
+        for show_id in updates:
+            await invalidate(show_id, "show")
+    return len(updates)
+
+async def purge_show(store, show_id):
+    """Delete a show's acts and expenses in batches, then the deleted show itself."""
+    purged = 0
+    for repository in (store.acts, store.expenses):
+        while True:
+            count = await store.run_in_transaction(repository.delete_by_show, show_id, PURGE_BATCH_SIZE)
+            purged += count
+            if count < PURGE_BATCH_SIZE:
+                break
+    await store.shows.remove_deleted(show_id)
+    await invalidate(show_id, "acts", "expenses", "timeline")
+    return purged
+
+purge_queue: Optional[asyncio.Queue] = None
+background_tasks = []
+
+async def schedule_purge(store, show_id):
+    if SHOW_PURGE_MODE != "background" or purge_queue is None:
+        await purge_show(store, show_id)
+        return
+    try:
+        purge_queue.put_nowait((store, show_id))
+    except asyncio.QueueFull:
+        # The orphan sweeper picks up shows still marked deleted
+        logger.warning("Purge queue full, deferring purge of show %s", show_id)
+
+async def _purge_worker():
+    while True:
+        store, show_id = await purge_queue.get()
+        try:
+            purged = await purge_show(store, show_id)
+            logger.info("Purged show %s (%d documents)", show_id, purged)
+        except Exception:
+            logger.exception("Failed to purge show %s", show_id)
+        finally:
+            purge_queue.task_done()
+
+async def sweep_orphans(store):
+    """Purge acts and expenses whose show no longer exists, and finish pending show purges.
+
+    Returns the number of shows swept.
+    """
+    show_ids = await store.acts.show_ids() | await store.expenses.show_ids()
+    orphaned = show_ids - await store.shows.live_ids(show_ids)
+    orphaned |= set(await store.shows.deleted_ids())
+    for show_id in orphaned:
+        await purge_show(store, show_id)
+    return len(orphaned)
+
+async def _orphan_sweeper():
+    while True:
+        await asyncio.sleep(ORPHAN_SWEEP_INTERVAL)
+        try:
+            swept = await sweep_orphans(store)
+            if swept:
+                logger.info("Orphan sweep purged %d show(s)", swept)
+        except Exception:
+            logger.exception("Orphan sweep failed")
+
+def change_event(collection, operation, doc, changed):
+    """(show_id, type, data) for a Storage.changes() entry, or None if clients need not hear of it."""
+    if collection == "shows":
+        if operation != "update":
+            return None
+        if doc.get("deleted_at") is not None:
+            if changed is None or "deleted_at" in changed:
+                return doc["id"], "show.deleted", {"id": doc["id"]}
+            return None
+        # Rollup and version increments accompany every act and expense write
+        if changed is None or changed & set(ShowCreate.model_fields):
+            return doc["id"], "show.updated", Show(**parse_from_mongo(doc)).dict()
+        return None
+    
+    kind, model = ("act", CircusAct) if collection == "acts" else ("expense", Expense)
+    if operation == "delete":
+        return doc["show_id"], f"{kind}.deleted", {"id": doc["id"]}
+    if operation == "insert":
+        return doc["show_id"], f"{kind}.created", model(**parse_from_mongo(doc)).dict()
+    if kind == "act" and changed == {"sequence_order"}:
+        return doc["show_id"], "act.moved", {"id": doc["id"], "sequence_order": doc["sequence_order"]}
+    return doc["show_id"], f"{kind}.updated", model(**parse_from_mongo(doc)).dict()
+
+async def _follow_changes():
+    while True:
+        try:
+            async for change in store.changes():
+                event = change_event(*change)
+                if event:
+                    events.publish(*event)
+        except Exception:
+            logger.exception("Change stream failed; restarting")
+        # Anything written while the stream was down was not published
+        events.resync_all()
+        await asyncio.sleep(5)
+
+# Acts store their free-text performers ("Anna & Bo, The Flying Zucchinis")
+# split into normalized names in performer_keys, which is indexed
+PERFORMER_SEPARATORS = re.compile(r"\s*(?:[,;&/+\n]|\band\b)\s*", re.IGNORECASE)
+
+def normalize_performer(name):
+    return " ".join(name.split()).casefold()
+
+def parse_performers(performers):
+    if not performers:
+        return []
+    names = (normalize_performer(name) for name in PERFORMER_SEPARATORS.split(performers))
+    return list(dict.fromkeys(name for name in names if name))
+
 # Define Models
+# A show's calendar date; the date form field sends "" when left empty.
+# (Declared apart from the models: a field named date would shadow the type.)
+ShowDate = Annotated[Optional[date], BeforeValidator(lambda value: value or None)]
+
+def read_show_date(value):
+    # Shows saved before dates were stored as dates hold text, not always a date ("next Friday");
+    # read that as undated rather than fail every read of the show
+    if not isinstance(value, str):
+        return value
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        logger.warning("Reading show date %r as none: not an ISO date (see manage.py migrate-show-dates)", value)
+        return None
+
+# A show's date as stored; request bodies are parsed as ShowDate, strictly
+StoredShowDate = Annotated[Optional[date], BeforeValidator(read_show_date)]
+# When the show starts on its date, in the venue's local time
+ShowTime = Annotated[Optional[time], BeforeValidator(lambda value: value or None)]
+ExpenseCategory = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=100)]
+
 class Show(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
-    date: Optional[str] = None
+    date: StoredShowDate = None
+    time: ShowTime = None
     venue: Optional[str] = None
     description: Optional[str] = None
     total_duration: Optional[int] = 0  # in minutes
+    # Rollups kept in step by the act and expense write routes
+    act_count: int = 0
+    expense_total: float = 0
+    expense_count: int = 0
+    expenses_by_category: Dict[str, float] = {}
+    version: int = 0  # advanced by every change of the show, its acts or its expenses
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ShowCreate(BaseModel):
     title: str
-    date: Optional[str] = None
+    date: ShowDate = None
+    time: ShowTime = None
     venue: Optional[str] = None
     description: Optional[str] = None
 
@@ -58,6 +853,7 @@ class CircusAct(BaseModel):
     show_id: str
     name: str
     performers: Optional[str] = None
+    performer_keys: List[str] = []  # always derived from performers
     duration: int  # in minutes
     sequence_order: int
     description: Optional[str] = None
@@ -65,13 +861,20 @@ class CircusAct(BaseModel):
     sound_requirements: Optional[str] = None
     lighting_requirements: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    @model_validator(mode="before")
+    @classmethod
+    def derive_performer_keys(cls, data):
+        if isinstance(data, dict):
+            data = {**data, "performer_keys": parse_performers(data.get("performers"))}
+        return data
 
 class CircusActCreate(BaseModel):
     show_id: str
     name: str
     performers: Optional[str] = None
     duration: int
-    sequence_order: int
+    sequence_order: Optional[int] = None  # appended after the last act when omitted
     description: Optional[str] = None
     staging_notes: Optional[str] = None
     sound_requirements: Optional[str] = None
@@ -91,7 +894,7 @@ class Expense(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     show_id: str
     act_id: Optional[str] = None
-    category: str  # e.g., "performer_fee", "equipment", "venue", "travel"
+    category: ExpenseCategory  # e.g., "performer_fee", "equipment", "venue", "travel"
     amount: float
     description: str
     date: Optional[str] = None
@@ -100,13 +903,149 @@ class Expense(BaseModel):
 class ExpenseCreate(BaseModel):
     show_id: str
     act_id: Optional[str] = None
-    category: str
+    category: ExpenseCategory
     amount: float
     description: str
     date: Optional[str] = None
 
+class CategoryTotal(BaseModel):
+    category: str
+    amount: float
+    count: int
+
+class ActExpenseTotal(BaseModel):
+    act_id: Optional[str] = None  # None groups expenses not tied to an act
+    amount: float
+    count: int
+
+class Booking(BaseModel):
+    performer: str  # normalized name
+    show_id: str
+    show_title: str
+    date: StoredShowDate = None
+    venue: Optional[str] = None
+    act_id: str
+    act_name: str
+    sequence_order: int
+
+class PerformerSchedule(BaseModel):
+    performer: str
+    bookings: List[Booking]
+    double_booked: List[date] = []  # dates on which the performer is in more than one show
+
+class PerformerConflict(BaseModel):
+    performer: str
+    act_id: str  # the act in this show
+    act_name: str
+    bookings: List[Booking]  # the performer's acts in other shows on the same date
+
+class ShowCost(BaseModel):
+    show_id: str
+    title: str
+    date: StoredShowDate = None
+    venue: Optional[str] = None
+    expense_total: float = 0
+    expense_count: int = 0
+    stage_minutes: int = 0  # total act duration
+    act_count: int = 0
+    cost_per_minute: Optional[float] = None  # None without stage time
+
+class CategoryCost(BaseModel):
+    category: str
+    amount: float
+    count: int
+    share: Optional[float] = None  # of all expenses
+
+class MonthlyCost(BaseModel):
+    month: str  # "YYYY-MM"
+    amount: float
+    count: int
+    change: Optional[float] = None  # relative to the month before; None after a month with nothing
+
+class ExpenseReport(BaseModel):
+    version: int  # catalogue version the report was built at
+    generated_at: datetime
+    expense_total: float
+    expense_count: int
+    stage_minutes: int
+    cost_per_minute: Optional[float] = None
+    by_show: List[ShowCost]
+    by_category: List[CategoryCost]
+    by_month: List[MonthlyCost]
+
+class SearchHit(BaseModel):
+    # Display fields only; fetch the act or expense for the rest
+    type: str  # "act" or "expense"
+    id: str
+    show_id: str
+    score: float  # comparable within one response, not across backends
+    name: Optional[str] = None
+    performers: Optional[str] = None
+    sequence_order: Optional[int] = None
+    act_id: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    amount: Optional[float] = None
+
+class ShowSummary(BaseModel):
+    show_id: str
+    total_duration: int = 0  # in minutes
+    act_count: int = 0
+    expense_total: float = 0
+    expense_count: int = 0
+    expenses_by_category: List[CategoryTotal] = []
+    expenses_by_act: List[ActExpenseTotal] = []
+
+class TimelineEntry(BaseModel):
+    id: str  # act id
+    name: str
+    performers: Optional[str] = None
+    sequence_order: int
+    duration: int  # in minutes
+    start_offset: int  # minutes from the start of the show
+    end_offset: int
+    cue_time: Optional[datetime] = None  # venue local time; None until the show has a date and a time
+
+class ShowTimeline(BaseModel):
+    show_id: str
+    start: Optional[datetime] = None  # the show's date and time
+    total_duration: int = 0  # in minutes
+    acts: List[TimelineEntry]
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None  # set when the item was inserted
+    error: Optional[str] = None
+
+class BulkCreateResult(BaseModel):
+    inserted: int
+    results: List[BulkItemResult]
+
+class ShowCloneRequest(BaseModel):
+    # Overrides for the copy; anything left out is taken from the source show
+    title: Optional[str] = None
+    date: ShowDate = None
+    time: ShowTime = None
+    venue: Optional[str] = None
+    description: Optional[str] = None
+    include_expenses: bool = True
+
+class ImportResult(BaseModel):
+    show_id: str
+    acts: int
+    expenses: int
+
+class ActOrderUpdate(BaseModel):
+    id: str
+    sequence_order: int
+
+class ActMoveRequest(BaseModel):
+    before_id: Optional[str] = None  # act that should follow the moved act
+    after_id: Optional[str] = None  # act that should precede the moved act
+
 class ActReorderRequest(BaseModel):
-    act_updates: List[dict]  # [{"id": "act_id", "sequence_order": 1}, ...]
+    show_id: Optional[str] = None
+    act_updates: List[ActOrderUpdate]  # [{"id": "act_id", "sequence_order": 1}, ...]
 
 # Show endpoints
 @api_router.get("/")
@@ -114,135 +1053,857 @@ async def root():
     return {"message": "Circus Show Management API"}
 
 @api_router.post("/shows", response_model=Show)
-async def create_show(show_data: ShowCreate):
+async def create_show(show_data: ShowCreate, store: Storage = Depends(get_store)):
     show_dict = show_data.dict()
     show_obj = Show(**show_dict)
     show_mongo = prepare_for_mongo(show_obj.dict())
-    await db.shows.insert_one(show_mongo)
+    await store.shows.insert(show_mongo)
     return show_obj
 
 @api_router.get("/shows", response_model=List[Show])
-async def get_shows():
-    shows = await db.shows.find().sort("created_at", -1).to_list(1000)
-    return [Show(**parse_from_mongo(show)) for show in shows]
+async def get_shows(
+    request: Request,
+    response: Response,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    venue: Optional[str] = None,
+    store: Storage = Depends(get_store),
+):
+    """Shows newest first or, filtered by from/to/venue, dated shows in date order.
+
+    The full list is tagged with the catalogue version and cached per
+    version; a poll with a matching If-None-Match gets a 304 after that
+    one version read. A filtered list (e.g. a month of the calendar) is
+    served from the (date, venue) index; it returns at most limit shows
+    (MAX_PAGE_SIZE by default) and pages with a "<date>,<id>" cursor.
+    """
+    if date_from is None and date_to is None and venue is None:
+        # Pages are not tagged (see list_documents), so they skip the version read
+        version = None if after or limit else await store.shows.catalogue_version()
+        return await list_documents(
+            request, response, store.shows, (), Show, after, limit, cache_key="shows:all", version=version,
+        )
+    
+    limit = limit or MAX_PAGE_SIZE
+    docs = [
+        doc async for doc in store.shows.find_dated(
+            date_from and date_to_mongo(date_from),
+            date_to and date_to_mongo(date_to),
+            venue,
+            after=_parse_cursor(after, "date") if after else None,
+            limit=limit + 1,
+            fields=schema_fields(Show),
+            stale_ok=True,
+        )
+    ]
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = _format_cursor(docs[-1], "date")
+    return serialize_rows(response, Show, docs)
+
+async def get_show_summaries(store, show_ids):
+    docs = await store.summaries(show_ids)
+    return {show_id: ShowSummary(**doc) for show_id, doc in docs.items()}
+
+@api_router.get("/shows/summaries", response_model=List[ShowSummary])
+async def get_summaries(
+    request: Request, response: Response, ids: List[str] = Query([]), store: Storage = Depends(get_store)
+):
+    if len(ids) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request")
+    # Act and expense writes advance the catalogue version too (see touch_show)
+    cached = not_modified(request, response, await store.shows.catalogue_version())
+    if cached:
+        return cached
+    summaries = await get_show_summaries(store, ids)
+    return [summaries[show_id] for show_id in ids if show_id in summaries]
+
+@api_router.get("/shows/{show_id}/summary", response_model=ShowSummary)
+async def get_summary(show_id: str, request: Request, response: Response, store: Storage = Depends(get_store)):
+    cached = not_modified(request, response, await show_version(store, show_id))
+    if cached:
+        return cached
+    summaries = await get_show_summaries(store, [show_id])
+    if show_id not in summaries:
+        raise HTTPException(status_code=404, detail="Show not found")
+    return summaries[show_id]
 
 @api_router.get("/shows/{show_id}", response_model=Show)
-async def get_show(show_id: str):
-    show = await db.shows.find_one({"id": show_id})
+async def get_show(show_id: str, request: Request, response: Response, store: Storage = Depends(get_store)):
+    # Only the version is read unless the cache lacks the show as of that version
+    version = await show_version(store, show_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    cached = not_modified(request, response, version)
+    if cached:
+        return cached
+    show = await cached_show(store, show_id, version)
     if not show:
         raise HTTPException(status_code=404, detail="Show not found")
+    # Tag exactly what is returned, which is newer if the show changed meanwhile
+    cached = not_modified(request, response, show.get("version", 0))
+    if cached:
+        return cached
     return Show(**parse_from_mongo(show))
 
-@api_router.put("/shows/{show_id}", response_model=Show)
-async def update_show(show_id: str, show_data: ShowCreate):
-    show = await db.shows.find_one({"id": show_id})
+def _sse_message(event):
+    lines = [f"event: {event['type']}"]
+    if event["id"]:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {orjson.dumps(event['data']).decode()}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+async def _event_stream(subscription):
+    try:
+        # Browsers reconnect after this many ms, sending Last-Event-ID
+        yield b"retry: 3000\n\n"
+        while True:
+            event = await subscription.get(EVENT_KEEPALIVE)
+            yield b": keepalive\n\n" if event is None else _sse_message(event)
+    finally:
+        events.unsubscribe(subscription)
+
+@api_router.get("/shows/{show_id}/events")
+async def show_events(show_id: str, request: Request, store: Storage = Depends(get_store)):
+    """Server-Sent Events for one show's changes.
+
+    Event types: act.created, act.updated, act.moved, act.deleted,
+    expense.created, expense.deleted, show.updated and show.deleted; data is
+    the new document, or {"id", "sequence_order"} for moves and {"id"} for
+    deletes. "resync" means events were missed and the lists should be refetched.
+    """
+    if not await show_exists(store, show_id):
+        raise HTTPException(status_code=404, detail="Show not found")
+    subscription = events.subscribe(show_id, request.headers.get("last-event-id"))
+    return StreamingResponse(
+        _event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/shows/{show_id}/conflicts", response_model=List[PerformerConflict])
+async def get_show_conflicts(show_id: str, store: Storage = Depends(get_store)):
+    """Performers in this show who also appear in another show on the same date."""
+    show = await cached_show(store, show_id, await show_version(store, show_id))
     if not show:
         raise HTTPException(status_code=404, detail="Show not found")
+    day = read_show_date(parse_from_mongo(show)["date"])
+    if not day:
+        return []
+    
+    acts = [act async for act in store.acts.find(show_id, fields=["id", "name", "performers"])]
+    keys_by_act = {act["id"]: parse_performers(act.get("performers")) for act in acts}
+    performers = dict.fromkeys(key for keys in keys_by_act.values() for key in keys)
+    elsewhere = {}
+    for booking in await store.bookings(performers, date_to_mongo(day), date_to_mongo(day)):
+        if booking["show_id"] != show_id:
+            elsewhere.setdefault(booking["performer"], []).append(booking)
+    return [
+        PerformerConflict(performer=key, act_id=act["id"], act_name=act["name"], bookings=elsewhere[key])
+        for act in acts
+        for key in keys_by_act[act["id"]]
+        if key in elsewhere
+    ]
+
+@api_router.get("/shows/{show_id}/timeline", response_model=ShowTimeline)
+async def get_show_timeline(show_id: str, request: Request, response: Response, store: Storage = Depends(get_store)):
+    """The running order, with each act's start and end as minutes into the show and its cue time.
+
+    Cue times are the show's date and time plus the act's start offset; they
+    are left out until the show has both.
+    """
+    version = await show_version(store, show_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    cached = not_modified(request, response, version)
+    if cached:
+        return cached
+    show = await cached_show(store, show_id, version)
+    if not show:
+        raise HTTPException(status_code=404, detail="Show not found")
+    show = Show(**parse_from_mongo(show))
+    start = datetime.combine(show.date, show.time) if show.date and show.time else None
+    
+    rows = await show_timeline(store, show_id, version)
+    return ShowTimeline(
+        show_id=show_id,
+        start=start,
+        total_duration=rows[-1]["end_offset"] if rows else 0,
+        acts=[
+            TimelineEntry(**row, cue_time=start + timedelta(minutes=row["start_offset"]) if start else None)
+            for row in rows
+        ],
+    )
+
+# Performer endpoints
+@api_router.get("/performers/{name}/schedule", response_model=PerformerSchedule)
+async def get_performer_schedule(
+    name: str,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    store: Storage = Depends(get_store),
+):
+    """Every act the performer appears in across live shows, optionally limited to show dates in [from, to]."""
+    performer = normalize_performer(name)
+    if not performer:
+        raise HTTPException(status_code=400, detail="Performer name is empty")
+    bookings = await store.bookings(
+        [performer], date_from and date_to_mongo(date_from), date_to and date_to_mongo(date_to)
+    )
+    bookings = [Booking(**parse_from_mongo(booking)) for booking in bookings]
+    shows_by_date = {}
+    for booking in bookings:
+        if booking.date:
+            shows_by_date.setdefault(booking.date, set()).add(booking.show_id)
+    return PerformerSchedule(
+        performer=performer,
+        bookings=bookings,
+        double_booked=sorted(day for day, show_ids in shows_by_date.items() if len(show_ids) > 1),
+    )
+
+# Search endpoints
+SEARCH_TYPES = ("act", "expense")
+SEARCH_PAGE_SIZE = 20
+
+@api_router.get("/search", response_model=List[SearchHit], response_model_exclude_none=True)
+async def search(
+    response: Response,
+    q: str,
+    type: Optional[str] = Query(None, pattern="^(act|expense)$"),
+    show_id: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    store: Storage = Depends(get_store),
+):
+    """Acts (by name, staging notes, sound and lighting requirements) and expenses
+    (by description) matching any word of q, best match first.
+
+    Pages follow the opaque cursor in X-Next-Cursor.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query is empty")
+    if after is not None and not after.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    offset = int(after or 0)
     
+    hits = await store.search(q, [type] if type else SEARCH_TYPES, show_id, limit + 1, offset)
+    if len(hits) > limit:
+        hits = hits[:limit]
+        response.headers["X-Next-Cursor"] = str(offset + limit)
+    # Acts and expenses of deleted shows linger until the purge gets to them
+    live = await store.shows.live_ids({hit["show_id"] for hit in hits})
+    return [hit for hit in hits if hit["show_id"] in live]
+
+# Report endpoints
+# (catalogue version, JSON body) of the last expense report. Kept apart from
+# the read cache: it is only replaced when the data changes, never expired
+expense_report: Optional[tuple] = None
+expense_report_lock = asyncio.Lock()
+
+async def _feed(batches, add):
+    # Reduce each batch on the threadpool while the next one is fetched
+    pending = None
+    async for batch in batches:
+        if pending is not None:
+            await pending
+        pending = asyncio.ensure_future(run_in_threadpool(add, batch))
+    if pending is not None:
+        await pending
+
+async def build_expense_report(store, version):
+    # Read from the primary: the report is kept for as long as the version it is tagged with
+    builder = ExpenseReportBuilder()
+    await _feed(store.acts.scan(ACT_FIELDS, REPORT_BATCH_SIZE), builder.add_acts)
+    await _feed(store.expenses.scan(EXPENSE_FIELDS, REPORT_BATCH_SIZE), builder.add_expenses)
+    shows = [parse_from_mongo(show) async for show in store.shows.find(fields=SHOW_FIELDS)]
+    shows = [{**show, "date": read_show_date(show.get("date"))} for show in shows]
+    report = await run_in_threadpool(builder.result, shows)
+    return ExpenseReport(version=version, generated_at=datetime.now(timezone.utc), **report)
+
+@api_router.get("/reports/expenses", response_model=ExpenseReport)
+async def get_expense_report(request: Request, response: Response, store: Storage = Depends(get_store)):
+    """Cost per minute of stage time by show, cost by category and month-over-month trend, over live shows.
+
+    Built from every act and expense, streamed in batches; the result is
+    kept until the catalogue version moves, which every show, act and
+    expense write does (see touch_show), so repeat loads cost one version
+    lookup (or a 304).
+    """
+    global expense_report
+    # Read before the data: a write racing the build moves the version, so the next request rebuilds
+    version = await store.shows.catalogue_version()
+    cached = not_modified(request, response, version)
+    if cached:
+        return cached
+    # One build at a time; requests that queue behind it reuse its result
+    async with expense_report_lock:
+        if expense_report is None or expense_report[0] != version:
+            report = await build_expense_report(store, version)
+            expense_report = (version, dump_json(report.model_dump()))
+    return Response(expense_report[1], media_type="application/json", headers=dict(response.headers))
+
+@api_router.put("/shows/{show_id}", response_model=Show)
+async def update_show(show_id: str, show_data: ShowCreate, store: Storage = Depends(get_store)):
     update_data = {k: v for k, v in show_data.dict().items() if v is not None}
     update_data = prepare_for_mongo(update_data)
     
-    await db.shows.update_one({"id": show_id}, {"$set": update_data})
-    updated_show = await db.shows.find_one({"id": show_id})
-    return Show(**parse_from_mongo(updated_show))
+    updated_show = await store.shows.update(show_id, update_data, inc={"version": 1})
+    if not updated_show:
+        raise HTTPException(status_code=404, detail="Show not found")
+    await remember_show(updated_show)
+    # No act changed: this only moves the cached timeline on to the new version
+    await patch_timeline(show_id, updated_show["version"])
+    show = Show(**parse_from_mongo(updated_show))
+    publish(show_id, "show.updated", show.dict())
+    return show
 
 @api_router.delete("/shows/{show_id}")
-async def delete_show(show_id: str):
-    result = await db.shows.delete_one({"id": show_id})
-    if result.deleted_count == 0:
+async def delete_show(show_id: str, store: Storage = Depends(get_store)):
+    if not await store.shows.mark_deleted(show_id):
         raise HTTPException(status_code=404, detail="Show not found")
+    await invalidate(show_id, "show", "show_exists", "acts", "expenses", "timeline")
+    publish(show_id, "show.deleted", {"id": show_id})
     
     # Also delete related acts and expenses
-    await db.circus_acts.delete_many({"show_id": show_id})
-    await db.expenses.delete_many({"show_id": show_id})
+    await schedule_purge(store, show_id)
     
     return {"message": "Show deleted successfully"}
 
+async def _clone_show(store, source, clone_data, session=None):
+    overrides = clone_data.dict(exclude={"include_expenses"}, exclude_none=True)
+    # Through Show, which reads a stored date ShowCreate would reject (see StoredShowDate)
+    copied = Show(**parse_from_mongo(source)).dict(include=set(ShowCreate.model_fields))
+    show_obj = Show(**{**copied, **overrides})
+    show = prepare_for_mongo(show_obj.dict())
+    await store.shows.insert(show, session=session)
+    
+    rollups = {}
+    act_ids = {}  # source act id -> cloned act id
+    
+    async def copy(repository, model, remap):
+        batch = []
+        async for doc in repository.find(source["id"], fields=schema_fields(model), session=session):
+            batch.append(remap(doc, {**doc, "id": str(uuid.uuid4()), "show_id": show_obj.id}))
+            if len(batch) == IMPORT_BATCH_SIZE:
+                await repository.insert_many(batch, session=session)
+                batch = []
+        if batch:
+            await repository.insert_many(batch, session=session)
+    
+    def remap_act(source_act, act):
+        act_ids[source_act["id"]] = act["id"]
+        _merge_inc(rollups, {"total_duration": act["duration"], "act_count": 1})
+        return act
+    
+    def remap_expense(source_expense, expense):
+        expense["act_id"] = act_ids.get(source_expense.get("act_id"))
+        _merge_inc(rollups, expense_rollup_inc(expense["category"], expense["amount"]))
+        return expense
+    
+    await copy(store.acts, CircusAct, remap_act)
+    if clone_data.include_expenses:
+        await copy(store.expenses, Expense, remap_expense)
+    if rollups:
+        await store.shows.increment(show_obj.id, rollups, session=session)
+    return apply_inc(show, rollups)
+
+@api_router.post("/shows/{show_id}/clone", response_model=Show)
+async def clone_show(
+    show_id: str, clone_data: ShowCloneRequest = ShowCloneRequest(), store: Storage = Depends(get_store)
+):
+    """Copy a show with its acts (and expenses) under new ids, in one transaction where supported."""
+    source = await store.shows.get(show_id)
+    if not source:
+        raise HTTPException(status_code=404, detail="Show not found")
+    
+    cloned = await store.run_in_transaction(_clone_show, store, source, clone_data)
+    return Show(**parse_from_mongo(cloned))
+
 # Circus Act endpoints
 @api_router.post("/acts", response_model=CircusAct)
-async def create_act(act_data: CircusActCreate):
+async def create_act(act_data: CircusActCreate, store: Storage = Depends(get_store)):
     # Check if show exists
-    show = await db.shows.find_one({"id": act_data.show_id})
-    if not show:
+    if not await show_exists(store, act_data.show_id):
         raise HTTPException(status_code=404, detail="Show not found")
     
     act_dict = act_data.dict()
+    if act_dict["sequence_order"] is None:
+        last = await store.acts.neighbour(act_data.show_id, direction=-1)
+        act_dict["sequence_order"] = (last["sequence_order"] if last else 0) + SEQUENCE_GAP
     act_obj = CircusAct(**act_dict)
     act_mongo = prepare_for_mongo(act_obj.dict())
-    await db.circus_acts.insert_one(act_mongo)
+    await store.acts.insert(act_mongo)
+    await invalidate(act_obj.show_id, "acts")
+    await touch_show(store, act_obj.show_id, {"total_duration": act_obj.duration, "act_count": 1}, acts=[act_mongo])
+    publish(act_obj.show_id, "act.created", act_obj.dict())
     return act_obj
 
 @api_router.get("/acts/show/{show_id}", response_model=List[CircusAct])
-async def get_acts_by_show(show_id: str):
-    acts = await db.circus_acts.find({"show_id": show_id}).sort("sequence_order", 1).to_list(1000)
-    return [CircusAct(**parse_from_mongo(act)) for act in acts]
-
-@api_router.put("/acts/reorder")
-async def reorder_acts(reorder_data: ActReorderRequest):
-    for act_update in reorder_data.act_updates:
-        await db.circus_acts.update_one(
-            {"id": act_update["id"]}, 
-            {"$set": {"sequence_order": act_update["sequence_order"]}}
-        )
-    return {"message": "Acts reordered successfully"}
+async def get_acts_by_show(
+    show_id: str,
+    request: Request,
+    response: Response,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    store: Storage = Depends(get_store),
+):
+    version = await show_version(store, show_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    return await list_documents(
+        request, response, store.acts, (show_id,), CircusAct, after, limit,
+        cache_key=f"acts:{show_id}", version=version,
+    )
+
+@api_router.put("/acts/reorder", response_model=List[CircusAct])
+async def reorder_acts(reorder_data: ActReorderRequest, store: Storage = Depends(get_store)):
+    act_ids = {update.id for update in reorder_data.act_updates}
+    if not act_ids:
+        raise HTTPException(status_code=400, detail="No acts to reorder")
+    
+    acts = await store.acts.find_ids(act_ids, fields=["id", "show_id"])
+    if len(acts) != len(act_ids):
+        raise HTTPException(status_code=404, detail="Act not found")
+    
+    show_ids = {act["show_id"] for act in acts}
+    if reorder_data.show_id is not None:
+        show_ids.add(reorder_data.show_id)
+    if len(show_ids) != 1:
+        raise HTTPException(status_code=400, detail="All acts must belong to the same show")
+    show_id = show_ids.pop()
+    if not await show_exists(store, show_id):
+        raise HTTPException(status_code=404, detail="Act not found")
+    
+    orders = [(update.id, update.sequence_order) for update in reorder_data.act_updates]
+    await store.acts.set_orders(orders, show_id=show_id)
+    await invalidate(show_id, "acts")
+    await touch_show(store, show_id, acts=[{"id": act_id, "sequence_order": order} for act_id, order in orders])
+    for act_id, sequence_order in orders:
+        publish(show_id, "act.moved", {"id": act_id, "sequence_order": sequence_order})
+    return [CircusAct(**parse_from_mongo(act)) async for act in store.acts.find(show_id)]
+
+async def _move_bounds(store, act, move_data):
+    show_id = act["show_id"]
+    anchor_ids = [i for i in (move_data.after_id, move_data.before_id) if i is not None]
+    if act["id"] in anchor_ids:
+        raise HTTPException(status_code=400, detail="An act cannot be moved relative to itself")
+    anchors = {}
+    if anchor_ids:
+        found = await store.acts.find_ids(anchor_ids, show_id=show_id, fields=["id", "sequence_order"])
+        anchors = {a["id"]: a["sequence_order"] for a in found}
+        if len(anchors) != len(anchor_ids):
+            raise HTTPException(status_code=404, detail="Act not found in this show")
+    
+    lower = anchors.get(move_data.after_id)
+    upper = anchors.get(move_data.before_id)
+    if lower is not None and upper is not None:
+        if lower >= upper:
+            raise HTTPException(status_code=400, detail="after_id must come before before_id")
+    elif lower is not None:
+        following = await store.acts.neighbour(show_id, lower, 1, exclude_id=act["id"])
+        upper = following["sequence_order"] if following else lower + 2 * SEQUENCE_GAP
+    elif upper is not None:
+        preceding = await store.acts.neighbour(show_id, upper, -1, exclude_id=act["id"])
+        lower = preceding["sequence_order"] if preceding else upper - 2 * SEQUENCE_GAP
+    else:
+        last = await store.acts.neighbour(show_id, direction=-1, exclude_id=act["id"])
+        lower = last["sequence_order"] if last else 0
+        upper = lower + 2 * SEQUENCE_GAP
+    return lower, upper
+
+async def rebalance_sequence(store, show_id):
+    """Respace a show's acts SEQUENCE_GAP apart, keeping their current order."""
+    acts = [act async for act in store.acts.find(show_id, fields=["id"])]
+    if acts:
+        orders = [(act["id"], (i + 1) * SEQUENCE_GAP) for i, act in enumerate(acts)]
+        await store.acts.set_orders(orders)
+        # The show version moves with the write that follows; until then the timeline is rebuilt on read
+        await invalidate(show_id, "acts", "timeline")
+        for act_id, sequence_order in orders:
+            publish(show_id, "act.moved", {"id": act_id, "sequence_order": sequence_order})
+
+@api_router.post("/acts/{act_id}/move", response_model=CircusAct)
+async def move_act(act_id: str, move_data: ActMoveRequest, store: Storage = Depends(get_store)):
+    act = await store.acts.get(act_id)
+    if not act or not await show_exists(store, act["show_id"]):
+        raise HTTPException(status_code=404, detail="Act not found")
+    
+    lower, upper = await _move_bounds(store, act, move_data)
+    if upper - lower < 2:
+        # No free slot between the neighbours: respace the show once, then retry
+        await rebalance_sequence(store, act["show_id"])
+        lower, upper = await _move_bounds(store, act, move_data)
+    
+    sequence_order = (lower + upper) // 2
+    previous = await store.acts.update(act_id, {"sequence_order": sequence_order})
+    await invalidate(act["show_id"], "acts")
+    await touch_show(store, act["show_id"], acts=[{"id": act_id, "sequence_order": sequence_order}])
+    publish(act["show_id"], "act.moved", {"id": act_id, "sequence_order": sequence_order})
+    return CircusAct(**parse_from_mongo({**previous, "sequence_order": sequence_order}))
 
 @api_router.get("/acts/{act_id}", response_model=CircusAct)
-async def get_act(act_id: str):
-    act = await db.circus_acts.find_one({"id": act_id})
-    if not act:
+async def get_act(act_id: str, store: Storage = Depends(get_store)):
+    act = await store.acts.get(act_id)
+    # Acts of a deleted show stay in the store until it is purged, but are gone to clients
+    if not act or not await show_exists(store, act["show_id"]):
         raise HTTPException(status_code=404, detail="Act not found")
     return CircusAct(**parse_from_mongo(act))
 
 @api_router.put("/acts/{act_id}", response_model=CircusAct)
-async def update_act(act_id: str, act_data: CircusActUpdate):
-    act = await db.circus_acts.find_one({"id": act_id})
-    if not act:
-        raise HTTPException(status_code=404, detail="Act not found")
-    
+async def update_act(act_id: str, act_data: CircusActUpdate, store: Storage = Depends(get_store)):
     update_data = {k: v for k, v in act_data.dict().items() if v is not None}
     update_data = prepare_for_mongo(update_data)
     
-    await db.circus_acts.update_one({"id": act_id}, {"$set": update_data})
-    updated_act = await db.circus_acts.find_one({"id": act_id})
-    return CircusAct(**parse_from_mongo(updated_act))
+    if not update_data:
+        return await get_act(act_id, store)
+    if "performers" in update_data:
+        update_data["performer_keys"] = parse_performers(update_data["performers"])
+    
+    # The pre-image gives the old duration for the rollup delta. Checking the
+    # show afterwards keeps this one write; an act of a deleted show is purged
+    # with it, so writing to it first is harmless.
+    act = await store.acts.update(act_id, update_data)
+    if not act or not await show_exists(store, act["show_id"]):
+        raise HTTPException(status_code=404, detail="Act not found")
+    await invalidate(act["show_id"], "acts")
+    inc = {}
+    if "duration" in update_data and update_data["duration"] != act["duration"]:
+        inc["total_duration"] = update_data["duration"] - act["duration"]
+    changed = [{**act, **update_data}] if update_data.keys() & set(TIMELINE_FIELDS) else []
+    await touch_show(store, act["show_id"], inc, acts=changed)
+    updated = CircusAct(**parse_from_mongo({**act, **update_data}))
+    publish(act["show_id"], "act.updated", updated.dict())
+    return updated
+
+async def _delete_act_expenses(store, show_id, act_id):
+    # Delete an act's expenses; returns the show rollup increments taking their amounts off
+    by_category = await store.run_in_transaction(store.expenses.delete_by_act, act_id)
+    inc = {}
+    if by_category:
+        await invalidate(show_id, "expenses")
+    for group in by_category:
+        _merge_inc(inc, expense_rollup_inc(group["category"], -group["amount"], -group["count"]))
+    return inc
 
 @api_router.delete("/acts/{act_id}")
-async def delete_act(act_id: str):
-    result = await db.circus_acts.delete_one({"id": act_id})
-    if result.deleted_count == 0:
+async def delete_act(act_id: str, store: Storage = Depends(get_store)):
+    act = await store.acts.delete(act_id)
+    if not act or not await show_exists(store, act["show_id"]):
         raise HTTPException(status_code=404, detail="Act not found")
+    await invalidate(act["show_id"], "acts")
     
-    # Also delete related expenses
-    await db.expenses.delete_many({"act_id": act_id})
+    inc = await _delete_act_expenses(store, act["show_id"], act_id)
+    _merge_inc(inc, {"total_duration": -act["duration"], "act_count": -1})
+    await touch_show(store, act["show_id"], inc, removed=[act_id])
+    # The act's expenses went with it; clients drop those by act_id
+    publish(act["show_id"], "act.deleted", {"id": act_id})
     
     return {"message": "Act deleted successfully"}
 
+def _merge_inc(total, inc):
+    for field, value in inc.items():
+        total[field] = total.get(field, 0) + value
+    return total
+
+def _validation_message(error):
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'item'}: {e['msg']}" for e in error.errors())
+
+async def _validate_bulk_items(store, items, create_model, results):
+    """Validate each item on its own and check all parent shows in one query."""
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, create_model.model_validate(item)))
+        except ValidationError as e:
+            results[index] = BulkItemResult(index=index, error=_validation_message(e))
+    
+    live_ids = await store.shows.live_ids({data.show_id for _, data in valid})
+    for index, data in valid:
+        if data.show_id not in live_ids:
+            results[index] = BulkItemResult(index=index, error="Show not found")
+    return [(index, data) for index, data in valid if data.show_id in live_ids]
+
+async def _insert_bulk(repository, indexed_docs, results):
+    # One unordered insert_many; returns the documents that were written
+    if not indexed_docs:
+        return []
+    failed = await repository.insert_many([doc for _, doc in indexed_docs])
+    inserted = []
+    for position, (index, doc) in enumerate(indexed_docs):
+        if position in failed:
+            results[index] = BulkItemResult(index=index, error=failed[position])
+        else:
+            results[index] = BulkItemResult(index=index, id=doc["id"])
+            inserted.append(doc)
+    return inserted
+
+@api_router.post("/acts/bulk", response_model=BulkCreateResult)
+async def create_acts_bulk(items: List[dict], store: Storage = Depends(get_store)):
+    results = [None] * len(items)
+    valid = await _validate_bulk_items(store, items, CircusActCreate, results)
+    
+    # Acts without a sequence_order are appended after each show's last act
+    next_order = {}
+    indexed_docs = []
+    for index, data in valid:
+        act_dict = data.dict()
+        if act_dict["sequence_order"] is None:
+            if data.show_id not in next_order:
+                last = await store.acts.neighbour(data.show_id, direction=-1)
+                next_order[data.show_id] = last["sequence_order"] if last else 0
+            next_order[data.show_id] += SEQUENCE_GAP
+            act_dict["sequence_order"] = next_order[data.show_id]
+        indexed_docs.append((index, prepare_for_mongo(CircusAct(**act_dict).dict())))
+    
+    inserted = await _insert_bulk(store.acts, indexed_docs, results)
+    rollups = {}
+    for act in inserted:
+        _merge_inc(rollups.setdefault(act["show_id"], {}), {"total_duration": act["duration"], "act_count": 1})
+    for show_id, inc in rollups.items():
+        await invalidate(show_id, "acts")
+        await touch_show(store, show_id, inc, acts=[act for act in inserted if act["show_id"] == show_id])
+    for act in inserted:
+        publish(act["show_id"], "act.created", CircusAct(**parse_from_mongo(act)).dict())
+    return BulkCreateResult(inserted=len(inserted), results=results)
+
 # Expense endpoints
+@api_router.post("/expenses/bulk", response_model=BulkCreateResult)
+async def create_expenses_bulk(items: List[dict], store: Storage = Depends(get_store)):
+    results = [None] * len(items)
+    valid = await _validate_bulk_items(store, items, ExpenseCreate, results)
+    indexed_docs = [(index, prepare_for_mongo(Expense(**data.dict()).dict())) for index, data in valid]
+    
+    inserted = await _insert_bulk(store.expenses, indexed_docs, results)
+    rollups = {}
+    for expense in inserted:
+        rollup = rollups.setdefault(expense["show_id"], {})
+        _merge_inc(rollup, expense_rollup_inc(expense["category"], expense["amount"]))
+    for show_id, inc in rollups.items():
+        await invalidate(show_id, "expenses")
+        await touch_show(store, show_id, inc)
+    for expense in inserted:
+        publish(expense["show_id"], "expense.created", Expense(**parse_from_mongo(expense)).dict())
+    return BulkCreateResult(inserted=len(inserted), results=results)
+
 @api_router.post("/expenses", response_model=Expense)
-async def create_expense(expense_data: ExpenseCreate):
+async def create_expense(expense_data: ExpenseCreate, store: Storage = Depends(get_store)):
     # Check if show exists
-    show = await db.shows.find_one({"id": expense_data.show_id})
-    if not show:
+    if not await show_exists(store, expense_data.show_id):
         raise HTTPException(status_code=404, detail="Show not found")
     
     expense_dict = expense_data.dict()
     expense_obj = Expense(**expense_dict)
     expense_mongo = prepare_for_mongo(expense_obj.dict())
-    await db.expenses.insert_one(expense_mongo)
+    await store.expenses.insert(expense_mongo)
+    await invalidate(expense_obj.show_id, "expenses")
+    await touch_show(store, expense_obj.show_id, expense_rollup_inc(expense_obj.category, expense_obj.amount))
+    publish(expense_obj.show_id, "expense.created", expense_obj.dict())
     return expense_obj
 
 @api_router.get("/expenses/show/{show_id}", response_model=List[Expense])
-async def get_expenses_by_show(show_id: str):
-    expenses = await db.expenses.find({"show_id": show_id}).sort("created_at", -1).to_list(1000)
-    return [Expense(**parse_from_mongo(expense)) for expense in expenses]
+async def get_expenses_by_show(
+    show_id: str,
+    request: Request,
+    response: Response,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    store: Storage = Depends(get_store),
+):
+    version = await show_version(store, show_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    return await list_documents(
+        request, response, store.expenses, (show_id,), Expense, after, limit,
+        cache_key=f"expenses:{show_id}", version=version,
+    )
 
 @api_router.delete("/expenses/{expense_id}")
-async def delete_expense(expense_id: str):
-    result = await db.expenses.delete_one({"id": expense_id})
-    if result.deleted_count == 0:
+async def delete_expense(expense_id: str, store: Storage = Depends(get_store)):
+    expense = await store.expenses.delete(expense_id)
+    if not expense or not await show_exists(store, expense["show_id"]):
         raise HTTPException(status_code=404, detail="Expense not found")
+    await invalidate(expense["show_id"], "expenses")
+    await touch_show(store, expense["show_id"], expense_rollup_inc(expense["category"], -expense["amount"], -1))
+    publish(expense["show_id"], "expense.deleted", {"id": expense_id})
     return {"message": "Expense deleted successfully"}
 
+# Import / export endpoints
+# A show travels as its show record followed by its acts, then its expenses.
+# NDJSON lines carry a "type" key; CSV rows share one header with a type column.
+EXPORT_TYPES = ("show", "act", "expense")
+SHOW_EXPORT_FIELDS = ["id", "title", "date", "time", "venue", "description", "created_at"]
+
+def _export_fields(record_type):
+    if record_type == "show":
+        return SHOW_EXPORT_FIELDS
+    if record_type == "act":
+        # performer_keys is derived again on import
+        return [field for field in CircusAct.model_fields if field != "performer_keys"]
+    return list(Expense.model_fields)
+
+CSV_EXPORT_FIELDS = ["type"] + list(dict.fromkeys(
+    field for record_type in EXPORT_TYPES for field in _export_fields(record_type)
+))
+
+async def _export_records(store, show):
+    yield "show", parse_from_mongo(show)
+    for record_type, repository in (("act", store.acts), ("expense", store.expenses)):
+        async for doc in repository.find(show["id"], fields=_export_fields(record_type), stale_ok=True):
+            yield record_type, doc
+
+async def _export_ndjson(store, show):
+    async for record_type, doc in _export_records(store, show):
+        yield orjson.dumps({"type": record_type, **doc}) + b"\n"
+
+async def _export_csv(store, show, flush_at=64 * 1024):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_EXPORT_FIELDS)
+    writer.writeheader()
+    async for record_type, doc in _export_records(store, show):
+        writer.writerow({
+            "type": record_type,
+            **{k: v.isoformat() if isinstance(v, datetime) else v for k, v in doc.items()},
+        })
+        if buffer.tell() >= flush_at:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@api_router.get("/shows/{show_id}/export")
+async def export_show(
+    show_id: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$"), store: Storage = Depends(get_store)
+):
+    show = await store.shows.get(show_id, SHOW_EXPORT_FIELDS)
+    if not show:
+        raise HTTPException(status_code=404, detail="Show not found")
+    
+    if format == "csv":
+        body, media_type = _export_csv(store, show), "text/csv"
+    else:
+        body, media_type = _export_ndjson(store, show), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="show-{show_id}.{format}"'},
+    )
+
+def _read_records(fileobj, format):
+    """Yield (line number, record) for each record of an upload, numbering lines from 1.
+
+    Runs on the threadpool: the upload is already spooled to a temporary
+    file. A line that cannot be parsed is yielded with its exception as the
+    record, so the error is reported against the right line.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+    if format == "csv":
+        reader = csv.DictReader(text)
+        start = 2  # line 1 is the header
+        try:
+            for row in reader:
+                yield start, {k: v for k, v in row.items() if v != ""}
+                start = reader.line_num + 1
+        except csv.Error as e:
+            yield reader.line_num, e
+    else:
+        for number, line in enumerate(text, 1):
+            if line.strip():
+                try:
+                    yield number, orjson.loads(line)
+                except orjson.JSONDecodeError as e:
+                    yield number, e
+
+@api_router.post("/shows/import", response_model=ImportResult)
+async def import_show(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    store: Storage = Depends(get_store),
+):
+    """Import an exported show under new ids, writing IMPORT_BATCH_SIZE documents at a time."""
+    format = format or ("csv" if (file.filename or "").lower().endswith(".csv") else "ndjson")
+    records = _read_records(file.file, format)
+    
+    show_obj = None
+    act_ids = {}  # exported act id -> new act id
+    pending = {"act": [], "expense": []}
+    counts = {"act": 0, "expense": 0}
+    repositories = {"act": store.acts, "expense": store.expenses}
+    rollups = {}
+    
+    async def flush(record_type):
+        if pending[record_type]:
+            failed = await repositories[record_type].insert_many(pending[record_type])
+            if failed:
+                raise ValueError(next(iter(failed.values())))
+            counts[record_type] += len(pending[record_type])
+            pending[record_type] = []
+    
+    line = 0
+    try:
+        while True:
+            batch = await run_in_threadpool(lambda: list(itertools.islice(records, IMPORT_BATCH_SIZE)))
+            if not batch:
+                break
+            for line, record in batch:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise HTTPException(
+                        status_code=422, detail=f"Line {line}: expected an object, got {type(record).__name__}"
+                    )
+                record_type = record.pop("type", None)
+                if show_obj is None:
+                    if record_type != "show":
+                        raise ValueError("the first record must be the show")
+                    show_data = ShowCreate.model_validate(record).dict()
+                    if record.get("created_at"):
+                        show_data["created_at"] = record["created_at"]
+                    show_obj = Show(**show_data)
+                    await store.shows.insert(prepare_for_mongo(show_obj.dict()))
+                elif record_type == "act":
+                    act = CircusAct.model_validate({**record, "id": str(uuid.uuid4()), "show_id": show_obj.id})
+                    act_ids[record.get("id")] = act.id
+                    pending["act"].append(prepare_for_mongo(act.dict()))
+                    _merge_inc(rollups, {"total_duration": act.duration, "act_count": 1})
+                elif record_type == "expense":
+                    expense = Expense.model_validate({
+                        **record,
+                        "id": str(uuid.uuid4()),
+                        "show_id": show_obj.id,
+                        "act_id": act_ids.get(record.get("act_id")),
+                    })
+                    pending["expense"].append(prepare_for_mongo(expense.dict()))
+                    _merge_inc(rollups, expense_rollup_inc(expense.category, expense.amount))
+                else:
+                    raise ValueError(f"unexpected record type {record_type!r}")
+                for pending_type, docs in pending.items():
+                    if len(docs) >= IMPORT_BATCH_SIZE:
+                        await flush(pending_type)
+        if show_obj is None:
+            raise ValueError("the file contains no show")
+        await flush("act")
+        await flush("expense")
+    except Exception as e:
+        if show_obj is not None:
+            # Whatever went wrong, hide the partial import and let the purge worker remove it
+            await store.shows.mark_deleted(show_obj.id)
+            await schedule_purge(store, show_obj.id)
+        if not isinstance(e, (ValueError, ValidationError, csv.Error)):
+            raise
+        message = _validation_message(e) if isinstance(e, ValidationError) else str(e)
+        raise HTTPException(status_code=400, detail=f"Line {line}: {message}" if line else message)
+    
+    await touch_show(store, show_obj.id, rollups)
+    return ImportResult(show_id=show_obj.id, acts=counts["act"], expenses=counts["expense"])
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    return cache.stats()
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -252,8 +1913,131 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+def _observe_request(request, route, status_code, seconds, size, calls):
+    REQUEST_LATENCY.observe(seconds, method=request.method, route=route, status=str(status_code))
+    if size is not None:
+        RESPONSE_SIZE.observe(size, method=request.method, route=route)
+    if SLOW_REQUEST_MS and seconds * 1000 >= SLOW_REQUEST_MS:
+        commands = ", ".join(f"{name} {duration * 1000:.1f}ms" for name, duration in calls)
+        logger.warning(
+            "Slow request %s %s -> %d in %.1fms; %d Mongo commands: %s",
+            request.method, request.url.path, status_code, seconds * 1000, len(calls), commands or "none",
+        )
+
+def _is_admin(request):
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(request.headers.get("x-admin-token", ""), PROFILE_TOKEN)
+
+def _write_profile(profiler, profile_id, request, fmt, calls):
+    summary = profiler.summary()
+    summary["mongo_commands"] = round(sum(duration for _, duration in calls), 6)
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    if fmt == "collapsed":
+        (PROFILE_DIR / f"{profile_id}.collapsed.txt").write_text(profiler.collapsed())
+    else:
+        name = f"{request.method} {request.url.path}"
+        (PROFILE_DIR / f"{profile_id}.speedscope.json").write_bytes(orjson.dumps(profiler.speedscope(name)))
+    logger.info("Profile %s for %s %s: %s", profile_id, request.method, request.url.path, summary)
+
+if PROFILE_TOKEN:
+    # Registered before instrument_requests so it runs inside it and sees the request's Mongo calls
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        requested = request.query_params.get("profile") or request.headers.get("x-profile") or ""
+        fmt = PROFILE_FORMATS.get(requested.strip().lower())
+        if not fmt or not _is_admin(request):
+            return await call_next(request)
+        
+        profile_id = uuid.uuid4().hex
+        calls = db_round_trips.get() or []
+        profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1000)
+        profiler.start()
+        try:
+            response = await call_next(request)
+        except Exception:
+            profiler.stop()
+            raise
+        response.headers["X-Profile-Id"] = profile_id
+        body_iterator = response.body_iterator
+        
+        async def profiled_body():
+            try:
+                async for chunk in body_iterator:
+                    yield chunk
+            finally:
+                profiler.stop()
+                _write_profile(profiler, profile_id, request, fmt, calls)
+        
+        response.body_iterator = profiled_body()
+        return response
+
+@app.get("/api/admin/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(profile_id: str, request: Request):
+    if not _is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    if not profile_id.isalnum():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    for path in (PROFILE_DIR / f"{profile_id}.speedscope.json", PROFILE_DIR / f"{profile_id}.collapsed.txt"):
+        if path.exists():
+            return FileResponse(path, filename=path.name)
+    raise HTTPException(status_code=404, detail="Profile not found")
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    calls = []
+    token = db_round_trips.set(calls)
+    REQUESTS_IN_FLIGHT.inc()
+    start = perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        REQUESTS_IN_FLIGHT.dec()
+        raise
+    finally:
+        db_round_trips.reset(token)
+    if EXPOSE_DB_ROUND_TRIPS:
+        response.headers["X-DB-Round-Trips"] = str(len(calls))
+    
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    body_iterator = response.body_iterator
+    
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        # An event stream lasts as long as its client: it leaves the in-flight
+        # gauge and is timed once its headers are ready, and is counted apart
+        REQUESTS_IN_FLIGHT.dec()
+        _observe_request(request, route, response.status_code, perf_counter() - start, None, calls)
+        
+        async def counted_stream():
+            EVENT_STREAMS_OPEN.inc()
+            try:
+                async for chunk in body_iterator:
+                    yield chunk
+            finally:
+                EVENT_STREAMS_OPEN.dec()
+        
+        response.body_iterator = counted_stream()
+        return response
+    
+    # Latency and size are recorded once the body, possibly streamed, is sent
+    async def observed_body():
+        size = 0
+        try:
+            async for chunk in body_iterator:
+                size += len(chunk)
+                yield chunk
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            _observe_request(request, route, response.status_code, perf_counter() - start, size, calls)
+    
+    response.body_iterator = observed_body()
+    return response
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -261,6 +2045,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def startup(new_store):
+    """Install new_store as the app's storage, prepare it and start the background workers."""
+    global store, purge_queue, expense_report
+    store = new_store
+    if not isinstance(store, MongoStorage) and (EXPOSE_DB_ROUND_TRIPS or SLOW_REQUEST_MS or PROFILE_TOKEN):
+        store = CountedStorage(store)
+    expense_report = None
+    await store.open()
+    if os.environ.get('ENSURE_INDEXES', 'true').lower() == 'true':
+        await store.ensure_indexes()
+    if os.environ.get('VERIFY_INDEXES', 'false').lower() == 'true':
+        collscans = await store.find_collscans()
+        if collscans:
+            routes = ", ".join(route for route, *_ in collscans)
+            raise RuntimeError(f"Queries fall back to COLLSCAN: {routes}")
+    
+    if EVENT_SOURCE == 'changestream':
+        if not isinstance(store, MongoStorage):
+            raise RuntimeError("EVENT_SOURCE=changestream needs the mongo storage backend")
+        background_tasks.append(asyncio.create_task(_follow_changes()))
+    
+    purge_queue = asyncio.Queue(maxsize=PURGE_QUEUE_SIZE)
+    background_tasks.extend(asyncio.create_task(_purge_worker()) for _ in range(PURGE_WORKERS))
+    if ORPHAN_SWEEP_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(_orphan_sweeper()))
+
+async def shutdown():
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    await store.close()
@@ -0,0 +1,18 @@
+"""Repositories for shows, acts and expenses, with interchangeable backends.
+
+MongoStorage is the production backend, MemoryStorage keeps everything in
+process, and SQLiteStorage (storage.sqlite, needs aiosqlite) keeps a single
+database file.
+"""
+from storage.base import ActRepository, ExpenseRepository, ShowRepository, Storage
+from storage.memory import MemoryStorage
+from storage.mongo import MongoStorage
+
+__all__ = [
+    "ActRepository",
+    "ExpenseRepository",
+    "MemoryStorage",
+    "MongoStorage",
+    "ShowRepository",
+    "Storage",
+]
@@ -0,0 +1,377 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from urllib.parse import unquote
+
+
+def project(doc, fields=None):
+    """Copy of doc limited to fields (all fields when None)."""
+    if fields is None:
+        return {k: dict(v) if isinstance(v, dict) else v for k, v in doc.items()}
+    return {k: dict(doc[k]) if isinstance(doc[k], dict) else doc[k] for k in fields if k in doc}
+
+
+def apply_inc(doc, inc):
+    # Mongo-style $inc, including dotted paths such as "expenses_by_category.venue"
+    for path, amount in inc.items():
+        *parents, leaf = path.split(".")
+        target = doc
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = target.get(leaf, 0) + amount
+    return doc
+
+
+def category_key(category):
+    # Field name for a category under expenses_by_category; a bare "." would
+    # nest the rollup and a "$" would be refused by Mongo's $inc
+    return category.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def category_totals(stored, prefix=""):
+    """{category: amount} from a stored expenses_by_category, undoing category_key.
+
+    Also flattens the nesting left by categories written before they were encoded.
+    """
+    totals = {}
+    for key, value in (stored or {}).items():
+        name = prefix + unquote(key)
+        if isinstance(value, dict):
+            totals.update(category_totals(value, name + "."))
+        else:
+            totals[name] = value
+    return totals
+
+
+def build_summary(show_id, act_totals, expense_groups):
+    """Summary dict for one show.
+
+    act_totals is (total_duration, act_count); expense_groups holds
+    (category, act_id, amount, count) per category and act.
+    """
+    by_category, by_act = {}, {}
+    for category, act_id, amount, count in expense_groups:
+        for totals, key in ((by_category, category), (by_act, act_id)):
+            entry = totals.setdefault(key, [0, 0])
+            entry[0] += amount
+            entry[1] += count
+    total_duration, act_count = act_totals
+    return {
+        "show_id": show_id,
+        "total_duration": total_duration,
+        "act_count": act_count,
+        "expense_total": sum(amount for amount, _ in by_category.values()),
+        "expense_count": sum(count for _, count in by_category.values()),
+        "expenses_by_category": [
+            {"category": category, "amount": amount, "count": count}
+            for category, (amount, count) in sorted(by_category.items())
+        ],
+        # Expenses without an act sort first, as they do in Mongo
+        "expenses_by_act": [
+            {"act_id": act_id, "amount": amount, "count": count}
+            for act_id, (amount, count) in sorted(by_act.items(), key=lambda item: (item[0] is not None, item[0] or ""))
+        ],
+    }
+
+
+def booking(performer_key, act, show):
+    """One performer's slot: the act they appear in and the show it belongs to."""
+    return {
+        "performer": performer_key,
+        "show_id": show["id"],
+        "show_title": show["title"],
+        "date": show.get("date"),
+        "venue": show.get("venue"),
+        "act_id": act["id"],
+        "act_name": act["name"],
+        "sequence_order": act["sequence_order"],
+    }
+
+
+def in_date_range(value, date_from=None, date_to=None):
+    # Undated shows fall outside every bounded range, as do dates stored as text (as in Mongo)
+    if date_from is None and date_to is None:
+        return True
+    return isinstance(value, datetime) and (
+        (date_from is None or value >= date_from) and (date_to is None or value <= date_to)
+    )
+
+
+def sort_bookings(bookings):
+    # Undated bookings first, with those dated as text (read as undated, see in_date_range)
+    return sorted(bookings, key=lambda b: (
+        isinstance(b["date"], datetime), b["date"] if isinstance(b["date"], datetime) else 0,
+        b["show_id"], b["sequence_order"], b["act_id"], b["performer"],
+    ))
+
+
+# What a timeline entry carries besides its offsets
+TIMELINE_FIELDS = ["id", "name", "performers", "sequence_order", "duration"]
+
+
+def timeline_rows(acts, offset=0):
+    """Timeline entries for acts in running order, the first starting offset minutes into the show."""
+    rows = []
+    for act in acts:
+        end = offset + act["duration"]
+        rows.append({**project(act, TIMELINE_FIELDS), "start_offset": offset, "end_offset": end})
+        offset = end
+    return rows
+
+
+# Searchable text fields and their relative weights, by result type
+SEARCH_FIELDS = {
+    "act": {"name": 10, "staging_notes": 1, "sound_requirements": 1, "lighting_requirements": 1},
+    "expense": {"description": 10},
+}
+
+# What a search hit carries, instead of the whole document
+SEARCH_DISPLAY_FIELDS = {
+    "act": ["id", "show_id", "name", "performers", "sequence_order"],
+    "expense": ["id", "show_id", "act_id", "description", "category", "amount"],
+}
+
+
+def search_hit(kind, doc, score):
+    return {"type": kind, "score": score, **project(doc, SEARCH_DISPLAY_FIELDS[kind])}
+
+
+def rank_hits(hits, offset=0, limit=None):
+    # Best score first; ties break on type and id so pages are stable
+    ranked = sorted(hits, key=lambda hit: (-hit["score"], hit["type"], hit["id"]))
+    return ranked[offset:offset + limit if limit is not None else None]
+
+
+class ShowRepository(ABC):
+    """Shows, newest first. Reads and updates skip shows marked deleted.
+
+    Every write of a show (insert, update, increment, set_many,
+    mark_deleted) also advances the catalogue version in the same write.
+    """
+
+    # List cursors are "<created_at>,<id>", or "<date>,<id>" for find_dated
+    cursor_field = "created_at"
+
+    @abstractmethod
+    async def get(self, show_id, fields=None):
+        ...
+
+    async def exists(self, show_id):
+        return await self.get(show_id, ["id"]) is not None
+
+    @abstractmethod
+    async def live_ids(self, show_ids):
+        """The subset of show_ids that exist and are not deleted."""
+
+    @abstractmethod
+    def find(self, after=None, limit=None, fields=None, stale_ok=False):
+        """Async iterator over live shows; after is a (created_at, id) cursor.
+
+        stale_ok lets the backend serve the read from a replica that may lag.
+        """
+
+    @abstractmethod
+    def find_dated(self, date_from=None, date_to=None, venue=None, after=None, limit=None, fields=None, stale_ok=False):
+        """Async iterator over live dated shows by date, then id; after is a (date, id) cursor.
+
+        Both bounds are inclusive; venue, when given, must match exactly.
+        """
+
+    @abstractmethod
+    async def insert(self, show, session=None):
+        ...
+
+    @abstractmethod
+    async def update(self, show_id, fields, inc=None):
+        """Set fields (and apply the inc increments) on a live show in one write.
+
+        Returns the updated show, or None if there is none.
+        """
+
+    @abstractmethod
+    async def increment(self, show_id, inc, session=None):
+        """Apply the inc increments to a show, live or not; returns the updated show, or None if there is none."""
+
+    @abstractmethod
+    async def set_many(self, updates):
+        """Set fields on several shows; updates maps show id to fields."""
+
+    @abstractmethod
+    async def mark_deleted(self, show_id):
+        """Soft-delete a live show, advancing its version; False if there was none."""
+
+    @abstractmethod
+    async def deleted_ids(self):
+        ...
+
+    @abstractmethod
+    async def remove_deleted(self, show_id):
+        ...
+
+    @abstractmethod
+    async def catalogue_version(self):
+        """A counter that moves whenever any show changes, so show lists and reports can be tagged with it."""
+
+
+class ActRepository(ABC):
+    """Acts in running order: sequence_order, then id."""
+
+    cursor_field = "sequence_order"
+
+    @abstractmethod
+    async def get(self, act_id, fields=None):
+        ...
+
+    @abstractmethod
+    def find(self, show_id, after=None, limit=None, fields=None, session=None, stale_ok=False):
+        """Async iterator over a show's acts; after is a (sequence_order, id) cursor."""
+
+    @abstractmethod
+    async def find_ids(self, act_ids, show_id=None, fields=None):
+        ...
+
+    @abstractmethod
+    async def neighbour(self, show_id, sequence_order=None, direction=1, exclude_id=None):
+        """Nearest act above (direction=1) or below (direction=-1) sequence_order.
+
+        Without sequence_order this is the first or last act of the show.
+        """
+
+    @abstractmethod
+    async def insert(self, act):
+        ...
+
+    @abstractmethod
+    async def insert_many(self, acts, session=None):
+        """Insert what can be inserted; returns {position: error message} for the rest."""
+
+    @abstractmethod
+    async def update(self, act_id, fields):
+        """Set fields on an act and return it as it was before, or None."""
+
+    @abstractmethod
+    async def set_many(self, updates):
+        """Set fields on several acts; updates maps act id to fields."""
+
+    @abstractmethod
+    async def find_missing(self, field, limit, fields=None):
+        """Up to limit acts that have no value for field (for backfills)."""
+
+    @abstractmethod
+    async def set_orders(self, orders, show_id=None):
+        """Write (act_id, sequence_order) pairs, limited to show_id when given."""
+
+    @abstractmethod
+    async def delete(self, act_id):
+        """Delete an act and return it, or None."""
+
+    @abstractmethod
+    async def delete_by_show(self, show_id, limit, session=None):
+        """Delete up to limit of a show's acts; returns how many were deleted."""
+
+    @abstractmethod
+    async def show_ids(self):
+        ...
+
+    @abstractmethod
+    async def timeline(self, show_id):
+        """A show's acts in running order as timeline_rows: offsets are minutes from the start of the show."""
+
+    @abstractmethod
+    def scan(self, fields, batch_size):
+        """Async iterator over every act, projected to fields, in lists of up to batch_size.
+
+        For reports: the order is unspecified. Reads the primary, as reports
+        are kept for the catalogue version read before the scan.
+        """
+
+
+class ExpenseRepository(ABC):
+    """Expenses, newest first."""
+
+    cursor_field = "created_at"
+
+    @abstractmethod
+    def find(self, show_id, after=None, limit=None, fields=None, session=None, stale_ok=False):
+        """Async iterator over a show's expenses; after is a (created_at, id) cursor."""
+
+    @abstractmethod
+    async def insert(self, expense):
+        ...
+
+    @abstractmethod
+    async def insert_many(self, expenses, session=None):
+        """Insert what can be inserted; returns {position: error message} for the rest."""
+
+    @abstractmethod
+    async def delete(self, expense_id):
+        """Delete an expense and return it, or None."""
+
+    @abstractmethod
+    async def delete_by_act(self, act_id, session=None):
+        """Delete an act's expenses; returns [{"category", "amount", "count"}] of exactly what went."""
+
+    @abstractmethod
+    async def delete_by_show(self, show_id, limit, session=None):
+        ...
+
+    @abstractmethod
+    async def show_ids(self):
+        ...
+
+    @abstractmethod
+    def scan(self, fields, batch_size):
+        """Async iterator over every expense, projected to fields, in lists of up to batch_size (see ActRepository)."""
+
+
+class Storage(ABC):
+    """The show, act and expense repositories of one backend."""
+
+    shows: ShowRepository
+    acts: ActRepository
+    expenses: ExpenseRepository
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def ensure_indexes(self):
+        pass
+
+    async def find_collscans(self):
+        """(route, collection, filter, sort) for each query that scans a whole collection."""
+        return []
+
+    @abstractmethod
+    async def summaries(self, show_ids):
+        """{show_id: summary dict} for the live shows among show_ids (see build_summary)."""
+
+    def changes(self):
+        """Async iterator of (collection, operation, document, changed_fields) for every write.
+
+        collection is "shows", "acts" or "expenses"; operation is "insert",
+        "update" or "delete"; document is the new document, or the deleted
+        one; changed_fields is the set of fields an update set.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no change feed")
+
+    @abstractmethod
+    async def bookings(self, performer_keys, date_from=None, date_to=None):
+        """Bookings (see booking) of the given performers in live shows dated within the range.
+
+        Bounds are datetimes like the stored show dates (midnight UTC) and
+        both are inclusive; results come from sort_bookings.
+        """
+
+    @abstractmethod
+    async def search(self, query, kinds, show_id=None, limit=20, offset=0):
+        """Ranked search hits (see search_hit) for query over the SEARCH_FIELDS of kinds.
+
+        Hits of every kind are merged by score (see rank_hits); shows are
+        not checked for deletion here.
+        """
+
+    async def run_in_transaction(self, fn, *args):
+        """Call fn(*args, session=...) inside a transaction when the backend has them."""
+        return await fn(*args, session=None)
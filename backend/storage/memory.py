@@ -0,0 +1,387 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from search import InvertedIndex
+from storage.base import (
+    SEARCH_FIELDS, ActRepository, ExpenseRepository, ShowRepository, Storage, apply_inc, booking, build_summary,
+    in_date_range, project, rank_hits, search_hit, sort_bookings, timeline_rows,
+)
+
+# Sorts after every act id at the same sequence_order
+_MAX_ID = "\uffff"
+
+
+def _remove(keys, key):
+    del keys[bisect_left(keys, key)]
+
+
+def _newest_first(keys, after, limit):
+    # keys are (created_at, id) ascending; walk them backwards from the cursor
+    end = bisect_left(keys, after) if after else len(keys)
+    start = max(0, end - limit) if limit else 0
+    return reversed(keys[start:end])
+
+
+class _Table:
+    """Documents by id, copied on the way in and out."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def _insert(self, doc):
+        if doc["id"] in self.docs:
+            raise KeyError(f"E11000 duplicate key error: id {doc['id']!r}")
+        self.docs[doc["id"]] = project(doc)
+
+    def _insert_many(self, docs):
+        failed = {}
+        for position, doc in enumerate(docs):
+            try:
+                self._insert(doc)
+            except KeyError as e:
+                failed[position] = e.args[0]
+        return failed
+
+    def _get(self, doc_id, fields=None):
+        doc = self.docs.get(doc_id)
+        return None if doc is None else project(doc, fields)
+
+    async def scan(self, fields, batch_size):
+        docs = list(self.docs.values())
+        for start in range(0, len(docs), batch_size):
+            yield [project(doc, fields) for doc in docs[start:start + batch_size]]
+
+
+def _dated(doc):
+    # Sort key in MemoryShowRepository.dated, or None for an undated show
+    return (doc["date"], doc["id"]) if isinstance(doc.get("date"), datetime) else None
+
+
+class MemoryShowRepository(_Table, ShowRepository):
+    def __init__(self):
+        super().__init__()
+        self.live = []  # (created_at, id) of live shows, ascending
+        self.dated = []  # (date, id) of live dated shows, ascending
+        self.version = 0  # the catalogue version
+
+    def _redate(self, doc, fields):
+        # Apply fields to a live show, moving it in the date index if its date changes
+        before = _dated(doc)
+        doc.update(fields)
+        after = _dated(doc)
+        if before != after:
+            if before is not None:
+                _remove(self.dated, before)
+            if after is not None:
+                insort(self.dated, after)
+
+    async def get(self, show_id, fields=None):
+        doc = self.docs.get(show_id)
+        if doc is None or doc.get("deleted_at") is not None:
+            return None
+        return project(doc, fields)
+
+    async def live_ids(self, show_ids):
+        return {show_id for show_id in show_ids if await self.get(show_id, ["id"])}
+
+    async def find(self, after=None, limit=None, fields=None, stale_ok=False):
+        for _, show_id in _newest_first(self.live, after, limit):
+            yield project(self.docs[show_id], fields)
+
+    async def find_dated(
+        self, date_from=None, date_to=None, venue=None, after=None, limit=None, fields=None, stale_ok=False
+    ):
+        if after:
+            start = bisect_right(self.dated, after)
+        else:
+            start = 0 if date_from is None else bisect_left(self.dated, (date_from, ""))
+        found = 0
+        for day, show_id in self.dated[start:]:
+            if date_to is not None and day > date_to or limit and found == limit:
+                break
+            doc = self.docs[show_id]
+            if venue is None or doc.get("venue") == venue:
+                found += 1
+                yield project(doc, fields)
+
+    async def insert(self, show, session=None):
+        self._insert(show)
+        self.version += 1
+        if show.get("deleted_at") is None:
+            insort(self.live, (show["created_at"], show["id"]))
+            if _dated(show) is not None:
+                insort(self.dated, _dated(show))
+
+    async def update(self, show_id, fields, inc=None):
+        if await self.get(show_id, ["id"]) is None:
+            return None
+        self._redate(self.docs[show_id], fields)
+        apply_inc(self.docs[show_id], inc or {})
+        self.version += 1
+        return project(self.docs[show_id])
+
+    async def increment(self, show_id, inc, session=None):
+        if show_id in self.docs:
+            self.version += 1
+            return project(apply_inc(self.docs[show_id], inc))
+
+    async def set_many(self, updates):
+        for show_id, fields in updates.items():
+            doc = self.docs.get(show_id)
+            if doc is None:
+                continue
+            if doc.get("deleted_at") is None:
+                self._redate(doc, project(fields))
+            else:
+                doc.update(project(fields))
+            self.version += 1
+
+    async def mark_deleted(self, show_id):
+        doc = self.docs.get(show_id)
+        if doc is None or doc.get("deleted_at") is not None:
+            return False
+        doc["deleted_at"] = datetime.now(timezone.utc)
+        apply_inc(doc, {"version": 1})
+        self.version += 1
+        _remove(self.live, (doc["created_at"], show_id))
+        if _dated(doc) is not None:
+            _remove(self.dated, _dated(doc))
+        return True
+
+    async def deleted_ids(self):
+        return [show_id for show_id, doc in self.docs.items() if doc.get("deleted_at") is not None]
+
+    async def remove_deleted(self, show_id):
+        doc = self.docs.get(show_id)
+        if doc is not None and doc.get("deleted_at") is not None:
+            del self.docs[show_id]
+
+    async def catalogue_version(self):
+        return self.version
+
+
+class MemoryActRepository(_Table, ActRepository):
+    def __init__(self):
+        super().__init__()
+        self.by_show = defaultdict(list)  # show_id -> (sequence_order, id), ascending
+        self.by_performer = defaultdict(set)  # performer key -> act ids
+        self.text = InvertedIndex(SEARCH_FIELDS["act"])
+
+    def _index(self, doc):
+        insort(self.by_show[doc["show_id"]], (doc["sequence_order"], doc["id"]))
+        for key in doc.get("performer_keys") or ():
+            self.by_performer[key].add(doc["id"])
+        self.text.add(doc["id"], doc)
+
+    def _unindex(self, doc):
+        keys = self.by_show[doc["show_id"]]
+        _remove(keys, (doc["sequence_order"], doc["id"]))
+        if not keys:
+            del self.by_show[doc["show_id"]]
+        for key in doc.get("performer_keys") or ():
+            self.by_performer[key].discard(doc["id"])
+            if not self.by_performer[key]:
+                del self.by_performer[key]
+        self.text.remove(doc["id"])
+
+    async def get(self, act_id, fields=None):
+        return self._get(act_id, fields)
+
+    async def find(self, show_id, after=None, limit=None, fields=None, session=None, stale_ok=False):
+        keys = self.by_show.get(show_id, [])
+        start = bisect_right(keys, after) if after else 0
+        end = start + limit if limit else len(keys)
+        for _, act_id in keys[start:end]:
+            yield project(self.docs[act_id], fields)
+
+    async def find_ids(self, act_ids, show_id=None, fields=None):
+        docs = (self.docs.get(act_id) for act_id in dict.fromkeys(act_ids))
+        return [
+            project(doc, fields) for doc in docs
+            if doc is not None and (show_id is None or doc["show_id"] == show_id)
+        ]
+
+    async def neighbour(self, show_id, sequence_order=None, direction=1, exclude_id=None):
+        keys = self.by_show.get(show_id, [])
+        if direction > 0:
+            start = 0 if sequence_order is None else bisect_right(keys, (sequence_order, _MAX_ID))
+            candidates = keys[start:start + 2]
+        else:
+            end = len(keys) if sequence_order is None else bisect_left(keys, (sequence_order, ""))
+            candidates = keys[max(0, end - 2):end][::-1]
+        for order, act_id in candidates:
+            if act_id != exclude_id:
+                return {"id": act_id, "sequence_order": order}
+        return None
+
+    async def insert(self, act):
+        self._insert(act)
+        self._index(act)
+
+    async def insert_many(self, acts, session=None):
+        failed = self._insert_many(acts)
+        for position, act in enumerate(acts):
+            if position not in failed:
+                self._index(act)
+        return failed
+
+    async def update(self, act_id, fields):
+        doc = self.docs.get(act_id)
+        if doc is None:
+            return None
+        before = project(doc)
+        self._unindex(doc)
+        doc.update(fields)
+        self._index(doc)
+        return before
+
+    async def set_many(self, updates):
+        for act_id, fields in updates.items():
+            doc = self.docs.get(act_id)
+            if doc is not None:
+                self._unindex(doc)
+                doc.update(project(fields))
+                self._index(doc)
+
+    async def find_missing(self, field, limit, fields=None):
+        missing = (doc for doc in self.docs.values() if doc.get(field) is None)
+        return [project(doc, fields) for doc, _ in zip(missing, range(limit))]
+
+    async def set_orders(self, orders, show_id=None):
+        for act_id, order in orders:
+            doc = self.docs.get(act_id)
+            if doc is not None and (show_id is None or doc["show_id"] == show_id):
+                # Only the running order moves; the other indexes stay as they are
+                keys = self.by_show[doc["show_id"]]
+                _remove(keys, (doc["sequence_order"], act_id))
+                doc["sequence_order"] = order
+                insort(keys, (order, act_id))
+
+    async def delete(self, act_id):
+        doc = self.docs.pop(act_id, None)
+        if doc is not None:
+            self._unindex(doc)
+        return doc
+
+    async def delete_by_show(self, show_id, limit, session=None):
+        act_ids = [act_id for _, act_id in self.by_show.get(show_id, [])[:limit]]
+        for act_id in act_ids:
+            await self.delete(act_id)
+        return len(act_ids)
+
+    async def timeline(self, show_id):
+        return timeline_rows(self.docs[act_id] for _, act_id in self.by_show.get(show_id, []))
+
+    async def show_ids(self):
+        return set(self.by_show)
+
+
+class MemoryExpenseRepository(_Table, ExpenseRepository):
+    def __init__(self):
+        super().__init__()
+        self.by_show = defaultdict(list)  # show_id -> (created_at, id), ascending
+        self.by_act = defaultdict(set)
+        self.text = InvertedIndex(SEARCH_FIELDS["expense"])
+
+    def _index(self, doc):
+        insort(self.by_show[doc["show_id"]], (doc["created_at"], doc["id"]))
+        if doc.get("act_id") is not None:
+            self.by_act[doc["act_id"]].add(doc["id"])
+        self.text.add(doc["id"], doc)
+
+    async def find(self, show_id, after=None, limit=None, fields=None, session=None, stale_ok=False):
+        for _, expense_id in _newest_first(self.by_show.get(show_id, []), after, limit):
+            yield project(self.docs[expense_id], fields)
+
+    async def insert(self, expense):
+        self._insert(expense)
+        self._index(expense)
+
+    async def insert_many(self, expenses, session=None):
+        failed = self._insert_many(expenses)
+        for position, expense in enumerate(expenses):
+            if position not in failed:
+                self._index(expense)
+        return failed
+
+    async def delete(self, expense_id):
+        doc = self.docs.pop(expense_id, None)
+        if doc is None:
+            return None
+        keys = self.by_show[doc["show_id"]]
+        _remove(keys, (doc["created_at"], expense_id))
+        if not keys:
+            del self.by_show[doc["show_id"]]
+        if doc.get("act_id") is not None:
+            self.by_act[doc["act_id"]].discard(expense_id)
+            if not self.by_act[doc["act_id"]]:
+                del self.by_act[doc["act_id"]]
+        self.text.remove(expense_id)
+        return doc
+
+    async def delete_by_act(self, act_id, session=None):
+        by_category = {}
+        for expense_id in list(self.by_act.get(act_id, ())):
+            expense = await self.delete(expense_id)
+            totals = by_category.setdefault(
+                expense["category"], {"category": expense["category"], "amount": 0, "count": 0}
+            )
+            totals["amount"] += expense["amount"]
+            totals["count"] += 1
+        return list(by_category.values())
+
+    async def delete_by_show(self, show_id, limit, session=None):
+        expense_ids = [expense_id for _, expense_id in self.by_show.get(show_id, [])[:limit]]
+        for expense_id in expense_ids:
+            await self.delete(expense_id)
+        return len(expense_ids)
+
+    async def show_ids(self):
+        return set(self.by_show)
+
+
+class MemoryStorage(Storage):
+    """Process-local storage for tests, benchmarks and throwaway instances.
+
+    Every list is served from a sorted index, so lookups cost what the
+    equivalent Mongo index scan would; nothing survives a restart.
+    """
+
+    def __init__(self):
+        self.shows = MemoryShowRepository()
+        self.acts = MemoryActRepository()
+        self.expenses = MemoryExpenseRepository()
+
+    async def summaries(self, show_ids):
+        summaries = {}
+        for show_id in await self.shows.live_ids(show_ids):
+            acts = [self.acts.docs[act_id] for _, act_id in self.acts.by_show.get(show_id, [])]
+            expenses = [self.expenses.docs[expense_id] for _, expense_id in self.expenses.by_show.get(show_id, [])]
+            summaries[show_id] = build_summary(
+                show_id,
+                (sum(act["duration"] for act in acts), len(acts)),
+                [(expense["category"], expense.get("act_id"), expense["amount"], 1) for expense in expenses],
+            )
+        return summaries
+
+    async def bookings(self, performer_keys, date_from=None, date_to=None):
+        found = []
+        for key in dict.fromkeys(performer_keys):
+            for act_id in self.acts.by_performer.get(key, ()):
+                act = self.acts.docs[act_id]
+                show = self.shows.docs.get(act["show_id"])
+                if show is None or show.get("deleted_at") is not None:
+                    continue
+                if in_date_range(show.get("date"), date_from, date_to):
+                    found.append(booking(key, act, show))
+        return sort_bookings(found)
+
+    async def search(self, query, kinds, show_id=None, limit=20, offset=0):
+        hits = []
+        for kind in kinds:
+            table = {"act": self.acts, "expense": self.expenses}[kind]
+            within = None if show_id is None else {doc_id for _, doc_id in table.by_show.get(show_id, ())}
+            for doc_id, score in table.text.search(query, offset + limit, within):
+                hits.append(search_hit(kind, table.docs[doc_id], score))
+        return rank_hits(hits, offset, limit)
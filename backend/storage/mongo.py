@@ -0,0 +1,545 @@
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+from storage.base import (
+    SEARCH_DISPLAY_FIELDS, SEARCH_FIELDS, TIMELINE_FIELDS, ActRepository, ExpenseRepository, ShowRepository, Storage,
+    booking, rank_hits, search_hit, sort_bookings,
+)
+
+# List sort orders; the trailing id makes each one a total order for keyset paging
+SHOW_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+SHOW_DATE_SORT = [("date", ASCENDING), ("id", ASCENDING)]
+ACT_SORT = [("sequence_order", ASCENDING), ("id", ASCENDING)]
+EXPENSE_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+
+# Indexes backing every query shape used by the repositories below
+def text_index(kind):
+    # A collection has at most one text index, so it covers every searchable field
+    weights = SEARCH_FIELDS[kind]
+    return IndexModel([(field, TEXT) for field in weights], weights=weights, name="search_text")
+
+
+# Search results type -> collection
+SEARCHED = {"act": "circus_acts", "expense": "expenses"}
+
+# Shows marked with deleted_at are invisible to every read and write route.
+# DELETED matches the partial index on deleted_at, so the purge queries use it.
+LIVE = {"deleted_at": None}
+DELETED = {"deleted_at": {"$type": "date"}}
+
+INDEXES = {
+    "shows": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel(SHOW_SORT, name="created_at_id"),
+        IndexModel([("date", ASCENDING), ("venue", ASCENDING)], name="date_venue"),
+        # Only soft-deleted shows awaiting their purge, so it stays tiny
+        IndexModel([("deleted_at", ASCENDING)], name="deleted_at", partialFilterExpression=DELETED),
+    ],
+    "circus_acts": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("show_id", ASCENDING)] + ACT_SORT, name="show_id_sequence_order_id"),
+        IndexModel([("performer_keys", ASCENDING)], name="performer_keys"),
+        text_index("act"),
+    ],
+    "expenses": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("show_id", ASCENDING)] + EXPENSE_SORT, name="show_id_created_at_id"),
+        IndexModel([("act_id", ASCENDING)], name="act_id"),
+        text_index("expense"),
+    ],
+}
+
+# (route, collection, filter, sort) for each query the routes issue
+QUERY_SHAPES = [
+    ("get_shows", "shows", {"deleted_at": None}, SHOW_SORT),
+    ("get_show", "shows", {"id": "", "deleted_at": None}, None),
+    ("get_shows_dated", "shows", {"date": {"$type": "date"}, "venue": "", "deleted_at": None}, SHOW_DATE_SORT),
+    ("sweep_orphans", "shows", DELETED, None),
+    ("get_acts_by_show", "circus_acts", {"show_id": ""}, ACT_SORT),
+    ("get_act", "circus_acts", {"id": ""}, None),
+    ("show_timeline", "circus_acts", {"show_id": ""}, ACT_SORT),
+    ("delete_show", "circus_acts", {"show_id": ""}, None),
+    ("performer_schedule", "circus_acts", {"performer_keys": {"$in": [""]}}, None),
+    ("get_expenses_by_show", "expenses", {"show_id": ""}, EXPENSE_SORT),
+    ("delete_act", "expenses", {"act_id": ""}, None),
+    ("delete_expense", "expenses", {"id": ""}, None),
+    ("search", "circus_acts", {"$text": {"$search": "x"}}, None),
+    ("search", "expenses", {"$text": {"$search": "x"}}, None),
+]
+
+# Change stream collection name -> the name Storage.changes() reports
+WATCHED = {"shows": "shows", "circus_acts": "acts", "expenses": "expenses"}
+
+
+
+def projection(fields):
+    return {"_id": 0} if fields is None else {"_id": 0, **{field: 1 for field in fields}}
+
+
+def after_filter(after, sort):
+    (field, direction), (tie_field, _) = sort
+    value, last_id = after
+    op = "$gt" if direction == ASCENDING else "$lt"
+    return {"$or": [{field: {op: value}}, {field: value, tie_field: {op: last_id}}]}
+
+
+def list_collection(collection, read_preference):
+    # The collection that stale_ok list reads go to
+    if read_preference in (None, "primary"):
+        return collection
+    mode = read_pref_mode_from_name(read_preference)
+    return collection.with_options(read_preference=make_read_preference(mode, None))
+
+
+def find_sorted(collection, query, sort, after, limit, fields, session=None):
+    if after:
+        query = {"$and": [query, after_filter(after, sort)]}
+    cursor = collection.find(query, projection(fields), session=session).sort(sort)
+    return cursor.limit(limit) if limit else cursor
+
+
+async def scan_batches(collection, fields, batch_size):
+    cursor = collection.find({}, projection(fields)).batch_size(batch_size)
+    while True:
+        batch = await cursor.to_list(batch_size)
+        if not batch:
+            break
+        yield batch
+
+
+async def insert_many(collection, docs, session=None):
+    try:
+        await collection.insert_many(docs, ordered=False, session=session)
+    except BulkWriteError as e:
+        return {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+    return {}
+
+
+async def delete_batch(collection, query, limit, session=None):
+    docs = await collection.find(query, {"_id": 1}, session=session).limit(limit).to_list(limit)
+    if docs:
+        await collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}}, session=session)
+    return len(docs)
+
+
+def summary_pipeline(show_ids):
+    # Act totals and the expense $facet are joined per show through the show_id indexes
+    return [
+        {"$match": {"id": {"$in": show_ids}, **LIVE}},
+        {"$project": {"_id": 0, "id": 1}},
+        {"$lookup": {
+            "from": "circus_acts",
+            "localField": "id",
+            "foreignField": "show_id",
+            "pipeline": [
+                {"$group": {"_id": None, "total_duration": {"$sum": "$duration"}, "act_count": {"$sum": 1}}},
+            ],
+            "as": "acts",
+        }},
+        {"$lookup": {
+            "from": "expenses",
+            "localField": "id",
+            "foreignField": "show_id",
+            "pipeline": [
+                {"$facet": {
+                    "total": [
+                        {"$group": {"_id": None, "amount": {"$sum": "$amount"}, "count": {"$sum": 1}}},
+                    ],
+                    "by_category": [
+                        {"$group": {"_id": "$category", "amount": {"$sum": "$amount"}, "count": {"$sum": 1}}},
+                        {"$sort": {"_id": 1}},
+                        {"$project": {"_id": 0, "category": "$_id", "amount": 1, "count": 1}},
+                    ],
+                    "by_act": [
+                        {"$group": {"_id": "$act_id", "amount": {"$sum": "$amount"}, "count": {"$sum": 1}}},
+                        {"$sort": {"_id": 1}},
+                        {"$project": {"_id": 0, "act_id": "$_id", "amount": 1, "count": 1}},
+                    ],
+                }},
+            ],
+            "as": "expenses",
+        }},
+        {"$unwind": "$expenses"},
+        {"$project": {
+            "show_id": "$id",
+            "total_duration": {"$ifNull": [{"$first": "$acts.total_duration"}, 0]},
+            "act_count": {"$ifNull": [{"$first": "$acts.act_count"}, 0]},
+            "expense_total": {"$ifNull": [{"$first": "$expenses.total.amount"}, 0]},
+            "expense_count": {"$ifNull": [{"$first": "$expenses.total.count"}, 0]},
+            "expenses_by_category": "$expenses.by_category",
+            "expenses_by_act": "$expenses.by_act",
+        }},
+    ]
+
+
+def timeline_pipeline(show_id):
+    # Running totals of duration in running order; the sort is served by the show_id index
+    return [
+        {"$match": {"show_id": show_id}},
+        {"$setWindowFields": {
+            "sortBy": dict(ACT_SORT),
+            "output": {"end_offset": {"$sum": "$duration", "window": {"documents": ["unbounded", "current"]}}},
+        }},
+        {"$project": {
+            "_id": 0,
+            **{field: 1 for field in TIMELINE_FIELDS},
+            "start_offset": {"$subtract": ["$end_offset", "$duration"]},
+            "end_offset": 1,
+        }},
+    ]
+
+
+def bookings_pipeline(performer_keys, date_from=None, date_to=None):
+    # Acts come from the multikey performer_keys index; only their shows are joined
+    show_match = {"show.deleted_at": None}
+    if date_from is not None or date_to is not None:
+        show_match["show.date"] = {"$ne": None}
+        if date_from is not None:
+            show_match["show.date"]["$gte"] = date_from
+        if date_to is not None:
+            show_match["show.date"]["$lte"] = date_to
+    return [
+        {"$match": {"performer_keys": {"$in": performer_keys}}},
+        {"$project": {"_id": 0, "id": 1, "name": 1, "show_id": 1, "sequence_order": 1, "performer_keys": 1}},
+        {"$lookup": {"from": "shows", "localField": "show_id", "foreignField": "id", "as": "show"}},
+        {"$unwind": "$show"},
+        {"$match": show_match},
+        {"$project": {"show._id": 0, "show.description": 0, "show.expenses_by_category": 0}},
+    ]
+
+
+def _plan_stages(plan):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+class MongoShowRepository(ShowRepository):
+    def __init__(self, db, list_read_preference=None):
+        self.collection = db.shows
+        self.lists = list_collection(self.collection, list_read_preference)
+        self.meta = db.meta
+
+    async def _advance_catalogue(self, session=None):
+        # Issued right after the show write, and inside its transaction when it has one. Readers
+        # fetch the version before the shows, so a version never tags a list that lacks its write
+        await self.meta.update_one({"_id": "shows"}, {"$inc": {"version": 1}}, upsert=True, session=session)
+
+    async def get(self, show_id, fields=None):
+        return await self.collection.find_one({"id": show_id, **LIVE}, projection(fields))
+
+    async def exists(self, show_id):
+        return await self.collection.count_documents({"id": show_id, **LIVE}, limit=1) > 0
+
+    async def live_ids(self, show_ids):
+        live = await self.collection.find({"id": {"$in": list(show_ids)}, **LIVE}, {"_id": 0, "id": 1}).to_list(None)
+        return {show["id"] for show in live}
+
+    def find(self, after=None, limit=None, fields=None, stale_ok=False):
+        return find_sorted(self.lists if stale_ok else self.collection, LIVE, SHOW_SORT, after, limit, fields)
+
+    def find_dated(self, date_from=None, date_to=None, venue=None, after=None, limit=None, fields=None, stale_ok=False):
+        dated = {"$type": "date"}
+        if date_from is not None:
+            dated["$gte"] = date_from
+        if date_to is not None:
+            dated["$lte"] = date_to
+        query = {**LIVE, "date": dated}
+        if venue is not None:
+            query["venue"] = venue
+        return find_sorted(self.lists if stale_ok else self.collection, query, SHOW_DATE_SORT, after, limit, fields)
+
+    async def insert(self, show, session=None):
+        await self.collection.insert_one(show, session=session)
+        await self._advance_catalogue(session)
+
+    async def update(self, show_id, fields, inc=None):
+        change = {"$set": fields, "$inc": inc} if inc else {"$set": fields}
+        show = await self.collection.find_one_and_update(
+            {"id": show_id, **LIVE}, change, projection(None), return_document=ReturnDocument.AFTER
+        )
+        if show is not None:
+            await self._advance_catalogue()
+        return show
+
+    async def increment(self, show_id, inc, session=None):
+        show = await self.collection.find_one_and_update(
+            {"id": show_id},
+            {"$inc": inc},
+            projection(None),
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+        if show is not None:
+            await self._advance_catalogue(session)
+        return show
+
+    async def set_many(self, updates):
+        if updates:
+            await self.collection.bulk_write(
+                [UpdateOne({"id": show_id}, {"$set": fields}) for show_id, fields in updates.items()],
+                ordered=False,
+            )
+            await self._advance_catalogue()
+
+    async def mark_deleted(self, show_id):
+        result = await self.collection.update_one(
+            {"id": show_id, **LIVE}, {"$set": {"deleted_at": datetime.now(timezone.utc)}, "$inc": {"version": 1}}
+        )
+        if not result.matched_count:
+            return False
+        await self._advance_catalogue()
+        return True
+
+    async def deleted_ids(self):
+        pending = await self.collection.find(DELETED, {"_id": 0, "id": 1}).to_list(None)
+        return [show["id"] for show in pending]
+
+    async def remove_deleted(self, show_id):
+        await self.collection.delete_one({"id": show_id, **DELETED})
+
+    async def catalogue_version(self):
+        meta = await self.meta.find_one({"_id": "shows"})
+        return meta["version"] if meta else 0
+
+
+class MongoActRepository(ActRepository):
+    def __init__(self, db, list_read_preference=None):
+        self.collection = db.circus_acts
+        self.lists = list_collection(self.collection, list_read_preference)
+
+    async def get(self, act_id, fields=None):
+        return await self.collection.find_one({"id": act_id}, projection(fields))
+
+    def find(self, show_id, after=None, limit=None, fields=None, session=None, stale_ok=False):
+        # Reads inside a transaction must stay on the primary
+        collection = self.lists if stale_ok and session is None else self.collection
+        return find_sorted(collection, {"show_id": show_id}, ACT_SORT, after, limit, fields, session)
+
+    async def find_ids(self, act_ids, show_id=None, fields=None):
+        query = {"id": {"$in": list(act_ids)}}
+        if show_id is not None:
+            query["show_id"] = show_id
+        return await self.collection.find(query, projection(fields)).to_list(None)
+
+    async def neighbour(self, show_id, sequence_order=None, direction=1, exclude_id=None):
+        query = {"show_id": show_id}
+        if exclude_id is not None:
+            query["id"] = {"$ne": exclude_id}
+        if sequence_order is not None:
+            query["sequence_order"] = {"$gt" if direction > 0 else "$lt": sequence_order}
+        acts = await self.collection.find(query, {"_id": 0, "id": 1, "sequence_order": 1}).sort(
+            "sequence_order", direction
+        ).limit(1).to_list(1)
+        return acts[0] if acts else None
+
+    async def insert(self, act):
+        await self.collection.insert_one(act)
+
+    async def insert_many(self, acts, session=None):
+        return await insert_many(self.collection, acts, session)
+
+    async def update(self, act_id, fields):
+        # The pre-image gives callers the old values (e.g. duration for rollups)
+        return await self.collection.find_one_and_update(
+            {"id": act_id}, {"$set": fields}, projection(None), return_document=ReturnDocument.BEFORE
+        )
+
+    async def set_many(self, updates):
+        if updates:
+            await self.collection.bulk_write(
+                [UpdateOne({"id": act_id}, {"$set": fields}) for act_id, fields in updates.items()],
+                ordered=False,
+            )
+
+    async def find_missing(self, field, limit, fields=None):
+        return await self.collection.find({field: None}, projection(fields)).limit(limit).to_list(limit)
+
+    async def set_orders(self, orders, show_id=None):
+        if not orders:
+            return
+        scope = {} if show_id is None else {"show_id": show_id}
+        await self.collection.bulk_write(
+            [UpdateOne({"id": act_id, **scope}, {"$set": {"sequence_order": order}}) for act_id, order in orders],
+            ordered=False,
+        )
+
+    async def delete(self, act_id):
+        return await self.collection.find_one_and_delete({"id": act_id}, projection(None))
+
+    async def delete_by_show(self, show_id, limit, session=None):
+        return await delete_batch(self.collection, {"show_id": show_id}, limit, session)
+
+    async def show_ids(self):
+        return set(await self.collection.distinct("show_id"))
+
+    async def timeline(self, show_id):
+        return await self.collection.aggregate(timeline_pipeline(show_id)).to_list(None)
+
+    def scan(self, fields, batch_size):
+        return scan_batches(self.collection, fields, batch_size)
+
+
+class MongoExpenseRepository(ExpenseRepository):
+    def __init__(self, db, list_read_preference=None):
+        self.collection = db.expenses
+        self.lists = list_collection(self.collection, list_read_preference)
+
+    def find(self, show_id, after=None, limit=None, fields=None, session=None, stale_ok=False):
+        # Reads inside a transaction must stay on the primary
+        collection = self.lists if stale_ok and session is None else self.collection
+        return find_sorted(collection, {"show_id": show_id}, EXPENSE_SORT, after, limit, fields, session)
+
+    async def insert(self, expense):
+        await self.collection.insert_one(expense)
+
+    async def insert_many(self, expenses, session=None):
+        return await insert_many(self.collection, expenses, session)
+
+    async def delete(self, expense_id):
+        return await self.collection.find_one_and_delete({"id": expense_id}, projection(None))
+
+    async def delete_by_act(self, act_id, session=None):
+        if session is not None:
+            # One snapshot: the totals are of exactly the expenses the delete removes
+            by_category = await self.collection.aggregate([
+                {"$match": {"act_id": act_id}},
+                {"$group": {"_id": "$category", "amount": {"$sum": "$amount"}, "count": {"$sum": 1}}},
+            ], session=session).to_list(None)
+            if by_category:
+                await self.collection.delete_many({"act_id": act_id}, session=session)
+            return [
+                {"category": group["_id"], "amount": group["amount"], "count": group["count"]} for group in by_category
+            ]
+        # Without a transaction, total what each delete actually returned: expenses
+        # inserted or deleted meanwhile by other requests are left to those requests
+        by_category = {}
+        expenses = await self.collection.find({"act_id": act_id}, {"_id": 0, "id": 1}).to_list(None)
+        for expense in expenses:
+            deleted = await self.collection.find_one_and_delete(
+                {"id": expense["id"], "act_id": act_id}, {"_id": 0, "category": 1, "amount": 1}
+            )
+            if deleted is not None:
+                totals = by_category.setdefault(
+                    deleted["category"], {"category": deleted["category"], "amount": 0, "count": 0}
+                )
+                totals["amount"] += deleted["amount"]
+                totals["count"] += 1
+        return list(by_category.values())
+
+    async def delete_by_show(self, show_id, limit, session=None):
+        return await delete_batch(self.collection, {"show_id": show_id}, limit, session)
+
+    async def show_ids(self):
+        return set(await self.collection.distinct("show_id"))
+
+    def scan(self, fields, batch_size):
+        return scan_batches(self.collection, fields, batch_size)
+
+
+class MongoStorage(Storage):
+    def __init__(self, client, db_name, list_read_preference=None):
+        self.client = client
+        self.db = client[db_name]
+        self.shows = MongoShowRepository(self.db, list_read_preference)
+        self.acts = MongoActRepository(self.db, list_read_preference)
+        self.expenses = MongoExpenseRepository(self.db, list_read_preference)
+        self.transactions_supported = None
+
+    async def close(self):
+        self.client.close()
+
+    async def ensure_indexes(self):
+        for collection, indexes in INDEXES.items():
+            await self.db[collection].create_indexes(indexes)
+
+    async def find_collscans(self):
+        """Explain every route's query shape and return those that scan a whole collection."""
+        collscans = []
+        for route, collection, query, sort in QUERY_SHAPES:
+            cursor = self.db[collection].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            explain = await cursor.explain()
+            stages = set(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+            if "COLLSCAN" in stages:
+                collscans.append((route, collection, query, sort))
+        return collscans
+
+    async def summaries(self, show_ids):
+        if not show_ids:
+            return {}
+        docs = await self.db.shows.aggregate(summary_pipeline(list(show_ids))).to_list(None)
+        return {doc["show_id"]: doc for doc in docs}
+
+    async def bookings(self, performer_keys, date_from=None, date_to=None):
+        performer_keys = list(dict.fromkeys(performer_keys))
+        if not performer_keys:
+            return []
+        wanted = set(performer_keys)
+        found = []
+        async for act in self.db.circus_acts.aggregate(bookings_pipeline(performer_keys, date_from, date_to)):
+            for key in act["performer_keys"]:
+                if key in wanted:
+                    found.append(booking(key, act, act["show"]))
+        return sort_bookings(found)
+
+    async def search(self, query, kinds, show_id=None, limit=20, offset=0):
+        text = {"$text": {"$search": query}}
+        if show_id is not None:
+            text["show_id"] = show_id
+        score = {"score": {"$meta": "textScore"}}
+        hits = []
+        for kind in kinds:
+            # Each kind's best offset + limit are enough to fill the merged page
+            cursor = self.db[SEARCHED[kind]].find(text, {**projection(SEARCH_DISPLAY_FIELDS[kind]), **score})
+            async for doc in cursor.sort([("score", score["score"])]).limit(offset + limit):
+                hits.append(search_hit(kind, doc, doc.pop("score")))
+        return rank_hits(hits, offset, limit)
+
+    async def changes(self):
+        # Deletes carry the document through its pre-image, so the watched
+        # collections need changeStreamPreAndPostImages (MongoDB 6.0+)
+        for collection in WATCHED:
+            await self.db.command("collMod", collection, changeStreamPreAndPostImages={"enabled": True})
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(WATCHED)},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+        }}]
+        async with self.db.watch(
+            pipeline, full_document="updateLookup", full_document_before_change="whenAvailable"
+        ) as stream:
+            async for change in stream:
+                operation = change["operationType"]
+                if operation == "delete":
+                    document, changed = change.get("fullDocumentBeforeChange"), None
+                elif operation == "update":
+                    document, changed = change.get("fullDocument"), set(change["updateDescription"]["updatedFields"])
+                else:
+                    document, changed = change.get("fullDocument"), None
+                if operation == "replace":
+                    operation = "update"
+                if document is None:
+                    # Deleted before the lookup, or no pre-image was recorded
+                    continue
+                document.pop("_id", None)
+                yield WATCHED[change["ns"]["coll"]], operation, document, changed
+
+    async def supports_transactions(self):
+        if self.transactions_supported is None:
+            hello = await self.client.admin.command("hello")
+            self.transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+        return self.transactions_supported
+
+    async def run_in_transaction(self, fn, *args):
+        if not await self.supports_transactions():
+            return await fn(*args, session=None)
+        async with await self.client.start_session() as session:
+            async with session.start_transaction():
+                return await fn(*args, session=session)
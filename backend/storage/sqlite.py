@@ -0,0 +1,649 @@
+import asyncio
+import contextlib
+import sqlite3
+from datetime import datetime, timezone
+
+import aiosqlite
+import orjson
+
+from search import search_terms, tokenize
+
+from storage.base import (
+    SEARCH_DISPLAY_FIELDS, SEARCH_FIELDS, TIMELINE_FIELDS, ActRepository, ExpenseRepository, ShowRepository, Storage,
+    apply_inc, booking, build_summary, project, rank_hits, search_hit, sort_bookings,
+)
+
+# Each table mirrors the fields it filters and sorts on into indexed columns;
+# the whole document is kept as JSON in doc
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shows (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS shows_deleted_created_at_id ON shows (deleted, created_at, id);
+CREATE INDEX IF NOT EXISTS shows_deleted_date_venue
+ON shows (deleted, json_extract(doc, '$.date'), json_extract(doc, '$.venue'));
+CREATE TABLE IF NOT EXISTS circus_acts (
+    id TEXT PRIMARY KEY,
+    show_id TEXT NOT NULL,
+    sequence_order INTEGER NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS circus_acts_show_id_sequence_order_id ON circus_acts (show_id, sequence_order, id);
+-- performer_keys of each act, kept in step with circus_acts.doc by triggers
+CREATE TABLE IF NOT EXISTS act_performers (
+    performer_key TEXT NOT NULL,
+    act_id TEXT NOT NULL,
+    PRIMARY KEY (performer_key, act_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS act_performers_act_id ON act_performers (act_id);
+CREATE TRIGGER IF NOT EXISTS circus_acts_performers_insert AFTER INSERT ON circus_acts BEGIN
+    INSERT OR IGNORE INTO act_performers SELECT value, NEW.id FROM json_each(NEW.doc, '$.performer_keys');
+END;
+CREATE TRIGGER IF NOT EXISTS circus_acts_performers_update AFTER UPDATE OF doc ON circus_acts
+WHEN json_extract(OLD.doc, '$.performer_keys') IS NOT json_extract(NEW.doc, '$.performer_keys') BEGIN
+    DELETE FROM act_performers WHERE act_id = OLD.id;
+    INSERT OR IGNORE INTO act_performers SELECT value, NEW.id FROM json_each(NEW.doc, '$.performer_keys');
+END;
+CREATE TRIGGER IF NOT EXISTS circus_acts_performers_delete AFTER DELETE ON circus_acts BEGIN
+    DELETE FROM act_performers WHERE act_id = OLD.id;
+END;
+CREATE TABLE IF NOT EXISTS expenses (
+    id TEXT PRIMARY KEY,
+    show_id TEXT NOT NULL,
+    act_id TEXT,
+    created_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS expenses_show_id_created_at_id ON expenses (show_id, created_at, id);
+CREATE INDEX IF NOT EXISTS expenses_act_id ON expenses (act_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Advances the catalogue version; run inside each show write's transaction
+ADVANCE_CATALOGUE = (
+    "INSERT INTO meta (key, value) VALUES ('shows', 1) ON CONFLICT (key) DO UPDATE SET value = value + 1"
+)
+
+# Search results type -> (table, FTS5 index over its SEARCH_FIELDS)
+SEARCHED = {"act": ("circus_acts", "acts_search"), "expense": ("expenses", "expenses_search")}
+
+
+def search_schema(kind):
+    """FTS5 index over a table's searchable fields, kept in step with its doc column by triggers.
+
+    The index is external-content: it stores only the tokens and reads the
+    text back through a view keyed on the table's rowid. VACUUM may renumber
+    those rowids, so rebuild the index after one ('rebuild' command).
+
+    Text is indexed as search.search_terms() of each field, the tokens of
+    the memory backend's InvertedIndex, and FTS5 only splits them on spaces;
+    so both backends share stemming and stop words. The function is
+    registered on the connection, so other clients cannot write to indexed
+    tables.
+    """
+    table, fts = SEARCHED[kind]
+    fields = list(SEARCH_FIELDS[kind])
+    columns = ", ".join(fields)
+
+    def extract(row, alias=False):
+        return ", ".join(
+            f"search_terms(json_extract({row}doc, '$.{field}'))" + (f" AS {field}" if alias else "") for field in fields
+        )
+
+    changed = " OR ".join(
+        f"json_extract(OLD.doc, '$.{field}') IS NOT json_extract(NEW.doc, '$.{field}')" for field in fields
+    )
+    return f"""
+CREATE VIEW IF NOT EXISTS {fts}_source AS
+    SELECT rowid, {extract("", alias=True)} FROM {table};
+CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+    {columns}, content='{fts}_source', content_rowid='rowid',
+    tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+    INSERT INTO {fts} (rowid, {columns}) VALUES (NEW.rowid, {extract("NEW.")});
+END;
+CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF doc ON {table} WHEN {changed} BEGIN
+    INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', OLD.rowid, {extract("OLD.")});
+    INSERT INTO {fts} (rowid, {columns}) VALUES (NEW.rowid, {extract("NEW.")});
+END;
+CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+    INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', OLD.rowid, {extract("OLD.")});
+END;
+"""
+
+
+def match_expression(query):
+    # Any of the query's terms (as indexed by search_schema), each quoted so FTS5 operators in it are plain text
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(tokenize(query)))
+
+
+def drop_search_schema(kind):
+    _, fts = SEARCHED[kind]
+    return "".join(
+        f"DROP {object_type} IF EXISTS {name};\n"
+        for object_type, name in (
+            ("TRIGGER", f"{fts}_insert"), ("TRIGGER", f"{fts}_update"), ("TRIGGER", f"{fts}_delete"),
+            ("TABLE", fts), ("VIEW", f"{fts}_source"),
+        )
+    )
+
+
+DATETIME_FIELDS = ("created_at", "deleted_at")
+# A show's date is a datetime too (midnight UTC); other documents keep theirs as text
+SHOW_DATETIME_FIELDS = DATETIME_FIELDS + ("date",)
+
+# Matches the expression in the shows_deleted_date_venue index
+SHOW_DATE = "json_extract(doc, '$.date')"
+
+# Rows fetched per thread hop when iterating a result set
+FETCH_SIZE = 500
+
+
+def timestamp(value):
+    # Fixed-width UTC text, so the created_at columns sort chronologically
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def dump(doc):
+    return orjson.dumps(doc).decode()
+
+
+def json_text(value):
+    # A datetime as dump() writes it, for comparing against json_extract
+    return orjson.dumps(value).decode()[1:-1]
+
+
+def load(text, fields=None, datetime_fields=DATETIME_FIELDS):
+    doc = orjson.loads(text)
+    for field in datetime_fields:
+        # Plain dates ("2025-08-15") and free text ("next Thursday") stored before show dates were datetimes stay text
+        if isinstance(doc.get(field), str) and "T" in doc[field]:
+            try:
+                doc[field] = datetime.fromisoformat(doc[field])
+            except ValueError:
+                pass
+    return project(doc, fields)
+
+
+def placeholders(values):
+    return ",".join("?" * len(values))
+
+
+class _Table:
+    datetime_fields = DATETIME_FIELDS
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    async def _rows(self, sql, params=()):
+        cursor = await self.storage.conn.execute(sql, params)
+        cursor.arraysize = FETCH_SIZE
+        try:
+            while True:
+                rows = await cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            await cursor.close()
+
+    async def _docs(self, sql, params=(), fields=None):
+        async for (text,) in self._rows(sql, params):
+            yield load(text, fields, self.datetime_fields)
+
+    async def _scan(self, table, fields, batch_size):
+        batch = []
+        async for doc in self._docs(f"SELECT doc FROM {table}", (), fields):
+            batch.append(doc)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _one(self, sql, params=(), fields=None):
+        async with self.storage.conn.execute(sql, params) as cursor:
+            row = await cursor.fetchone()
+        return None if row is None else load(row[0], fields, self.datetime_fields)
+
+    async def _insert_many(self, sql, docs, params):
+        # One executemany for the batch; on a conflict, retry row by row to find the failures
+        try:
+            async with self.storage.write() as conn:
+                await conn.executemany(sql, [params(doc) for doc in docs])
+            return {}
+        except sqlite3.IntegrityError:
+            pass
+        failed = {}
+        async with self.storage.write() as conn:
+            for position, doc in enumerate(docs):
+                try:
+                    await conn.execute(sql, params(doc))
+                except sqlite3.IntegrityError as e:
+                    failed[position] = str(e)
+        return failed
+
+
+def _show_params(show):
+    return (show["id"], timestamp(show["created_at"]), int(show.get("deleted_at") is not None), dump(show))
+
+
+class SQLiteShowRepository(_Table, ShowRepository):
+    datetime_fields = SHOW_DATETIME_FIELDS
+
+    async def get(self, show_id, fields=None):
+        return await self._one("SELECT doc FROM shows WHERE id = ? AND deleted = 0", (show_id,), fields)
+
+    async def live_ids(self, show_ids):
+        show_ids = list(show_ids)
+        if not show_ids:
+            return set()
+        sql = f"SELECT id FROM shows WHERE deleted = 0 AND id IN ({placeholders(show_ids)})"
+        return {row[0] async for row in self._rows(sql, show_ids)}
+
+    def find(self, after=None, limit=None, fields=None, stale_ok=False):
+        sql, params = "SELECT doc FROM shows WHERE deleted = 0", []
+        if after:
+            value, last_id = timestamp(after[0]), after[1]
+            sql += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params += [value, value, last_id]
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._docs(sql, params, fields)
+
+    def find_dated(self, date_from=None, date_to=None, venue=None, after=None, limit=None, fields=None, stale_ok=False):
+        sql, params = f"SELECT doc FROM shows WHERE deleted = 0 AND {SHOW_DATE} IS NOT NULL", []
+        for op, bound in ((">=", date_from), ("<=", date_to)):
+            if bound is not None:
+                sql += f" AND {SHOW_DATE} {op} ?"
+                params.append(json_text(bound))
+        if venue is not None:
+            sql += " AND json_extract(doc, '$.venue') = ?"
+            params.append(venue)
+        if after:
+            value, last_id = json_text(after[0]), after[1]
+            sql += f" AND ({SHOW_DATE} > ? OR ({SHOW_DATE} = ? AND id > ?))"
+            params += [value, value, last_id]
+        sql += f" ORDER BY {SHOW_DATE}, id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._docs(sql, params, fields)
+
+    async def insert(self, show, session=None):
+        async with self.storage.write() as conn:
+            await conn.execute(
+                "INSERT INTO shows (id, created_at, deleted, doc) VALUES (?, ?, ?, ?)", _show_params(show)
+            )
+            await conn.execute(ADVANCE_CATALOGUE)
+
+    async def _modify(self, show_id, change, live_only=True):
+        async with self.storage.write() as conn:
+            async with conn.execute(
+                "SELECT doc FROM shows WHERE id = ?" + (" AND deleted = 0" if live_only else ""), (show_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            show = load(row[0], datetime_fields=SHOW_DATETIME_FIELDS)
+            change(show)
+            await conn.execute(
+                "UPDATE shows SET deleted = ?, doc = ? WHERE id = ?",
+                (int(show.get("deleted_at") is not None), dump(show), show_id),
+            )
+            await conn.execute(ADVANCE_CATALOGUE)
+            return show
+
+    async def update(self, show_id, fields, inc=None):
+        return await self._modify(show_id, lambda show: apply_inc(show, inc or {}).update(fields))
+
+    async def increment(self, show_id, inc, session=None):
+        return await self._modify(show_id, lambda show: apply_inc(show, inc), live_only=False)
+
+    async def set_many(self, updates):
+        for show_id, fields in updates.items():
+            await self._modify(show_id, lambda show, fields=fields: show.update(fields), live_only=False)
+
+    async def mark_deleted(self, show_id):
+        deleted_at = datetime.now(timezone.utc)
+        deleted = await self._modify(
+            show_id, lambda show: apply_inc(show, {"version": 1}).update(deleted_at=deleted_at)
+        )
+        return deleted is not None
+
+    async def deleted_ids(self):
+        return [row[0] async for row in self._rows("SELECT id FROM shows WHERE deleted = 1")]
+
+    async def remove_deleted(self, show_id):
+        async with self.storage.write() as conn:
+            await conn.execute("DELETE FROM shows WHERE id = ? AND deleted = 1", (show_id,))
+
+    async def catalogue_version(self):
+        async with self.storage.conn.execute("SELECT value FROM meta WHERE key = 'shows'") as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
+
+def _act_params(act):
+    return (act["id"], act["show_id"], act["sequence_order"], dump(act))
+
+
+class SQLiteActRepository(_Table, ActRepository):
+    async def get(self, act_id, fields=None):
+        return await self._one("SELECT doc FROM circus_acts WHERE id = ?", (act_id,), fields)
+
+    def find(self, show_id, after=None, limit=None, fields=None, session=None, stale_ok=False):
+        sql, params = "SELECT doc FROM circus_acts WHERE show_id = ?", [show_id]
+        if after:
+            sql += " AND (sequence_order > ? OR (sequence_order = ? AND id > ?))"
+            params += [after[0], after[0], after[1]]
+        sql += " ORDER BY sequence_order, id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._docs(sql, params, fields)
+
+    async def find_ids(self, act_ids, show_id=None, fields=None):
+        act_ids = list(dict.fromkeys(act_ids))
+        if not act_ids:
+            return []
+        sql, params = f"SELECT doc FROM circus_acts WHERE id IN ({placeholders(act_ids)})", act_ids
+        if show_id is not None:
+            sql += " AND show_id = ?"
+            params = act_ids + [show_id]
+        return [doc async for doc in self._docs(sql, params, fields)]
+
+    async def neighbour(self, show_id, sequence_order=None, direction=1, exclude_id=None):
+        sql, params = "SELECT id, sequence_order FROM circus_acts WHERE show_id = ?", [show_id]
+        if exclude_id is not None:
+            sql += " AND id != ?"
+            params.append(exclude_id)
+        if sequence_order is not None:
+            sql += " AND sequence_order > ?" if direction > 0 else " AND sequence_order < ?"
+            params.append(sequence_order)
+        sql += " ORDER BY sequence_order" + ("" if direction > 0 else " DESC") + " LIMIT 1"
+        async with self.storage.conn.execute(sql, params) as cursor:
+            row = await cursor.fetchone()
+        return None if row is None else {"id": row[0], "sequence_order": row[1]}
+
+    async def insert(self, act):
+        async with self.storage.write() as conn:
+            await conn.execute(
+                "INSERT INTO circus_acts (id, show_id, sequence_order, doc) VALUES (?, ?, ?, ?)", _act_params(act)
+            )
+
+    async def insert_many(self, acts, session=None):
+        return await self._insert_many(
+            "INSERT INTO circus_acts (id, show_id, sequence_order, doc) VALUES (?, ?, ?, ?)", acts, _act_params
+        )
+
+    async def update(self, act_id, fields):
+        async with self.storage.write() as conn:
+            async with conn.execute("SELECT doc FROM circus_acts WHERE id = ?", (act_id,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            act = load(row[0])
+            updated = {**act, **fields}
+            await conn.execute(
+                "UPDATE circus_acts SET sequence_order = ?, doc = ? WHERE id = ?",
+                (updated["sequence_order"], dump(updated), act_id),
+            )
+            return act
+
+    async def set_many(self, updates):
+        if not updates:
+            return
+        async with self.storage.write() as conn:
+            await conn.executemany(
+                "UPDATE circus_acts SET doc = json_patch(doc, ?) WHERE id = ?",
+                [(dump(fields), act_id) for act_id, fields in updates.items()],
+            )
+
+    async def find_missing(self, field, limit, fields=None):
+        sql = f"SELECT doc FROM circus_acts WHERE json_extract(doc, '$.{field}') IS NULL LIMIT {int(limit)}"
+        return [doc async for doc in self._docs(sql, fields=fields)]
+
+    async def set_orders(self, orders, show_id=None):
+        if not orders:
+            return
+        sql = "UPDATE circus_acts SET sequence_order = ?1, doc = json_set(doc, '$.sequence_order', ?1) WHERE id = ?2"
+        params = [(order, act_id) for act_id, order in orders]
+        if show_id is not None:
+            sql += " AND show_id = ?3"
+            params = [(order, act_id, show_id) for order, act_id in params]
+        async with self.storage.write() as conn:
+            await conn.executemany(sql, params)
+
+    async def delete(self, act_id):
+        async with self.storage.write() as conn:
+            async with conn.execute("DELETE FROM circus_acts WHERE id = ? RETURNING doc", (act_id,)) as cursor:
+                row = await cursor.fetchone()
+        return None if row is None else load(row[0])
+
+    async def delete_by_show(self, show_id, limit, session=None):
+        async with self.storage.write() as conn:
+            cursor = await conn.execute(
+                "DELETE FROM circus_acts WHERE id IN (SELECT id FROM circus_acts WHERE show_id = ? LIMIT ?)",
+                (show_id, limit),
+            )
+            return cursor.rowcount
+
+    async def show_ids(self):
+        return {row[0] async for row in self._rows("SELECT DISTINCT show_id FROM circus_acts")}
+
+    async def timeline(self, show_id):
+        # Running totals of duration in running order, off the show_id index
+        sql = (
+            "SELECT doc, SUM(json_extract(doc, '$.duration')) OVER "
+            "(ORDER BY sequence_order, id ROWS UNBOUNDED PRECEDING) "
+            "FROM circus_acts WHERE show_id = ? ORDER BY sequence_order, id"
+        )
+        rows = []
+        async for text, end in self._rows(sql, (show_id,)):
+            act = load(text, TIMELINE_FIELDS)
+            rows.append({**act, "start_offset": end - act["duration"], "end_offset": end})
+        return rows
+
+    def scan(self, fields, batch_size):
+        return self._scan("circus_acts", fields, batch_size)
+
+
+def _expense_params(expense):
+    return (expense["id"], expense["show_id"], expense.get("act_id"), timestamp(expense["created_at"]), dump(expense))
+
+
+class SQLiteExpenseRepository(_Table, ExpenseRepository):
+    def find(self, show_id, after=None, limit=None, fields=None, session=None, stale_ok=False):
+        sql, params = "SELECT doc FROM expenses WHERE show_id = ?", [show_id]
+        if after:
+            value, last_id = timestamp(after[0]), after[1]
+            sql += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params += [value, value, last_id]
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._docs(sql, params, fields)
+
+    async def insert(self, expense):
+        async with self.storage.write() as conn:
+            await conn.execute(
+                "INSERT INTO expenses (id, show_id, act_id, created_at, doc) VALUES (?, ?, ?, ?, ?)",
+                _expense_params(expense),
+            )
+
+    async def insert_many(self, expenses, session=None):
+        return await self._insert_many(
+            "INSERT INTO expenses (id, show_id, act_id, created_at, doc) VALUES (?, ?, ?, ?, ?)",
+            expenses,
+            _expense_params,
+        )
+
+    async def delete(self, expense_id):
+        async with self.storage.write() as conn:
+            async with conn.execute("DELETE FROM expenses WHERE id = ? RETURNING doc", (expense_id,)) as cursor:
+                row = await cursor.fetchone()
+        return None if row is None else load(row[0])
+
+    async def delete_by_act(self, act_id, session=None):
+        async with self.storage.write() as conn:
+            async with conn.execute(
+                "SELECT json_extract(doc, '$.category'), SUM(json_extract(doc, '$.amount')), COUNT(*) "
+                "FROM expenses WHERE act_id = ? GROUP BY 1",
+                (act_id,),
+            ) as cursor:
+                groups = await cursor.fetchall()
+            if groups:
+                await conn.execute("DELETE FROM expenses WHERE act_id = ?", (act_id,))
+        return [{"category": category, "amount": amount, "count": count} for category, amount, count in groups]
+
+    async def delete_by_show(self, show_id, limit, session=None):
+        async with self.storage.write() as conn:
+            cursor = await conn.execute(
+                "DELETE FROM expenses WHERE id IN (SELECT id FROM expenses WHERE show_id = ? LIMIT ?)",
+                (show_id, limit),
+            )
+            return cursor.rowcount
+
+    async def show_ids(self):
+        return {row[0] async for row in self._rows("SELECT DISTINCT show_id FROM expenses")}
+
+    def scan(self, fields, batch_size):
+        return self._scan("expenses", fields, batch_size)
+
+
+class SQLiteStorage(Storage):
+    """Single-file storage for small deployments, using SQLite in WAL mode.
+
+    Writes are serialized through one connection and take the database
+    write lock up front (BEGIN IMMEDIATE), so read-modify-write updates such
+    as rollup increments stay atomic.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+        self.write_lock = asyncio.Lock()
+        self.shows = SQLiteShowRepository(self)
+        self.acts = SQLiteActRepository(self)
+        self.expenses = SQLiteExpenseRepository(self)
+
+    async def open(self):
+        if self.conn is None:
+            self.conn = await aiosqlite.connect(self.path, isolation_level=None)
+            await self.conn.execute("PRAGMA journal_mode=WAL")
+            await self.conn.execute("PRAGMA synchronous=NORMAL")
+            await self.conn.execute("PRAGMA busy_timeout=5000")
+            await self.conn.create_function("search_terms", 1, search_terms, deterministic=True)
+            await self.conn.executescript(SCHEMA)
+            for kind, (_, fts) in SEARCHED.items():
+                source = f"{fts}_source"
+                async with self.conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (source,)) as cursor:
+                    row = await cursor.fetchone()
+                current = row is not None and "search_terms" in row[0]
+                if row is not None and not current:
+                    # Indexed with FTS5's own tokenizer before search_terms: start over
+                    await self.conn.executescript(drop_search_schema(kind))
+                await self.conn.executescript(search_schema(kind))
+                if not current:
+                    # Index the rows written before search existed (or before this schema)
+                    await self.conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    async def close(self):
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+
+    @contextlib.asynccontextmanager
+    async def write(self):
+        async with self.write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                await self.conn.execute("ROLLBACK")
+                raise
+            await self.conn.execute("COMMIT")
+
+    async def summaries(self, show_ids):
+        live = await self.shows.live_ids(show_ids)
+        if not live:
+            return {}
+        live = list(live)
+        in_live = f"show_id IN ({placeholders(live)})"
+        act_totals = {
+            show_id: (total_duration, count)
+            async for show_id, total_duration, count in self.shows._rows(
+                f"SELECT show_id, SUM(json_extract(doc, '$.duration')), COUNT(*) FROM circus_acts "
+                f"WHERE {in_live} GROUP BY show_id",
+                live,
+            )
+        }
+        expense_groups = {}
+        async for show_id, category, act_id, amount, count in self.shows._rows(
+            f"SELECT show_id, json_extract(doc, '$.category'), act_id, SUM(json_extract(doc, '$.amount')), COUNT(*) "
+            f"FROM expenses WHERE {in_live} GROUP BY show_id, 2, act_id",
+            live,
+        ):
+            expense_groups.setdefault(show_id, []).append((category, act_id, amount, count))
+        return {
+            show_id: build_summary(show_id, act_totals.get(show_id, (0, 0)), expense_groups.get(show_id, []))
+            for show_id in live
+        }
+
+    async def bookings(self, performer_keys, date_from=None, date_to=None):
+        performer_keys = list(dict.fromkeys(performer_keys))
+        if not performer_keys:
+            return []
+        sql = (
+            "SELECT p.performer_key, a.doc, s.doc FROM act_performers p "
+            "JOIN circus_acts a ON a.id = p.act_id "
+            "JOIN shows s ON s.id = a.show_id AND s.deleted = 0 "
+            f"WHERE p.performer_key IN ({placeholders(performer_keys)})"
+        )
+        params = list(performer_keys)
+        if date_from is not None or date_to is not None:
+            # Dates stored as text before show dates were datetimes fall outside, as in Mongo
+            sql += " AND json_extract(s.doc, '$.date') GLOB '????-??-??T*'"
+        for op, bound in ((">=", date_from), ("<=", date_to)):
+            if bound is not None:
+                sql += f" AND json_extract(s.doc, '$.date') {op} ?"
+                params.append(json_text(bound))
+        return sort_bookings([
+            booking(key, load(act), load(show, datetime_fields=SHOW_DATETIME_FIELDS))
+            async for key, act, show in self.shows._rows(sql, params)
+        ])
+
+    async def search(self, query, kinds, show_id=None, limit=20, offset=0):
+        match = match_expression(query)
+        if not match:
+            return []
+        hits = []
+        for kind in kinds:
+            table, fts = SEARCHED[kind]
+            # bm25 is lower for better matches; its arguments weight the columns
+            rank = f"bm25({fts}, {', '.join(str(weight) for weight in SEARCH_FIELDS[kind].values())})"
+            sql = (
+                f"SELECT t.doc, -{rank} FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid "
+                f"WHERE {fts} MATCH ?"
+            )
+            params = [match]
+            if show_id is not None:
+                sql += " AND t.show_id = ?"
+                params.append(show_id)
+            sql += f" ORDER BY {rank} LIMIT ?"
+            params.append(offset + limit)
+            async for doc, score in self.shows._rows(sql, params):
+                hits.append(search_hit(kind, load(doc, SEARCH_DISPLAY_FIELDS[kind]), score))
+        return rank_hits(hits, offset, limit)
@@ -18,6 +18,16 @@ import { Toaster } from "./components/ui/toaster";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Acts run in sequence_order; expenses are listed newest first, as the API returns them
+const byRunningOrder = (a, b) => a.sequence_order - b.sequence_order || a.id.localeCompare(b.id);
+const byNewest = (a, b) => b.created_at.localeCompare(a.created_at) || b.id.localeCompare(a.id);
+
+const upsert = (items, item, compare) =>
+  [...items.filter((existing) => existing.id !== item.id), item].sort(compare);
+
+const patch = (items, id, changes, compare) =>
+  items.map((item) => (item.id === id ? { ...item, ...changes } : item)).sort(compare);
+
 function App() {
   const [shows, setShows] = useState([]);
   const [currentShow, setCurrentShow] = useState(null);
@@ -35,6 +45,7 @@ function App() {
   const [showForm, setShowForm] = useState({
     title: '',
     date: '',
+    time: '',
     venue: '',
     description: ''
   });
@@ -61,12 +72,48 @@ function App() {
     fetchShows();
   }, []);
 
+  // Keyed on the id so show.updated events don't trigger a refetch
+  const currentShowId = currentShow && currentShow.id;
   useEffect(() => {
-    if (currentShow) {
-      fetchActs(currentShow.id);
-      fetchExpenses(currentShow.id);
+    if (currentShowId) {
+      fetchActs(currentShowId);
+      fetchExpenses(currentShowId);
     }
-  }, [currentShow]);
+  }, [currentShowId]);
+
+  // Live updates from other operators: patch local state from the show's change events
+  useEffect(() => {
+    if (!currentShowId) {
+      return undefined;
+    }
+    const source = new EventSource(`${API}/shows/${currentShowId}/events`);
+    const on = (type, handler) =>
+      source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+
+    on('act.created', (act) => setActs((current) => upsert(current, act, byRunningOrder)));
+    on('act.updated', (act) => setActs((current) => upsert(current, act, byRunningOrder)));
+    on('act.moved', ({ id, sequence_order }) =>
+      setActs((current) => patch(current, id, { sequence_order }, byRunningOrder)));
+    on('act.deleted', ({ id }) => {
+      setActs((current) => current.filter((act) => act.id !== id));
+      // The act's expenses are deleted with it
+      setExpenses((current) => current.filter((expense) => expense.act_id !== id));
+    });
+    on('expense.created', (expense) => setExpenses((current) => upsert(current, expense, byNewest)));
+    on('expense.deleted', ({ id }) => setExpenses((current) => current.filter((expense) => expense.id !== id)));
+    on('show.updated', (show) => {
+      setShows((current) => current.map((existing) => (existing.id === show.id ? show : existing)));
+      setCurrentShow((current) => (current && current.id === show.id ? { ...current, ...show } : current));
+    });
+    on('show.deleted', ({ id }) => setShows((current) => current.filter((show) => show.id !== id)));
+    // Events were missed; reload the lists and keep listening
+    on('resync', () => {
+      fetchActs(currentShowId);
+      fetchExpenses(currentShowId);
+    });
+
+    return () => source.close();
+  }, [currentShowId]);
 
   const fetchShows = async () => {
     try {
@@ -109,7 +156,7 @@ function App() {
       const response = await axios.post(`${API}/shows`, showForm);
       setShows([response.data, ...shows]);
       setCurrentShow(response.data);
-      setShowForm({ title: '', date: '', venue: '', description: '' });
+      setShowForm({ title: '', date: '', time: '', venue: '', description: '' });
       setShowDialog(false);
       toast({
         title: "Success",
@@ -133,26 +180,19 @@ function App() {
       const actData = {
         ...actForm,
         show_id: currentShow.id,
-        duration: parseInt(actForm.duration),
-        sequence_order: acts.length + 1
+        duration: parseInt(actForm.duration)
       };
 
-      if (editingAct) {
-        await axios.put(`${API}/acts/${editingAct.id}`, actData);
-        toast({
-          title: "Success",
-          description: "Act updated successfully",
-        });
-      } else {
-        await axios.post(`${API}/acts`, actData);
-        toast({
-          title: "Success",
-          description: "Act created successfully",
-        });
-      }
+      const response = editingAct
+        ? await axios.put(`${API}/acts/${editingAct.id}`, actData)
+        : await axios.post(`${API}/acts`, actData);
+      toast({
+        title: "Success",
+        description: editingAct ? "Act updated successfully" : "Act created successfully",
+      });
 
-      // Fix: Ensure acts are refreshed after creation/update
-      await fetchActs(currentShow.id);
+      // The change event carries the same act; applying it twice is harmless
+      setActs((current) => upsert(current, response.data, byRunningOrder));
       setActForm({
         name: '',
         performers: '',
@@ -186,8 +226,8 @@ function App() {
         act_id: expenseForm.act_id === 'none' ? null : expenseForm.act_id
       };
 
-      await axios.post(`${API}/expenses`, expenseData);
-      await fetchExpenses(currentShow.id);
+      const response = await axios.post(`${API}/expenses`, expenseData);
+      setExpenses((current) => upsert(current, response.data, byNewest));
       setExpenseForm({
         category: '',
         amount: '',
@@ -215,7 +255,8 @@ function App() {
   const handleDeleteAct = async (actId) => {
     try {
       await axios.delete(`${API}/acts/${actId}`);
-      fetchActs(currentShow.id);
+      setActs((current) => current.filter((act) => act.id !== actId));
+      setExpenses((current) => current.filter((expense) => expense.act_id !== actId));
       toast({
         title: "Success",
         description: "Act deleted successfully",
@@ -295,6 +336,15 @@ function App() {
                       onChange={(e) => setShowForm({...showForm, date: e.target.value})}
                     />
                   </div>
+                  <div>
+                    <Label htmlFor="time">Start Time</Label>
+                    <Input
+                      id="time"
+                      type="time"
+                      value={showForm.time}
+                      onChange={(e) => setShowForm({...showForm, time: e.target.value})}
+                    />
+                  </div>
                   <div>
                     <Label htmlFor="venue">Venue</Label>
                     <Input
@@ -381,6 +431,15 @@ function App() {
                         onChange={(e) => setShowForm({...showForm, date: e.target.value})}
                       />
                     </div>
+                    <div>
+                      <Label htmlFor="time">Start Time</Label>
+                      <Input
+                        id="time"
+                        type="time"
+                        value={showForm.time}
+                        onChange={(e) => setShowForm({...showForm, time: e.target.value})}
+                      />
+                    </div>
                     <div>
                       <Label htmlFor="venue">Venue</Label>
                       <Input
@@ -0,0 +1,58 @@
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Read when server is imported: no Mongo, purges before the delete returns
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("SHOW_PURGE_MODE", "inline")
+os.environ.setdefault("ENSURE_INDEXES", "false")
+
+import server  # noqa: E402
+from cache import MemoryCache  # noqa: E402
+from storage import MemoryStorage  # noqa: E402
+from storage.sqlite import SQLiteStorage  # noqa: E402
+
+BACKENDS = ["memory", "sqlite"]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def make_storage(backend, tmp_path):
+    if backend == "sqlite":
+        return SQLiteStorage(tmp_path / "test.db")
+    return MemoryStorage()
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+async def storage(backend, tmp_path):
+    """An open storage backend, used directly rather than through the app."""
+    store = make_storage(backend, tmp_path)
+    await store.open()
+    yield store
+    await store.close()
+
+
+@pytest.fixture
+async def client(backend, tmp_path, monkeypatch):
+    """An httpx client for the app running on a fresh storage backend and cache."""
+    monkeypatch.setattr(server, "cache", MemoryCache())
+    monkeypatch.setattr(server, "EXPOSE_DB_ROUND_TRIPS", True)
+    await server.startup(make_storage(backend, tmp_path))
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+    await server.shutdown()
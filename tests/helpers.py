@@ -0,0 +1,21 @@
+"""Shortcuts for setting up data through the API."""
+
+
+async def post_ok(client, url, payload):
+    response = await client.post(url, json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def create_show(client, **fields):
+    return await post_ok(client, "/api/shows", {"title": "Test Show", **fields})
+
+
+async def create_act(client, show_id, name="Act", duration=10, **fields):
+    return await post_ok(client, "/api/acts", {"show_id": show_id, "name": name, "duration": duration, **fields})
+
+
+async def create_expense(client, show_id, amount, category="venue", **fields):
+    return await post_ok(client, "/api/expenses", {
+        "show_id": show_id, "category": category, "amount": amount, "description": "Expense", **fields,
+    })
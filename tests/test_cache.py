@@ -0,0 +1,54 @@
+"""The read caches are keyed by show and catalogue versions, so they never serve data older than the store's."""
+import pytest
+
+import server
+from tests.helpers import create_act, create_show
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_show_is_served_from_the_cache(client):
+    show_id = (await create_show(client))["id"]
+    await client.get(f"/api/shows/{show_id}")
+
+    response = await client.get(f"/api/shows/{show_id}")
+    assert response.headers["X-DB-Round-Trips"] == "1"
+    hits = server.cache.stats()["hits"]
+    assert (await client.get(f"/api/shows/{show_id}")).json()["title"] == "Test Show"
+    assert server.cache.stats()["hits"] == hits + 1
+
+
+async def test_act_writes_refresh_the_cached_show(client):
+    show_id = (await create_show(client))["id"]
+    await client.get(f"/api/shows/{show_id}")
+
+    await create_act(client, show_id, duration=25)
+    response = await client.get(f"/api/shows/{show_id}")
+    assert response.headers["X-DB-Round-Trips"] == "1"
+    assert (response.json()["total_duration"], response.json()["act_count"]) == (25, 1)
+
+
+async def test_writes_the_cache_never_saw_are_not_served_stale(client):
+    show_id = (await create_show(client))["id"]
+    etag = (await client.get(f"/api/shows/{show_id}")).headers["ETag"]
+
+    # As another worker would: straight to the store, leaving this process's cache alone
+    await server.store.shows.update(show_id, {"venue": "Big Top"}, inc={"version": 1})
+    response = await client.get(f"/api/shows/{show_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["venue"] == "Big Top"
+    assert response.headers["ETag"] != etag
+
+
+async def test_lists_and_the_report_follow_writes_from_other_workers(client):
+    show_id = (await create_show(client))["id"]
+    etag = (await client.get("/api/shows")).headers["ETag"]
+    report = (await client.get("/api/reports/expenses")).json()
+
+    await server.store.shows.update(show_id, {"title": "Renamed"}, inc={"version": 1})
+    response = await client.get("/api/shows", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [show["title"] for show in response.json()] == ["Renamed"]
+    rebuilt = (await client.get("/api/reports/expenses")).json()
+    assert rebuilt["version"] != report["version"]
+    assert [show["title"] for show in rebuilt["by_show"]] == ["Renamed"]
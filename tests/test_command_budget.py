@@ -0,0 +1,78 @@
+"""Storage round trips per request stay within budget, as reported in X-DB-Round-Trips.
+
+The budgets are maxima: a change that makes a route cheaper should lower
+its budget here, one that makes it dearer has to justify raising it.
+"""
+import pytest
+
+from tests.helpers import create_act, create_show
+
+pytestmark = pytest.mark.anyio
+
+
+def round_trips(response):
+    assert response.status_code in (200, 304), response.text
+    return int(response.headers["X-DB-Round-Trips"])
+
+
+async def test_show_routes(client):
+    response = await client.post("/api/shows", json={"title": "Show"})
+    assert round_trips(response) <= 1
+    show_id = response.json()["id"]
+
+    # The version, then the show itself until it is cached
+    assert round_trips(await client.get(f"/api/shows/{show_id}")) <= 2
+    response = await client.get(f"/api/shows/{show_id}")
+    assert round_trips(response) == 1
+    response = await client.get(f"/api/shows/{show_id}", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert round_trips(response) <= 1
+    assert round_trips(await client.get(f"/api/shows/{show_id}/summary")) <= 2
+
+    await create_act(client, show_id)
+    assert round_trips(await client.delete(f"/api/shows/{show_id}")) <= 6
+
+
+async def test_act_writes(client):
+    show_id = (await create_show(client))["id"]
+    response = await client.post("/api/acts", json={"show_id": show_id, "name": "First", "duration": 5})
+    assert round_trips(response) <= 4
+    first = response.json()
+    second = await create_act(client, show_id, "Second")
+
+    assert round_trips(await client.put(f"/api/acts/{first['id']}", json={"duration": 7})) <= 2
+    assert round_trips(await client.post(f"/api/acts/{first['id']}/move", json={"after_id": second["id"]})) <= 5
+    assert round_trips(await client.delete(f"/api/acts/{first['id']}")) <= 4
+
+
+@pytest.mark.parametrize("count", [1, 50])
+async def test_bulk_create_does_not_grow_with_the_batch(client, count):
+    show_id = (await create_show(client))["id"]
+    acts = [{"show_id": show_id, "name": f"Act {i}", "duration": 1} for i in range(count)]
+    assert round_trips(await client.post("/api/acts/bulk", json=acts)) <= 4
+
+
+async def test_expense_writes(client):
+    show_id = (await create_show(client))["id"]
+    response = await client.post(
+        "/api/expenses", json={"show_id": show_id, "category": "venue", "amount": 3, "description": "Hire"}
+    )
+    # The show check (unless cached), the write and the rollup update
+    assert round_trips(response) <= 3
+    assert round_trips(await client.delete(f"/api/expenses/{response.json()['id']}")) <= 3
+
+
+@pytest.mark.parametrize("url", ["/api/acts/show/{show_id}", "/api/shows/{show_id}/timeline"])
+async def test_cached_reads_cost_one_round_trip(client, url):
+    show_id = (await create_show(client))["id"]
+    for i in range(3):
+        await create_act(client, show_id, f"Act {i}")
+    url = url.format(show_id=show_id)
+
+    assert round_trips(await client.get(url)) <= 2
+    response = await client.get(url)
+    # Only the show version is read; the list itself comes from the cache
+    assert round_trips(response) == 1
+    response = await client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert round_trips(response) == 1
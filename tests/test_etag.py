@@ -0,0 +1,152 @@
+"""ETags and conditional GETs, and the cursors of paginated lists."""
+import re
+
+import pytest
+
+from tests.helpers import create_act, create_expense, create_show
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_show_answers_304_until_it_changes(client):
+    show_id = (await create_show(client))["id"]
+    url = f"/api/shows/{show_id}"
+
+    first = await client.get(url)
+    etag = first.headers["ETag"]
+    again = await client.get(url, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert (await client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})).status_code == 304
+
+    assert (await client.put(url, json={"title": "Test Show", "venue": "Big Top"})).status_code == 200
+    changed = await client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["venue"] == "Big Top"
+
+
+async def test_acts_list_etag_follows_act_writes(client):
+    show_id = (await create_show(client))["id"]
+    act = await create_act(client, show_id)
+    url = f"/api/acts/show/{show_id}"
+
+    etag = (await client.get(url)).headers["ETag"]
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+    assert (await client.put(f"/api/acts/{act['id']}", json={"duration": 15})).status_code == 200
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["duration"] == 15
+
+
+async def test_show_list_answers_304_until_any_show_changes(client):
+    show = await create_show(client)
+
+    async def still_current(url, etag):
+        response = await client.get(url, headers={"If-None-Match": etag})
+        if response.status_code == 304:
+            # Answered from the catalogue version alone, before any list query
+            assert response.headers["X-DB-Round-Trips"] == "1"
+        return response.status_code == 304
+
+    changes = [
+        lambda: client.post("/api/shows", json={"title": "Another"}),
+        lambda: client.put(f"/api/shows/{show['id']}", json={"title": "Renamed"}),
+        lambda: client.post("/api/acts", json={"show_id": show["id"], "name": "Act", "duration": 5}),
+        lambda: client.post(
+            "/api/expenses", json={"show_id": show["id"], "category": "venue", "amount": 3, "description": "Hire"}
+        ),
+        lambda: client.delete(f"/api/shows/{show['id']}"),
+    ]
+    for change in changes:
+        etags = {url: (await client.get(url)).headers["ETag"] for url in ("/api/shows", "/api/shows/summaries")}
+        for url, etag in etags.items():
+            assert await still_current(url, etag)
+        assert (await change()).status_code == 200
+        for url, etag in etags.items():
+            assert not await still_current(url, etag), url
+
+    shows = await client.get("/api/shows")
+    assert [item["title"] for item in shows.json()] == ["Another"]
+
+
+async def test_show_list_pages_carry_no_etag(client):
+    await create_show(client)
+    assert "ETag" not in (await client.get("/api/shows", params={"limit": 10})).headers
+    assert "ETag" not in (await client.get("/api/shows", headers={"Accept": "application/x-ndjson"})).headers
+
+
+async def test_expense_report_is_rebuilt_on_writes_only(client):
+    show_id = (await create_show(client))["id"]
+    act = await create_act(client, show_id, duration=20)
+    await create_expense(client, show_id, 100)
+
+    first = await client.get("/api/reports/expenses")
+    etag = first.headers["ETag"]
+    assert first.json()["expense_total"] == 100
+    # Nothing changed: the same body, not a rebuild
+    assert (await client.get("/api/reports/expenses")).json()["generated_at"] == first.json()["generated_at"]
+    assert (await client.get("/api/reports/expenses", headers={"If-None-Match": etag})).status_code == 304
+
+    writes = [
+        lambda: client.post(
+            "/api/expenses", json={"show_id": show_id, "category": "props", "amount": 50, "description": "Hire"}
+        ),
+        lambda: client.put(f"/api/acts/{act['id']}", json={"duration": 40}),
+        lambda: client.put(f"/api/shows/{show_id}", json={"title": "Renamed"}),
+    ]
+    for write in writes:
+        assert (await write()).status_code == 200
+        report = await client.get("/api/reports/expenses", headers={"If-None-Match": etag})
+        assert report.status_code == 200
+        assert report.headers["ETag"] != etag
+        etag = report.headers["ETag"]
+    report = report.json()
+    assert (report["expense_total"], report["stage_minutes"]) == (150, 40)
+    assert [show["title"] for show in report["by_show"]] == ["Renamed"]
+
+
+async def test_variants_of_a_list_get_different_etags(client):
+    show_id = (await create_show(client))["id"]
+    await create_act(client, show_id)
+    url = f"/api/acts/show/{show_id}"
+
+    summary = await client.get(f"/api/shows/{show_id}/summary")
+    acts = await client.get(url)
+    assert summary.headers["ETag"] != acts.headers["ETag"]
+    assert (await client.get(url, headers={"If-None-Match": summary.headers["ETag"]})).status_code == 200
+
+
+async def test_paginated_and_streamed_lists_carry_no_etag(client):
+    show_id = (await create_show(client))["id"]
+    await create_act(client, show_id)
+    url = f"/api/acts/show/{show_id}"
+
+    paged = await client.get(url, params={"limit": 10})
+    assert paged.status_code == 200
+    assert "ETag" not in paged.headers
+    streamed = await client.get(url, headers={"Accept": "application/x-ndjson"})
+    assert streamed.status_code == 200
+    assert "ETag" not in streamed.headers
+    assert len(streamed.text.splitlines()) == 1
+
+
+async def test_cursor_pages_through_every_act(client):
+    show_id = (await create_show(client))["id"]
+    created = [await create_act(client, show_id, f"Act {i}") for i in range(5)]
+    url = f"/api/acts/show/{show_id}"
+
+    seen, params = [], {"limit": 2}
+    while True:
+        response = await client.get(url, params=params)
+        seen.extend(act["id"] for act in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        assert re.fullmatch(r"[A-Za-z0-9_-]+", cursor)
+        params = {"limit": 2, "after": cursor}
+    assert seen == [act["id"] for act in created]
+
+    assert (await client.get(url, params={"after": "not a cursor"})).status_code == 400
@@ -0,0 +1,85 @@
+"""A show exported and imported again comes back whole, under new ids."""
+import orjson
+import pytest
+
+from tests.helpers import create_act, create_expense, create_show
+
+pytestmark = pytest.mark.anyio
+
+
+async def make_show(client):
+    show = await create_show(client, date="2026-06-01", time="19:30", venue="Big Top", description="Opening night")
+    trapeze = await create_act(client, show["id"], "Trapeze", 12, performers="Ana, Bo")
+    await create_act(client, show["id"], "Clowns", 8)
+    await create_expense(client, show["id"], 250, "venue")
+    await create_expense(client, show["id"], 40.5, "equip.rental", act_id=trapeze["id"])
+    return show
+
+
+async def upload(client, body, filename):
+    return await client.post("/api/shows/import", files={"file": (filename, body)})
+
+
+async def contents(client, show_id):
+    show = (await client.get(f"/api/shows/{show_id}")).json()
+    acts = (await client.get(f"/api/acts/show/{show_id}")).json()
+    expenses = (await client.get(f"/api/expenses/show/{show_id}")).json()
+    act_names = {act["id"]: act["name"] for act in acts}
+    return {
+        "show": {key: show[key] for key in (
+            "title", "date", "time", "venue", "description",
+            "total_duration", "act_count", "expense_total", "expense_count", "expenses_by_category",
+        )},
+        "acts": [(act["name"], act["performers"], act["duration"], act["sequence_order"]) for act in acts],
+        "expenses": sorted(
+            (expense["category"], expense["amount"], act_names.get(expense["act_id"])) for expense in expenses
+        ),
+    }
+
+
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+async def test_export_then_import_round_trips(client, format):
+    show = await make_show(client)
+    exported = await client.get(f"/api/shows/{show['id']}/export", params={"format": format})
+    assert exported.status_code == 200
+
+    response = await upload(client, exported.content, f"show.{format}")
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["acts"], result["expenses"]) == (2, 2)
+    assert result["show_id"] != show["id"]
+    assert await contents(client, result["show_id"]) == await contents(client, show["id"])
+
+
+@pytest.mark.parametrize("body, status, detail", [
+    (b'{"type": "show", "title": "Show"}\n[1, 2]\n', 422, "Line 2: expected an object, got list"),
+    (b'{"type": "show", "title": "Show"}\n\n{"type": "act", "name": "x"\n', 400, "Line 3: "),
+    (b'{"type": "act", "name": "Trapeze", "duration": 5}\n', 400, "Line 1: the first record must be the show"),
+    (b'{"type": "show", "title": "Show"}\n{"type": "act", "name": "Trapeze", "duration": "long"}\n', 400, "Line 2: "),
+    (b"", 400, "the file contains no show"),
+])
+async def test_bad_upload_is_rejected_without_leaving_a_show(client, body, status, detail):
+    response = await upload(client, body, "show.ndjson")
+    assert response.status_code == status
+    assert response.json()["detail"].startswith(detail)
+    assert (await client.get("/api/shows")).json() == []
+
+
+async def test_csv_errors_name_the_line(client):
+    show = await make_show(client)
+    exported = (await client.get(f"/api/shows/{show['id']}/export", params={"format": "csv"})).text
+    header, *rows = exported.splitlines()
+    rows[1] = rows[1].replace(",12,", ",twelve,")
+    response = await upload(client, "\n".join([header, *rows]).encode(), "show.csv")
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Line 3: ")
+    shows = (await client.get("/api/shows")).json()
+    assert [item["id"] for item in shows] == [show["id"]]
+
+
+async def test_ndjson_export_starts_with_the_show(client):
+    show = await make_show(client)
+    lines = (await client.get(f"/api/shows/{show['id']}/export")).content.splitlines()
+    records = [orjson.loads(line) for line in lines]
+    assert [record["type"] for record in records] == ["show", "act", "act", "expense", "expense"]
+    assert records[0]["id"] == show["id"]
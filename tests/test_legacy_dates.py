@@ -0,0 +1,53 @@
+"""Shows stored with free-text dates, from before dates were stored as dates, read back as undated."""
+import logging
+
+import pytest
+
+import server
+from tests.helpers import create_act, create_expense, create_show
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def legacy_show(client):
+    show = await create_show(client, date="2026-06-01")
+    await create_act(client, show["id"], performers="Bella")
+    for day in ("2026-05-20", "next week"):
+        await create_expense(client, show["id"], 10, date=day)
+    dated = await create_show(client, title="Dated", date="2026-06-05")
+    await create_act(client, dated["id"], performers="Bella")
+    await server.store.shows.update(show["id"], {"date": "next Friday"}, inc={"version": 1})
+    return show
+
+
+@pytest.mark.parametrize("fast", [True, False])
+async def test_reads_treat_a_free_text_date_as_none(client, legacy_show, monkeypatch, caplog, fast):
+    monkeypatch.setattr(server, "FAST_SERIALIZATION", fast)
+    show_id = legacy_show["id"]
+    with caplog.at_level(logging.WARNING, logger="server"):
+        for url in [f"/api/shows/{show_id}", f"/api/shows/{show_id}/timeline", "/api/reports/expenses"]:
+            response = await client.get(url)
+            assert response.status_code == 200, (url, response.text)
+        assert (await client.get(f"/api/shows/{show_id}")).json()["date"] is None
+        shows = {show["id"]: show for show in (await client.get("/api/shows")).json()}
+        assert shows[show_id]["date"] is None
+        # Expense dates are free text anyway, and read back as given
+        expenses = (await client.get(f"/api/expenses/show/{show_id}")).json()
+        assert sorted(expense["date"] for expense in expenses) == ["2026-05-20", "next week"]
+
+        response = await client.get(f"/api/shows/{show_id}/conflicts")
+        assert response.status_code == 200 and response.json() == []
+        schedule = (await client.get("/api/performers/Bella/schedule")).json()
+        assert [booking["date"] for booking in schedule["bookings"]] == [None, "2026-06-05"]
+        schedule = (await client.get("/api/performers/Bella/schedule", params={"from": "2026-01-01"})).json()
+        assert [booking["date"] for booking in schedule["bookings"]] == ["2026-06-05"]
+
+        cloned = await client.post(f"/api/shows/{show_id}/clone", json={})
+        assert cloned.status_code == 200 and cloned.json()["date"] is None
+    assert "'next Friday'" in caplog.text
+
+
+async def test_request_bodies_still_reject_a_free_text_date(client):
+    response = await client.post("/api/shows", json={"title": "Show", "date": "next Friday"})
+    assert response.status_code == 422
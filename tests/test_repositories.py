@@ -0,0 +1,168 @@
+"""Storage backends behave alike: each test runs on every backend in conftest.BACKENDS."""
+import pytest
+
+from server import CircusAct, Expense, Show, prepare_for_mongo
+
+pytestmark = pytest.mark.anyio
+
+
+def show_doc(**fields):
+    return prepare_for_mongo(Show(title="Show", **fields).dict())
+
+
+def act_doc(show_id, name, sequence_order, duration=10, **fields):
+    return prepare_for_mongo(
+        CircusAct(show_id=show_id, name=name, sequence_order=sequence_order, duration=duration, **fields).dict()
+    )
+
+
+def expense_doc(show_id, amount, category="venue", act_id=None):
+    return prepare_for_mongo(
+        Expense(show_id=show_id, act_id=act_id, category=category, amount=amount, description="Expense").dict()
+    )
+
+
+async def test_show_update_and_increment_advance_the_version(storage):
+    show = show_doc()
+    await storage.shows.insert(show)
+
+    updated = await storage.shows.update(show["id"], {"venue": "Big Top"}, inc={"version": 1})
+    assert updated["venue"] == "Big Top"
+    assert updated["version"] == 1
+
+    incremented = await storage.shows.increment(show["id"], {"act_count": 2, "version": 1})
+    assert (incremented["act_count"], incremented["version"]) == (2, 2)
+    stored = await storage.shows.get(show["id"])
+    assert (stored["act_count"], stored["version"]) == (2, 2)
+
+    assert await storage.shows.update("missing", {"venue": "x"}, inc={"version": 1}) is None
+    assert await storage.shows.increment("missing", {"version": 1}) is None
+
+
+async def test_every_show_write_moves_the_catalogue_version(storage):
+    show, other = show_doc(), show_doc()
+    seen = [await storage.shows.catalogue_version()]
+
+    async def moved():
+        seen.append(await storage.shows.catalogue_version())
+        return seen[-1] != seen[-2]
+
+    await storage.shows.insert(show)
+    assert await moved()
+    await storage.shows.update(show["id"], {"venue": "Big Top"}, inc={"version": 1})
+    assert await moved()
+    await storage.shows.increment(show["id"], {"act_count": 1, "version": 1})
+    assert await moved()
+    await storage.shows.set_many({show["id"]: {"title": "Renamed"}})
+    assert await moved()
+    await storage.shows.insert(other)
+    assert await moved()
+    await storage.shows.mark_deleted(other["id"])
+    assert await moved()
+    # Reads leave it alone
+    await storage.shows.get(show["id"])
+    assert not await moved()
+
+
+async def test_soft_deleted_show_is_hidden_until_removed(storage):
+    live, deleted = show_doc(), show_doc()
+    for show in (live, deleted):
+        await storage.shows.insert(show)
+
+    assert await storage.shows.mark_deleted(deleted["id"])
+    assert not await storage.shows.mark_deleted(deleted["id"])
+    assert await storage.shows.get(deleted["id"]) is None
+    assert not await storage.shows.exists(deleted["id"])
+    assert await storage.shows.live_ids({live["id"], deleted["id"]}) == {live["id"]}
+    assert await storage.shows.deleted_ids() == [deleted["id"]]
+
+    await storage.shows.remove_deleted(deleted["id"])
+    assert await storage.shows.deleted_ids() == []
+    assert [show["id"] async for show in storage.shows.find(fields=["id"])] == [live["id"]]
+
+
+async def test_acts_come_back_in_running_order(storage):
+    show = show_doc()
+    await storage.shows.insert(show)
+    acts = [act_doc(show["id"], name, order) for name, order in (("c", 30), ("a", 10), ("b", 20))]
+    await storage.acts.insert_many(acts)
+
+    by_name = {act["name"]: act["id"] for act in acts}
+    assert [act["name"] async for act in storage.acts.find(show["id"])] == ["a", "b", "c"]
+    last = await storage.acts.neighbour(show["id"], direction=-1)
+    assert (last["id"], last["sequence_order"]) == (by_name["c"], 30)
+    following = await storage.acts.neighbour(show["id"], 10, 1)
+    assert following["id"] == by_name["b"]
+
+    await storage.acts.set_orders([(by_name["c"], 5)], show_id=show["id"])
+    assert [act["name"] async for act in storage.acts.find(show["id"])] == ["c", "a", "b"]
+
+
+async def test_keyset_pages_cover_every_act_once(storage):
+    show = show_doc()
+    await storage.shows.insert(show)
+    await storage.acts.insert_many([act_doc(show["id"], f"act {i}", (i % 3) * 10) for i in range(7)])
+
+    seen, after = [], None
+    while True:
+        page = [act async for act in storage.acts.find(show["id"], after=after, limit=3)]
+        seen.extend(act["id"] for act in page)
+        if len(page) < 3:
+            break
+        after = (page[-1]["sequence_order"], page[-1]["id"])
+    assert seen == [act["id"] async for act in storage.acts.find(show["id"])]
+
+
+async def test_timeline_offsets_are_running_sums(storage):
+    show = show_doc()
+    await storage.shows.insert(show)
+    await storage.acts.insert_many([
+        act_doc(show["id"], "b", 20, duration=7),
+        act_doc(show["id"], "a", 10, duration=5),
+        act_doc(show["id"], "c", 30, duration=11),
+    ])
+
+    rows = await storage.acts.timeline(show["id"])
+    assert [(row["name"], row["start_offset"], row["end_offset"]) for row in rows] == [
+        ("a", 0, 5), ("b", 5, 12), ("c", 12, 23),
+    ]
+
+
+async def test_delete_by_act_reports_what_it_deleted(storage):
+    show = show_doc()
+    await storage.shows.insert(show)
+    act = act_doc(show["id"], "a", 10)
+    await storage.acts.insert(act)
+    await storage.expenses.insert_many([
+        expense_doc(show["id"], 10, "venue", act["id"]),
+        expense_doc(show["id"], 5, "venue", act["id"]),
+        expense_doc(show["id"], 2.5, "equip.rental", act["id"]),
+        expense_doc(show["id"], 99, "venue"),
+    ])
+
+    groups = await storage.run_in_transaction(storage.expenses.delete_by_act, act["id"])
+    assert sorted((group["category"], group["amount"], group["count"]) for group in groups) == [
+        ("equip.rental", 2.5, 1), ("venue", 15, 2),
+    ]
+    assert [expense["amount"] async for expense in storage.expenses.find(show["id"])] == [99]
+    assert await storage.run_in_transaction(storage.expenses.delete_by_act, act["id"]) == []
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("trapeze", ["Trapeze Duo"]),
+    ("lights", ["Lighting the ring", "Lights and lamps"]),
+    ("the", []),
+    ("fire_sticks", ["Juggling fire_sticks"]),
+    ("sticks", []),
+    ("café", ["Café Clowns"]),
+    ("cafe", []),
+    ('"ring" OR clowns*', ["Café Clowns", "Lighting the ring"]),
+])
+async def test_search_matches_the_same_acts(storage, query, expected):
+    show = show_doc()
+    await storage.shows.insert(show)
+    names = ["Trapeze Duo", "Lighting the ring", "Lights and lamps", "Juggling fire_sticks", "Café Clowns"]
+    await storage.acts.insert_many([act_doc(show["id"], name, (i + 1) * 10) for i, name in enumerate(names)])
+
+    hits = await storage.search(query, ["act"], limit=10)
+    assert sorted(hit["name"] for hit in hits) == expected
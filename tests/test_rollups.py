@@ -0,0 +1,67 @@
+"""Show rollups and the cached timeline stay in step with the acts and expenses written."""
+import pytest
+
+import server
+from tests.helpers import create_act, create_expense, create_show, post_ok
+
+pytestmark = pytest.mark.anyio
+
+
+async def assert_consistent(client, show_id):
+    show = (await client.get(f"/api/shows/{show_id}")).json()
+    acts = (await client.get(f"/api/acts/show/{show_id}")).json()
+    expenses = (await client.get(f"/api/expenses/show/{show_id}")).json()
+
+    assert show["total_duration"] == sum(act["duration"] for act in acts)
+    assert show["act_count"] == len(acts)
+    assert show["expense_total"] == pytest.approx(sum(expense["amount"] for expense in expenses))
+    assert show["expense_count"] == len(expenses)
+    by_category = {}
+    for expense in expenses:
+        by_category[expense["category"]] = by_category.get(expense["category"], 0) + expense["amount"]
+    assert {k: v for k, v in show["expenses_by_category"].items() if v} == pytest.approx(by_category)
+
+    timeline = (await client.get(f"/api/shows/{show_id}/timeline")).json()
+    offset = 0
+    assert [entry["id"] for entry in timeline["acts"]] == [act["id"] for act in acts]
+    for entry, act in zip(timeline["acts"], acts):
+        assert (entry["start_offset"], entry["end_offset"]) == (offset, offset + act["duration"])
+        offset += act["duration"]
+    assert await server.reconcile_rollups(server.store) == {}
+
+
+async def test_act_and_expense_writes_keep_rollups_and_timeline_in_step(client):
+    show = await create_show(client)
+    show_id = show["id"]
+    first = await create_act(client, show_id, "First", 10)
+    second = await create_act(client, show_id, "Second", 20)
+    bulk = [{"show_id": show_id, "name": f"Bulk {i}", "duration": 5} for i in range(3)]
+    await post_ok(client, "/api/acts/bulk", bulk)
+    # Read the timeline so that the following writes patch a cached copy
+    await client.get(f"/api/shows/{show_id}/timeline")
+
+    await create_expense(client, show_id, 100, "venue")
+    await create_expense(client, show_id, 40.5, "equip.rental", act_id=second["id"])
+    await create_expense(client, show_id, 7, "$cash", act_id=second["id"])
+    await assert_consistent(client, show_id)
+
+    response = await client.put(f"/api/acts/{first['id']}", json={"duration": 25})
+    assert response.status_code == 200
+    response = await client.post(f"/api/acts/{first['id']}/move", json={"after_id": second["id"]})
+    assert response.status_code == 200
+    assert (await client.put(f"/api/shows/{show_id}", json={"title": "Renamed"})).status_code == 200
+    await assert_consistent(client, show_id)
+
+    assert (await client.delete(f"/api/acts/{second['id']}")).status_code == 200
+    await assert_consistent(client, show_id)
+
+
+async def test_reorder_moves_the_timeline(client):
+    show_id = (await create_show(client))["id"]
+    acts = [await create_act(client, show_id, name, duration) for name, duration in (("a", 3), ("b", 4), ("c", 5))]
+    await client.get(f"/api/shows/{show_id}/timeline")
+
+    updates = [{"id": act["id"], "sequence_order": order} for act, order in zip(acts, (30, 20, 10))]
+    response = await client.put("/api/acts/reorder", json={"show_id": show_id, "act_updates": updates})
+    assert [act["name"] for act in response.json()] == ["c", "b", "a"]
+    await assert_consistent(client, show_id)
@@ -0,0 +1,50 @@
+"""The in-process index ranks exactly as scoring every document would, however it prunes."""
+import math
+import random
+from collections import Counter
+
+import pytest
+
+import search
+from search import InvertedIndex, tokenize
+
+FIELDS = {"name": 10, "staging_notes": 1}
+
+
+def score_every_document(docs, query, limit, within=None):
+    terms = list(dict.fromkeys(tokenize(query)))
+    having = Counter(term for doc in docs.values() for term in set(tokenize(" ".join(doc.values()))))
+    hits = []
+    for doc_id, doc in docs.items():
+        weights = Counter()
+        for field, weight in FIELDS.items():
+            for term, count in Counter(tokenize(doc[field])).items():
+                weights[term] += weight * (1 + math.log(count))
+        score = sum(math.log(1 + len(docs) / having[term]) * weights[term] for term in terms if term in weights)
+        if score and (within is None or doc_id in within):
+            hits.append((doc_id, score))
+    return sorted(hits, key=lambda hit: (-hit[1], hit[0]))[:limit]
+
+
+@pytest.mark.parametrize("walk", [0, 3, search.WALK])
+@pytest.mark.parametrize("seed", range(5))
+def test_search_matches_scoring_every_document(monkeypatch, walk, seed):
+    # Few words over many documents: long queries, many weight groups and many ties
+    monkeypatch.setattr(search, "WALK", walk)
+    monkeypatch.setattr(search, "FEW", walk)
+    rng = random.Random(seed)
+    words = ["trapeze", "drum", "roll", "cue", "spot", "ring", "act", "fire"]
+    index, docs = InvertedIndex(FIELDS), {}
+    for i in rng.sample(range(10_000), 400):
+        doc_id = f"act-{i:05d}"
+        docs[doc_id] = {field: " ".join(rng.choices(words, k=rng.randint(0, 5))) for field in FIELDS}
+        index.add(doc_id, docs[doc_id])
+    for doc_id in rng.sample(sorted(docs), 50):
+        index.remove(doc_id)
+        del docs[doc_id]
+
+    for query in ["act", "drum roll", "follow spot drum roll cue act", " ".join(words), "ring ring fire"]:
+        for limit in (1, 10, 100):
+            assert index.search(query, limit) == score_every_document(docs, query, limit), (query, limit)
+    within = set(rng.sample(sorted(docs), 20))
+    assert index.search("drum roll cue", 5, within) == score_every_document(docs, "drum roll cue", 5, within)
@@ -0,0 +1,36 @@
+"""List endpoints write the same JSON whether rows are encoded raw or through the models."""
+import orjson
+import pytest
+
+import server
+from tests.helpers import create_act, create_expense, create_show
+
+pytestmark = pytest.mark.anyio
+
+
+async def read_everything(client, show_id, act_id):
+    ndjson = await client.get(f"/api/acts/show/{show_id}", headers={"Accept": "application/x-ndjson"})
+    return {
+        "show": (await client.get(f"/api/shows/{show_id}")).json(),
+        "shows": (await client.get("/api/shows")).json(),
+        "acts": (await client.get(f"/api/acts/show/{show_id}")).json(),
+        "acts_ndjson": [orjson.loads(line) for line in ndjson.content.splitlines()],
+        "act": (await client.get(f"/api/acts/{act_id}")).json(),
+        "expenses": (await client.get(f"/api/expenses/show/{show_id}")).json(),
+    }
+
+
+async def test_raw_rows_match_the_models(client, monkeypatch):
+    show = await create_show(client, date="2026-06-01")
+    act = await create_act(client, show["id"])
+    await create_expense(client, show["id"], 25)
+
+    monkeypatch.setattr(server, "FAST_SERIALIZATION", True)
+    fast = await read_everything(client, show["id"], act["id"])
+    monkeypatch.setattr(server, "FAST_SERIALIZATION", False)
+    assert fast == await read_everything(client, show["id"], act["id"])
+
+    # Stored datetimes are tz-aware here: UTC is written "Z" on both paths, as on creation
+    assert fast["acts"] == fast["acts_ndjson"] == [fast["act"]] == [act]
+    assert fast["shows"][0]["created_at"] == fast["show"]["created_at"] == show["created_at"]
+    assert fast["expenses"][0]["created_at"].endswith("Z")